@@ -0,0 +1,119 @@
+"""
+시세 제공자 장애 조치/헤지 요청 벤치마크
+
+지연 분포와 실패율을 조절할 수 있는 로컬 대체 제공자 두 개로 자산 일봉 조회를 반복해
+헤지 요청을 끈 경우(실패 시 다음 제공자로만 전환)와 켠 경우의 조회 지연 백분위,
+성공률, 제공자별 응답 비율을 비교합니다.
+
+    python scripts/bench_failover.py --requests 300 --primary-tail 0.05 --primary-fail 0.02
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import config  # noqa: E402
+from providers import FailoverFetcher, PriceProvider, ProviderHealth  # noqa: E402
+
+
+class StandInProvider(PriceProvider):
+    """대체 제공자: 로그정규 지연 + 일정 확률의 긴 지연(꼬리)과 실패"""
+
+    def __init__(self, name: str, median: float, tail: float, tail_seconds: float,
+                 fail: float, seed: int):
+        self.name = name
+        self.median = median
+        self.tail = tail
+        self.tail_seconds = tail_seconds
+        self.fail = fail
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.cancelled = 0
+        self.frame = pd.DataFrame(
+            {'close': 1.0, 'open': 1.0, 'high': 1.0, 'low': 1.0, 'volume': 0.0},
+            index=pd.date_range('2024-01-01', periods=5, freq='D'))
+
+    def symbol(self, code, category, info):
+        return code
+
+    def fetch(self, symbol, start, end, cancel):
+        with self.lock:
+            delay = self.median * self.rng.lognormvariate(0, 0.3)
+            if self.rng.random() < self.tail:
+                delay += self.tail_seconds
+            failed = self.rng.random() < self.fail
+        if cancel.wait(delay):
+            with self.lock:
+                self.cancelled += 1
+            raise RuntimeError("취소됨")
+        if failed:
+            raise RuntimeError("대체 제공자 오류")
+        return self.frame
+
+
+def run(label, providers, requests, hedge):
+    saved = dict(config.PROVIDER_CONFIG)
+    if not hedge:
+        # 헤지 대기를 제한 시간보다 길게 → 실패 시 다음 제공자로만 전환
+        config.PROVIDER_CONFIG.update(hedge_min_seconds=1e9, hedge_max_seconds=1e9,
+                                      default_hedge_seconds=1e9)
+    fetcher = FailoverFetcher(providers, ProviderHealth(path=''))
+    latencies, winners = [], Counter()
+    for i in range(requests):
+        started = time.perf_counter()
+        data, provider = fetcher.fetch(f"A{i}", 'commodities', {}, None, None)
+        latencies.append(time.perf_counter() - started)
+        winners[provider or '실패'] += 1
+    fetcher.executor.shutdown(wait=True)
+    config.PROVIDER_CONFIG.clear()
+    config.PROVIDER_CONFIG.update(saved)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    ok = requests - winners['실패']
+    print(f"{label}: p50 {p50:.0f}ms, p95 {p95:.0f}ms, p99 {p99:.0f}ms, 최대 {max(latencies) * 1000:.0f}ms, "
+          f"성공 {ok}/{requests}, 헤지 {fetcher.hedges}건, 응답 {dict(winners)}")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시세 제공자 장애 조치 벤치마크")
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--primary-ms', type=float, default=40.0, help="1순위 지연 중앙값")
+    parser.add_argument('--primary-tail', type=float, default=0.05, help="1순위 긴 지연 확률")
+    parser.add_argument('--primary-fail', type=float, default=0.02, help="1순위 실패 확률")
+    parser.add_argument('--secondary-ms', type=float, default=90.0, help="2순위 지연 중앙값")
+    parser.add_argument('--secondary-tail', type=float, default=0.01)
+    parser.add_argument('--secondary-fail', type=float, default=0.01)
+    parser.add_argument('--tail-seconds', type=float, default=2.0, help="긴 지연 추가 시간")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    config.PROVIDER_CONFIG.update(deadline_seconds=args.tail_seconds * 3, hedge_min_seconds=0.01)
+
+    def providers():
+        return [
+            StandInProvider('primary', args.primary_ms / 1000, args.primary_tail,
+                            args.tail_seconds, args.primary_fail, args.seed),
+            StandInProvider('secondary', args.secondary_ms / 1000, args.secondary_tail,
+                            args.tail_seconds, args.secondary_fail, args.seed + 1),
+        ]
+
+    print(f"요청 {args.requests}건 / 1순위 {args.primary_ms:.0f}ms (꼬리 {args.primary_tail:.0%}, "
+          f"실패 {args.primary_fail:.0%}) / 2순위 {args.secondary_ms:.0f}ms "
+          f"(꼬리 {args.secondary_tail:.0%}, 실패 {args.secondary_fail:.0%})")
+    run("장애 조치만", providers(), args.requests, hedge=False)
+    hedged = providers()
+    run("헤지 요청  ", hedged, args.requests, hedge=True)
+    print(f"취소된 진 요청: {sum(p.cancelled for p in hedged)}건")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+알림 분배(fan-out) 벤치마크
+
+로컬 대체 서버(텔레그램 Bot API 흉내: 채팅방별 간격 위반 시 429)를 띄우고
+수천 명의 구독자에게 알림을 분배해 처리량, 렌더링/중복 제거 효과, 레벨별 완료 시각을 측정합니다.
+
+    python scripts/bench_fanout.py --subscribers 5000 --global-rate 2000 --latency-ms 20
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import config  # noqa: E402
+from alert_manager import AlertMessage  # noqa: E402
+from fanout import FanoutDispatcher, TelegramTransport  # noqa: E402
+from subscribers import Subscriber, SubscriberRegistry  # noqa: E402
+
+
+class StandInServer(ThreadingHTTPServer):
+    """텔레그램 Bot API 대체 서버"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, latency: float, per_chat_interval: float):
+        super().__init__(('127.0.0.1', 0), _StandInHandler)
+        self.latency = latency
+        self.per_chat_interval = per_chat_interval
+        self.last_seen = {}
+        self.counts = Counter()
+        self.lock = threading.Lock()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        if self.path.endswith('/sendMessage'):
+            chat_id = json.loads(body)['chat_id']
+        else:
+            chat_id = 'document'
+        time.sleep(server.latency)
+
+        now = time.monotonic()
+        with server.lock:
+            last = server.last_seen.get(chat_id)
+            limited = chat_id != 'document' and last is not None \
+                and now - last < server.per_chat_interval * 0.9
+            if not limited:
+                server.last_seen[chat_id] = now
+            server.counts['429' if limited else '200'] += 1
+
+        if limited:
+            payload = json.dumps({'ok': False, 'parameters': {'retry_after': 1}}).encode()
+            self.send_response(429)
+        else:
+            payload = b'{"ok": true}'
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TimingTransport(TelegramTransport):
+    """우선순위별 완료 시각 기록"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.completed = defaultdict(list)
+        self.started = time.monotonic()
+
+    def send(self, job):
+        result = super().send(job)
+        if result[0]:
+            self.completed[job.priority].append(time.monotonic() - self.started)
+        return result
+
+
+def build_alerts(codes, rng):
+    """합성 알림 (모든 자산 일일 리포트 + 일부 주의/긴급)"""
+    alerts = {'level1': [], 'level2': [], 'level3': []}
+    for code in codes:
+        alerts['level1'].append(AlertMessage(f"📊 {code}: {rng.uniform(1, 1000):,.2f}", (code,)))
+        if rng.random() < 0.3:
+            alerts['level2'].append(AlertMessage(f"📊 {code} 일간 {rng.uniform(2, 3):+.2f}%", (code,)))
+        if rng.random() < 0.1:
+            alerts['level3'].append(AlertMessage(f"🚀 {code} 급등 {rng.uniform(3, 6):+.2f}%", (code,)))
+    return alerts
+
+
+def build_subscribers(count, codes, categories, profiles, rng):
+    """구독자 생성 (필터 프로필 수는 제한, 일부 채팅방 중복)"""
+    filters = []
+    for _ in range(profiles):
+        kind = rng.random()
+        if kind < 0.4:
+            filters.append({'categories': rng.sample(categories, rng.randint(1, len(categories)))})
+        elif kind < 0.8:
+            filters.append({'assets': rng.sample(codes, rng.randint(1, min(5, len(codes))))})
+        else:
+            filters.append({})
+    subscribers = []
+    for i in range(count):
+        chat_id = f"chat{rng.randrange(int(count * 0.95))}"
+        profile = rng.choice(filters)
+        subscribers.append(Subscriber(chat_id, min_level=rng.choice((1, 1, 2, 3)),
+                                      files=False, **profile))
+    return subscribers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="알림 분배 벤치마크")
+    parser.add_argument('--subscribers', type=int, default=3000)
+    parser.add_argument('--profiles', type=int, default=40, help="서로 다른 필터 수")
+    parser.add_argument('--global-rate', type=float, default=1000.0)
+    parser.add_argument('--per-chat-interval', type=float, default=1.0)
+    parser.add_argument('--workers', type=int, default=32)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    config.FANOUT_CONFIG.update({
+        'global_rate': args.global_rate, 'global_burst': args.global_rate,
+        'per_chat_interval': args.per_chat_interval, 'workers': args.workers,
+    })
+
+    server = StandInServer(args.latency_ms / 1000.0, args.per_chat_interval)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/botTEST"
+
+    categories = {code: category for category, assets in config.ASSETS.items() for code in assets}
+    codes = sorted(categories)
+    alerts = build_alerts(codes, rng)
+    registry = SubscriberRegistry(build_subscribers(
+        args.subscribers, codes, sorted(set(categories.values())), args.profiles, rng))
+
+    transport = TimingTransport(base_url=base_url, pool_size=args.workers)
+    dispatcher = FanoutDispatcher(registry, transport=transport)
+    dispatcher.categories = categories
+
+    started = time.perf_counter()
+    jobs = dispatcher.plan(alerts)
+    plan_seconds = time.perf_counter() - started
+    transport.started = time.monotonic()
+    started = time.perf_counter()
+    done, failed = dispatcher.run(jobs)
+    run_seconds = time.perf_counter() - started
+    server.shutdown()
+
+    naive = sum(len([lvl for lvl in s.levels if alerts[lvl]]) for s in registry)
+    print(f"구독자 {len(registry)}명 / 필터 프로필 {args.profiles}개 / 자산 {len(codes)}개")
+    print(f"계획: {plan_seconds * 1000:.1f}ms, 렌더링 {dispatcher.renders}회 "
+          f"(구독자별 렌더링 시 {naive}회), 발송 작업 {len(jobs)}건")
+    print(f"발송: {len(done)}건 성공, {len(failed)}건 실패, {run_seconds:.2f}초 "
+          f"({len(done) / run_seconds:,.0f}건/초)")
+    print(f"대체 서버 응답: {dict(server.counts)}")
+    for priority, label in ((0, 'level3'), (1, 'level2'), (2, 'level1')):
+        times = transport.completed.get(priority)
+        if times:
+            print(f"  {label}: 완료 중앙값 {statistics.median(times):.2f}초, 최대 {max(times):.2f}초")
+
+
+if __name__ == '__main__':
+    main()
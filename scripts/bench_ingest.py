@@ -0,0 +1,192 @@
+"""
+틱 수신 부하 생성기
+
+틱 수신기(TickIngestor)를 임시 디렉터리 상태로 띄우고, 별도 프로세스들이 합성 자산의 틱을
+라인 프로토콜로 밀어 넣어 지속 처리량(틱/초)과 틱 → 알림 판단 지연 백분위를 측정합니다.
+각 자산은 주기적으로 ±3% 점프를 넣어 알림을 유도하고, 점프 틱 송신 시각과
+그 봉 이후 알림 판단 시각 차이를 지연으로 봅니다 (같은 머신의 벽시계 기준).
+모의 시계는 틱당 1초씩 흐르므로 최대 속도에서는 배치 하나가 알림 구간보다 긴 모의 시간을 담아
+일부 점프가 판단되지 않을 수 있습니다. 지연은 --rate로 처리 한도 아래에서 측정하세요.
+
+    python scripts/bench_ingest.py --assets 200 --ticks 2000000 --connections 4
+    python scripts/bench_ingest.py --rate 50000 --unix /tmp/ingest.sock
+"""
+import argparse
+import multiprocessing as mp
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import config  # noqa: E402
+from intraday import IntradayMonitor  # noqa: E402
+from tick_ingest import TickIngestor  # noqa: E402
+
+BAR_SECONDS = 60
+
+
+class NullDispatcher:
+    """발송 생략 (판단 시각만 측정)"""
+
+    def dispatch(self, alerts, **kwargs):
+        return set(), []
+
+
+class TimedMonitor(IntradayMonitor):
+    """자산별 알림 판단 (봉 시각, 판단 시각) 기록"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decided = defaultdict(list)
+
+    def evaluate(self, codes=None):
+        fresh = super().evaluate(codes)
+        now = time.time()
+        for level in ('level2', 'level3'):
+            for message in fresh[level]:
+                code = message.codes[0]
+                self.decided[code].append((self.store[code].last_ts, now))
+        return fresh
+
+    def first_decision(self, code, bar, window_seconds):
+        """점프 봉 이후 알림 구간 안에서 처음 내려진 알림 판단 시각
+        (배치 안에 여러 봉이 들어오면 배치의 마지막 봉 기준으로 판단하므로 봉 시각은 같지 않을 수 있음)"""
+        for bar_ts, decided_at in self.decided.get(code, ()):
+            if bar <= bar_ts < bar + window_seconds:
+                return decided_at
+        return None
+
+
+def generate(address, codes, ticks, rate, chunk, seed, jump_every, start_ts, results):
+    """부하 생성 프로세스: 자산별 모의 시계(틱당 1초)로 틱 송신, 점프 (자산, 봉 시각, 송신 시각) 보고"""
+    rng = random.Random(seed)
+    prices = {code: rng.uniform(10, 1000) for code in codes}
+    clocks = {code: start_ts for code in codes}
+    counts = {code: rng.randrange(jump_every) for code in codes}
+    direction = {code: 1 for code in codes}
+    jumps = []
+
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(address)
+
+    started = time.perf_counter()
+    sent = 0
+    while sent < ticks:
+        lines, pending = [], []
+        for i in range(min(chunk, ticks - sent)):
+            code = codes[(sent + i) % len(codes)]
+            clocks[code] += 1
+            counts[code] += 1
+            price = prices[code] * (1 + rng.gauss(0, 0.0002))
+            if counts[code] % jump_every == 0:
+                price *= 1.03 if direction[code] > 0 else 1 / 1.03
+                direction[code] = -direction[code]
+                pending.append((code, clocks[code] - clocks[code] % BAR_SECONDS))
+            prices[code] = price
+            lines.append(f"T {code} {clocks[code] * 1000} {price:.6f} {rng.randint(1, 10)}")
+        payload = ('\n'.join(lines) + '\n').encode()
+        sent_at = time.time()
+        jumps.extend((code, bar, sent_at) for code, bar in pending)
+        sock.sendall(payload)
+        sent += len(lines)
+        if rate:
+            delay = sent / rate - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+    sock.close()
+    results.put((sent, jumps))
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="틱 수신 부하 생성기")
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--ticks', type=int, default=1_000_000, help="전체 송신 틱 수")
+    parser.add_argument('--connections', type=int, default=4, help="송신 프로세스(연결) 수")
+    parser.add_argument('--rate', type=float, default=0.0, help="목표 전체 틱/초 (0: 최대 속도)")
+    parser.add_argument('--chunk', type=int, default=500, help="송신 1회당 줄 수")
+    parser.add_argument('--window', type=int, default=5, help="장중 알림 판단 구간 (분)")
+    parser.add_argument('--unix', default='', help="유닉스 소켓 경로 (기본: TCP)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # 벤치마크 상태는 임시 디렉터리에 (실제 히스토리/변동성 상태를 건드리지 않음)
+    workdir = tempfile.mkdtemp(prefix='bench_ingest_')
+    config.HISTORY_CONFIG['dir'] = os.path.join(workdir, 'history')
+    config.VOLATILITY_ALERTS['state_file'] = os.path.join(workdir, 'ewma.json')
+    config.FETCH_CACHE['enabled'] = False
+    config.INTRADAY_CONFIG['alert_window_minutes'] = args.window
+    codes = [f"B{i:04d}" for i in range(args.assets)]
+    config.ASSETS = {'bench': {
+        code: {'name': code, 'ticker': code, 'icon': '·', 'enabled': True,
+               'intraday_interval': '1m', 'calendar': 'crypto'}
+        for code in codes
+    }}
+
+    monitor = TimedMonitor(dispatcher=NullDispatcher())
+    ingestor = TickIngestor(port=0, unix_socket=args.unix, dispatcher=NullDispatcher(),
+                            monitor=monitor)
+    ingestor.start()
+    address = args.unix or (ingestor.host, ingestor.port)
+
+    # 점프 후 알림 구간의 4배 간격으로 다음 점프 (직전 점프의 여파와 겹치지 않도록)
+    jump_every = args.window * 60 * 4
+    start_ts = int(time.time()) - 86400
+    start_ts -= start_ts % 86400
+    results = mp.Queue()
+    shares = [codes[i::args.connections] for i in range(args.connections)]
+    per_conn = args.ticks // args.connections
+    workers = [
+        mp.Process(target=generate, args=(address, share, per_conn, args.rate / args.connections,
+                                          args.chunk, args.seed + i, jump_every, start_ts, results))
+        for i, share in enumerate(shares) if share
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    sent, jumps = 0, []
+    for _ in workers:
+        count, items = results.get()
+        sent += count
+        jumps.extend(items)
+    for worker in workers:
+        worker.join()
+    send_seconds = time.perf_counter() - started
+
+    while ingestor.stats['ticks'] + ingestor.stats['late'] < sent:
+        time.sleep(0.01)
+    total_seconds = time.perf_counter() - started
+    ingestor.stop()
+
+    decided = [(monitor.first_decision(code, bar, args.window * 60), sent_at)
+               for code, bar, sent_at in jumps]
+    latencies = [at - sent_at for at, sent_at in decided if at is not None]
+    stats = ingestor.stats
+    print(f"자산 {args.assets}개 / 연결 {len(workers)}개 / 틱 {sent:,}건 "
+          f"({'최대 속도' if not args.rate else f'목표 {args.rate:,.0f}틱/초'})")
+    print(f"송신 {send_seconds:.2f}초, 처리 완료 {total_seconds:.2f}초 → "
+          f"지속 처리량 {sent / total_seconds:,.0f}틱/초")
+    print(f"배치 {stats['batches']:,}회 (평균 {stats['lines'] / max(stats['batches'], 1):,.0f}줄), "
+          f"알림 {stats['alerts']:,}건, 늦은 틱 {stats['late']}, 거부 {stats['rejected']}")
+    if latencies:
+        ms = [x * 1000 for x in latencies]
+        print(f"틱 → 알림 지연 ({len(ms)}/{len(jumps)} 점프): "
+              f"p50 {statistics.median(ms):.1f}ms, p90 {percentile(ms, 90):.1f}ms, "
+              f"p99 {percentile(ms, 99):.1f}ms, 최대 {max(ms):.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
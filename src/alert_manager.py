@@ -1,13 +1,31 @@
 """
 알림 조건 판단 및 관리 모듈
 """
-from typing import Dict, List
-from config import ALERT_THRESHOLDS, CORRELATION_PATTERNS, get_enabled_assets
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import config
+from config import (
+    INTRADAY_CONFIG, INDICATOR_CONFIG, LOOKBACK_PERIODS, PERCENTILE_CONFIG, SPARKLINE_CONFIG,
+    VOLATILITY_ALERTS, get_enabled_assets
+)
+from volatility import threshold_mode
+from results import ResultStore
+from sparklines import text_sparklines
+
+
+class AlertMessage(str):
+    """알림 메시지 (관련 자산 코드 포함 - 구독자 필터용)"""
+    
+    def __new__(cls, text: str, codes: Tuple[str, ...] = ()):
+        message = super().__new__(cls, text)
+        message.codes = tuple(codes)
+        return message
+
 
 class AlertManager:
     """알림 관리 클래스"""
     
-    def __init__(self, processed_data: Dict):
+    def __init__(self, processed_data: ResultStore):
         self.data = processed_data
         self.assets = get_enabled_assets()
         self.alerts = {
@@ -15,6 +33,8 @@ class AlertManager:
             'level2': [],
             'level3': []
         }
+        # 자산별 알림 상태 {code: {'level': 최고 레벨, 'messages': [...]}}
+        self.asset_alerts: Dict[str, Dict] = {}
     
     def generate_alerts(self) -> Dict[str, List]:
         """모든 알림 생성"""
@@ -30,129 +50,218 @@ class AlertManager:
         # 상관관계 이상 감지
         self._check_correlation_anomalies()
         
+        # 전체 쌍 상관관계 이탈 (자동 탐지)
+        self._check_correlation_breaks()
+        
         return self.alerts
     
+    def _enabled_codes(self):
+        """처리에 성공한 활성 자산 (category, code, info)"""
+        for category, assets in self.assets.items():
+            for code, info in assets.items():
+                if code in self.data:
+                    yield category, code, info
+    
     def _generate_daily_report(self):
         """일일 리포트 생성 (Level 1)"""
         report_lines = []
+        data = self.data
+        trends = self._recent_trends()
         
-        for category, assets in self.assets.items():
-            for code, info in assets.items():
-                if code not in self.data or 'error' in self.data[code]:
-                    continue
-                
-                d = self.data[code]
-                icon = info['icon']
-                name = info['name']
-                price = d['current_price']
-                change_pct = d['daily_change_pct']
-                
-                # 주간/월간 추세
-                weekly_info = ""
-                if 'weekly' in d and d['weekly']:
-                    weekly = d['weekly']
-                    if 'last_period_avg' in weekly and weekly['last_period_avg']:
-                        weekly_change = ((d['current_price'] - weekly['last_period_avg']) / 
-                                       weekly['last_period_avg'] * 100)
-                        weekly_info = f"주간 {weekly_change:+.1f}%"
-                
-                # 이동평균 정보
-                ma_info = ""
-                if 'moving_averages' in d:
-                    ma = d['moving_averages']
-                    if 'MA5' in ma and 'MA20' in ma and 'MA60' in ma:
-                        if (ma['MA5']['position'] == 'above' and 
-                            ma['MA20']['position'] == 'above' and 
-                            ma['MA60']['position'] == 'above'):
-                            ma_info = "📈"
-                        elif (ma['MA5']['position'] == 'below' and 
-                              ma['MA20']['position'] == 'below' and 
-                              ma['MA60']['position'] == 'below'):
-                            ma_info = "📉"
-                
-                line = f"{icon} {name}: {price:,.2f} ({change_pct:+.2f}%)"
-                if weekly_info:
-                    line += f" | {weekly_info}"
-                if ma_info:
-                    line += f" {ma_info}"
-                
-                report_lines.append(line)
+        for category, code, info in self._enabled_codes():
+            icon = info['icon']
+            name = info['name']
+            price = data.get(code, 'current_price')
+            change_pct = data.get(code, 'daily_change_pct')
+            
+            # 주간/월간 추세
+            weekly_info = ""
+            last_week = data.get(code, 'weekly.last_period_avg')
+            if last_week:
+                weekly_change = (price - last_week) / last_week * 100
+                weekly_info = f"주간 {weekly_change:+.1f}%"
+            
+            # 이동평균 정보
+            ma_info = ""
+            mas = [data.get(code, f'moving_averages.MA{p}') for p in (5, 20, 60)]
+            if all(ma is not None for ma in mas):
+                if all(price > ma for ma in mas):
+                    ma_info = "📈"
+                elif all(price <= ma for ma in mas):
+                    ma_info = "📉"
+            
+            line = f"{icon} {name}: {price:,.2f} ({change_pct:+.2f}%)"
+            if weekly_info:
+                line += f" | {weekly_info}"
+            if ma_info:
+                line += f" {ma_info}"
+            if code in trends:
+                line += f" {trends[code]}"
+            
+            report_lines.append(AlertMessage(line, (code,)))
         
         self.alerts['level1'] = report_lines
     
+    def _recent_trends(self) -> Dict[str, str]:
+        """자산별 최근 종가 텍스트 스파크라인 (전체 자산 일괄 계산)"""
+        if not SPARKLINE_CONFIG['message_text']:
+            return {}
+        codes = [code for _, code, _ in self._enabled_codes() if code in self.data.series]
+        if not codes:
+            return {}
+        length = LOOKBACK_PERIODS['daily']
+        values = np.full((len(codes), length), np.nan)
+        for i, code in enumerate(codes):
+            tail = self.data.series[code].to_numpy(dtype=np.float64)[-length:]
+            values[i, length - len(tail):] = tail
+        return dict(zip(codes, (trend.strip() for trend in text_sparklines(values, length))))
+    
     def _check_warning_conditions(self):
         """주의 조건 체크 (Level 2)"""
         warnings = []
+        data = self.data
         
-        for category, assets in self.assets.items():
-            for code, info in assets.items():
-                if code not in self.data or 'error' in self.data[code]:
-                    continue
-                
-                d = self.data[code]
-                name = info['name']
-                
-                # 일간 변동률 체크
-                if abs(d['daily_change_pct']) >= ALERT_THRESHOLDS['warning']['daily_change']:
-                    warnings.append(
-                        f"📊 {name} 일간 {d['daily_change_pct']:+.2f}%"
-                    )
-                
-                # 크로스 신호
-                if 'cross_signals' in d:
-                    signals = d['cross_signals']
-                    if signals.get('golden_cross_5_20'):
-                        warnings.append(f"⚡ {name} MA5↗MA20 골든크로스")
-                    if signals.get('dead_cross_5_20'):
-                        warnings.append(f"⚡ {name} MA5↘MA20 데드크로스")
+        for category, code, info in self._enabled_codes():
+            name = info['name']
+            start = len(warnings)
+            
+            # 일간 변동률 체크 (고정 % 또는 변동성 정규화 z-점수)
+            if self._is_large_move(category, code, 'warning'):
+                warnings.append(
+                    f"📊 {name} 일간 {data.get(code, 'daily_change_pct'):+.2f}%"
+                    f"{self._z_suffix(category, code)}"
+                )
+            
+            # 과거 분포 백분위 (긴급 수준은 Level 3에서)
+            if self._percentile_band(code) == 'warning':
+                warnings.append(self._percentile_message(code, name))
+            
+            # 크로스 신호
+            if data.get(code, 'cross_signals.golden_cross_5_20'):
+                warnings.append(f"⚡ {name} MA5↗MA20 골든크로스")
+            if data.get(code, 'cross_signals.dead_cross_5_20'):
+                warnings.append(f"⚡ {name} MA5↘MA20 데드크로스")
+            
+            # 기술적 지표 (RSI/볼린저밴드/MACD)
+            warnings.extend(self._indicator_warnings(name, data.group(code, 'indicators')))
+            warnings[start:] = self._tag_asset(code, 'level2', warnings[start:])
         
         self.alerts['level2'] = warnings
     
+    def _is_large_move(self, category: str, code: str, level: str) -> bool:
+        """일간 변동 임계값 판단 (자산/카테고리별 방식 선택)"""
+        z = self.data.get(code, 'daily_zscore')
+        if threshold_mode(category, code) == 'zscore' and z is not None:
+            return abs(z) >= VOLATILITY_ALERTS[f'{level}_z']
+        return abs(self.data.get(code, 'daily_change_pct')) >= config.ALERT_THRESHOLDS[level]['daily_change']
+    
+    def _z_suffix(self, category: str, code: str) -> str:
+        """z-점수 방식 자산의 메시지 접미사"""
+        z = self.data.get(code, 'daily_zscore')
+        if threshold_mode(category, code) == 'zscore' and z is not None:
+            return f" (z={z:+.1f})"
+        return ""
+    
+    def _percentile_band(self, code: str) -> Optional[str]:
+        """알림 창 백분위가 상/하단 극단이면 'emergency' 또는 'warning'"""
+        pct = self.data.get(code, f"percentile.{PERCENTILE_CONFIG['alert_window']}y")
+        if pct is None:
+            return None
+        extreme = max(pct, 100 - pct)
+        for level in ('emergency', 'warning'):
+            if extreme >= PERCENTILE_CONFIG[level]:
+                return level
+        return None
+    
+    def _percentile_message(self, code: str, name: str) -> str:
+        window = PERCENTILE_CONFIG['alert_window']
+        pct = self.data.get(code, f"percentile.{window}y")
+        if pct >= 50:
+            return f"🏔️ {name} {window}년 분포 상위 {100 - pct:.1f}% (백분위 {pct:.1f})"
+        return f"🕳️ {name} {window}년 분포 하위 {pct:.1f}% (백분위 {pct:.1f})"
+    
+    def _indicator_warnings(self, name: str, ind: Dict) -> List[str]:
+        """지표 기반 주의 알림"""
+        warnings = []
+        
+        rsi = ind.get('RSI')
+        if rsi is not None:
+            if rsi >= INDICATOR_CONFIG['rsi_overbought']:
+                warnings.append(f"🌡️ {name} RSI 과매수 ({rsi:.0f})")
+            elif rsi <= INDICATOR_CONFIG['rsi_oversold']:
+                warnings.append(f"🧊 {name} RSI 과매도 ({rsi:.0f})")
+        
+        pct_b = ind.get('BB_pctb')
+        if pct_b is not None:
+            if pct_b > 1:
+                warnings.append(f"📏 {name} 볼린저밴드 상단 돌파")
+            elif pct_b < 0:
+                warnings.append(f"📏 {name} 볼린저밴드 하단 이탈")
+        
+        hist, prev = ind.get('MACD_hist'), ind.get('MACD_hist_prev')
+        if hist is not None and prev is not None:
+            if prev <= 0 < hist:
+                warnings.append(f"⚡ {name} MACD 시그널 상향 돌파")
+            elif prev >= 0 > hist:
+                warnings.append(f"⚡ {name} MACD 시그널 하향 돌파")
+        
+        return warnings
+    
     def _check_emergency_conditions(self):
         """긴급 조건 체크 (Level 3)"""
         emergencies = []
+        data = self.data
         
-        for category, assets in self.assets.items():
-            for code, info in assets.items():
-                if code not in self.data or 'error' in self.data[code]:
-                    continue
-                
-                d = self.data[code]
-                name = info['name']
-                
-                # 급등락
-                if abs(d['daily_change_pct']) >= ALERT_THRESHOLDS['emergency']['daily_change']:
-                    emoji = "🚀" if d['daily_change_pct'] > 0 else "💥"
-                    emergencies.append(
-                        f"{emoji} {name} 급{'등' if d['daily_change_pct'] > 0 else '락'} "
-                        f"{d['daily_change_pct']:+.2f}%"
-                    )
-                
-                # 52주 최고/최저 경신
-                if d.get('is_52w_high'):
-                    emergencies.append(f"🔔 {name} 52주 최고가 경신 ({d['current_price']:,.2f})")
-                if d.get('is_52w_low'):
-                    emergencies.append(f"🔔 {name} 52주 최저가 경신 ({d['current_price']:,.2f})")
-                
-                # 정배열/역배열
-                if 'cross_signals' in d:
-                    signals = d['cross_signals']
-                    if signals.get('bullish_alignment'):
-                        emergencies.append(f"📈 {name} 정배열 진입 (MA5>MA20>MA60)")
-                    if signals.get('bearish_alignment'):
-                        emergencies.append(f"📉 {name} 역배열 진입 (MA5<MA20<MA60)")
+        for category, code, info in self._enabled_codes():
+            name = info['name']
+            start = len(emergencies)
+            change_pct = data.get(code, 'daily_change_pct')
+            price = data.get(code, 'current_price')
+            
+            # 급등락
+            if self._is_large_move(category, code, 'emergency'):
+                emoji = "🚀" if change_pct > 0 else "💥"
+                emergencies.append(
+                    f"{emoji} {name} 급{'등' if change_pct > 0 else '락'} "
+                    f"{change_pct:+.2f}%{self._z_suffix(category, code)}"
+                )
+            
+            # 52주 최고/최저 경신
+            if data.get(code, 'is_52w_high'):
+                emergencies.append(f"🔔 {name} 52주 최고가 경신 ({price:,.2f})")
+            if data.get(code, 'is_52w_low'):
+                emergencies.append(f"🔔 {name} 52주 최저가 경신 ({price:,.2f})")
+            
+            # 과거 분포 극단
+            if self._percentile_band(code) == 'emergency':
+                emergencies.append(self._percentile_message(code, name))
+            
+            # 정배열/역배열
+            if data.get(code, 'cross_signals.bullish_alignment'):
+                emergencies.append(f"📈 {name} 정배열 진입 (MA5>MA20>MA60)")
+            if data.get(code, 'cross_signals.bearish_alignment'):
+                emergencies.append(f"📉 {name} 역배열 진입 (MA5<MA20<MA60)")
+            emergencies[start:] = self._tag_asset(code, 'level3', emergencies[start:])
         
         self.alerts['level3'] = emergencies
     
+    def _tag_asset(self, code: str, level: str, messages: List[str]) -> List[AlertMessage]:
+        """메시지에 자산 코드를 붙이고 자산별 알림 상태 기록 (레벨은 높은 쪽 유지)"""
+        if not messages:
+            return []
+        tagged = [AlertMessage(message, (code,)) for message in messages]
+        state = self.asset_alerts.setdefault(code, {'level': level, 'messages': []})
+        state['messages'].extend(tagged)
+        if level > state['level']:
+            state['level'] = level
+        return tagged
+    
     def _check_correlation_anomalies(self):
         """상관관계 이상 감지"""
-        if 'correlations' not in self.data:
-            return
-        
-        correlations = self.data['correlations']
+        correlations = self.data.correlations
         anomalies = []
         
-        for pattern_name, pattern_info in CORRELATION_PATTERNS.items():
+        for pattern_name, pattern_info in config.CORRELATION_PATTERNS.items():
             assets = pattern_info['assets']
             expected = pattern_info['expected']
             threshold = pattern_info['threshold']
@@ -175,22 +284,69 @@ class AlertManager:
             
             if is_anomaly:
                 # 실제 가격 변동 확인
-                changes = []
-                for asset in assets:
-                    if asset in self.data and 'daily_change_pct' in self.data[asset]:
-                        changes.append(self.data[asset]['daily_change_pct'])
+                changes = [self.data.get(asset, 'daily_change_pct') for asset in assets
+                           if asset in self.data]
                 
                 if len(changes) == 2:
                     asset1_name = self._get_asset_name(assets[0])
                     asset2_name = self._get_asset_name(assets[1])
-                    anomalies.append(
+                    anomalies.append(AlertMessage(
                         f"⚠️ 비정상 패턴: {asset1_name} {changes[0]:+.1f}% "
-                        f"& {asset2_name} {changes[1]:+.1f}% (상관계수: {corr:.2f})"
-                    )
+                        f"& {asset2_name} {changes[1]:+.1f}% (상관계수: {corr:.2f})",
+                        tuple(assets),
+                    ))
         
         if anomalies:
             self.alerts['level3'].extend(anomalies)
     
+    def _check_correlation_breaks(self):
+        """자동 탐지된 상관관계 이탈 (|z| 내림차순)"""
+        breaks = self.data.correlation_breaks
+        
+        for code1, code2, recent, baseline, z in breaks:
+            self.alerts['level3'].append(AlertMessage(
+                f"🔀 상관관계 이탈: {self._get_asset_name(code1)} & {self._get_asset_name(code2)} "
+                f"최근 {recent:+.2f} / 기준 {baseline:+.2f} (z={z:+.1f})",
+                (code1, code2),
+            ))
+    
+    def generate_intraday_alerts(self, store, volatility=None,
+                                 codes=None) -> Dict[str, List[Tuple[str, str]]]:
+        """장중 링버퍼 기반 알림 (자산 코드, 메시지) 목록 - codes가 있으면 해당 자산만 판단"""
+        window_minutes = INTRADAY_CONFIG['alert_window_minutes']
+        categories = {code: category for category, assets in self.assets.items() for code in assets}
+        alerts = {'level2': [], 'level3': []}
+        
+        buffers = store.items() if codes is None else ((code, store[code]) for code in codes if code in store)
+        for code, buffer in buffers:
+            change = buffer.window_change(window_minutes * 60)
+            if change is None:
+                continue
+            
+            # z-점수 방식: 구간 수익률 / (1봉 EWMA 변동성 × √구간 봉 수)
+            z = None
+            if volatility is not None and threshold_mode(categories.get(code, ''), code) == 'zscore':
+                bars = window_minutes * 60 / buffer.interval_seconds
+                z = volatility.zscore(f"{code}@{buffer.interval}", np.log1p(change / 100), bars)
+            
+            name = self._get_asset_name(code)
+            message = f"⏱️ {name} 최근 {window_minutes}분 {change:+.2f}% ({buffer.last_close:,.2f})"
+            if z is not None:
+                message += f" (z={z:+.1f})"
+                score, warning, emergency = abs(z), VOLATILITY_ALERTS['warning_z'], VOLATILITY_ALERTS['emergency_z']
+            else:
+                score = abs(change)
+                warning = config.ALERT_THRESHOLDS['warning']['intraday_change']
+                emergency = config.ALERT_THRESHOLDS['emergency']['intraday_change']
+            
+            message = AlertMessage(message, (code,))
+            if score >= emergency:
+                alerts['level3'].append((code, message))
+            elif score >= warning:
+                alerts['level2'].append((code, message))
+        
+        return alerts
+    
     def _get_asset_name(self, code: str) -> str:
         """자산 코드로 이름 찾기"""
         for category, assets in self.assets.items():
@@ -0,0 +1,248 @@
+"""
+히스토리 백필 모듈
+
+신규 자산이나 새 유니버스의 장기 히스토리(수십 년)를 채웁니다. 자산별 기간을 달력 연도 경계의
+구간으로 나누고, 구간들을 속도 제한(TokenBucket) 안에서 스레드 풀로 동시에 조회합니다.
+받은 구간은 메인 스레드에서 히스토리 저장소에 기록하므로 자산 인덱스에 동시 쓰기가 없고,
+기존 날짜는 유지하며 추가하기 때문에 같은 구간을 다시 받아도 결과가 바뀌지 않습니다.
+구간별 완료 여부는 매니페스트에 남겨 중단된 백필은 다음 실행에서 남은 구간만 조회하며,
+자산이 끝나면 구간이 빈틈/겹침 없이 이어졌는지 거래 캘린더 기준으로 검증합니다.
+
+    data/state/backfill_manifest.json
+        {"GOLD": {"ticker": "GC=F",
+                  "chunks": {"2000-01-01~2001-12-31": {"status": "done", "rows": 502, ...}}}}
+"""
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import BACKFILL_CONFIG, get_enabled_assets
+from data_collector import DataCollector
+from history_store import HistoryStore
+from market_calendar import MarketCalendar, calendar_for
+from percentiles import PercentileStore
+from rate_limiter import TokenBucket
+
+
+def plan_chunks(since: date, until: date, years: int) -> List[Tuple[date, date]]:
+    """since ~ until을 years년 단위 달력 연도 경계에 맞춘 구간으로 분할 (양끝 포함)
+
+    경계가 고정되어 있어 시작일이나 종료일이 달라도 가운데 구간은 같은 키로 재사용됩니다.
+    """
+    chunks = []
+    start = since
+    while start <= until:
+        boundary = date((start.year // years + 1) * years, 1, 1)
+        end = min(boundary - timedelta(days=1), until)
+        chunks.append((start, end))
+        start = end + timedelta(days=1)
+    return chunks
+
+
+def chunk_key(start: date, end: date) -> str:
+    return f"{start.isoformat()}~{end.isoformat()}"
+
+
+def find_gaps(dates: pd.DatetimeIndex, calendar: MarketCalendar, start: date, end: date,
+              max_gap_days: int) -> List[Tuple[str, str, int]]:
+    """start ~ end 거래일 중 연속으로 max_gap_days일을 넘게 빠진 구간 [(시작, 끝, 일수)]"""
+    days = pd.date_range(start, end, freq='D')
+    if not calendar.always_open:
+        days = days[[calendar.is_trading_day(d.date()) for d in days]]
+    if days.empty:
+        return []
+    missing = ~days.isin(pd.DatetimeIndex(dates).normalize())
+    # 누락 구간의 시작/끝 위치 (경계 차분)
+    edges = np.diff(np.concatenate(([0], missing.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return [
+        (days[s].strftime('%Y-%m-%d'), days[e - 1].strftime('%Y-%m-%d'), int(e - s))
+        for s, e in zip(starts, ends) if e - s > max_gap_days
+    ]
+
+
+class Backfiller:
+    """구간 병렬 백필 + 매니페스트 기반 재개 + 이음새 검증"""
+
+    def __init__(self, assets: Optional[Dict] = None, history: Optional[HistoryStore] = None,
+                 manifest_path: Optional[str] = None, fetch=None):
+        self.assets = assets if assets is not None else get_enabled_assets()
+        self.history = history or HistoryStore()
+        self.manifest_path = manifest_path or BACKFILL_CONFIG['manifest']
+        self.fetch = fetch or DataCollector.fetch_daily_range
+        self.limiter = TokenBucket(BACKFILL_CONFIG['rate'], BACKFILL_CONFIG['burst'])
+        self.manifest = self._load_manifest()
+
+    # ==================== 매니페스트 ====================
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ==================== 실행 ====================
+
+    def targets(self, codes: Optional[List[str]] = None) -> List[Tuple[str, str, MarketCalendar]]:
+        """백필 대상 (code, ticker, calendar) - 티커 없는 파생 자산/바스켓 제외"""
+        wanted = set(codes) if codes else None
+        targets = []
+        for category, members in self.assets.items():
+            for code, info in members.items():
+                ticker = info.get('spot_ticker') or info.get('ticker')
+                if ticker and (wanted is None or code in wanted):
+                    targets.append((code, ticker, calendar_for(category, info)))
+        if wanted:
+            unknown = wanted - {code for code, _, _ in targets}
+            if unknown:
+                print(f"⚠️  백필 대상이 아닌 자산 (미등록/비활성/티커 없음): {', '.join(sorted(unknown))}")
+        return targets
+
+    def run(self, since: Optional[date] = None, until: Optional[date] = None,
+            codes: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """남은 구간 조회 → 저장 → 자산별 검증 결과 {code: report}"""
+        since = since or date.fromisoformat(BACKFILL_CONFIG['since'])
+        until = until or date.today()
+        chunks = plan_chunks(since, until, BACKFILL_CONFIG['chunk_years'])
+        targets = self.targets(codes)
+
+        pending, remaining = [], {}
+        for code, ticker, _ in targets:
+            entry = self.manifest.setdefault(code, {'ticker': ticker, 'chunks': {}})
+            if entry['ticker'] != ticker:
+                # 티커가 바뀌면 이전 진행 기록은 무효
+                entry.update(ticker=ticker, chunks={})
+            # 이번 계획에 없는 구간(이전 실행의 마지막 구간 등)은 정리
+            planned = {chunk_key(*chunk) for chunk in chunks}
+            entry['chunks'] = {k: v for k, v in entry['chunks'].items() if k in planned}
+            todo = [c for c in chunks if entry['chunks'].get(chunk_key(*c), {}).get('status') != 'done']
+            remaining[code] = len(todo)
+            pending.extend((code, ticker, start, end) for start, end in todo)
+        self._save_manifest()
+
+        # 자산별로 번갈아 배치해 한 자산이 풀 전체를 오래 차지하지 않도록
+        pending.sort(key=lambda job: (job[2], job[0]))
+        total = len(chunks) * len(targets)
+        print(f"📦 백필: {len(targets)}개 자산, {since} ~ {until}, 구간 {total}개 "
+              f"(완료 {total - len(pending)}개 건너뜀, 조회 {len(pending)}개)")
+
+        reports = {}
+        for code, ticker, calendar in targets:
+            if remaining[code] == 0:
+                reports[code] = self.verify(code, calendar, chunks)
+
+        written = {code: 0 for code, _, _ in targets}
+        calendars = {code: calendar for code, _, calendar in targets}
+        executor = ThreadPoolExecutor(max_workers=BACKFILL_CONFIG['workers'])
+        try:
+            futures = {executor.submit(self._fetch_chunk, ticker, start, end): (code, start, end)
+                       for code, ticker, start, end in pending}
+            done_count = 0
+            while futures:
+                finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    code, start, end = futures.pop(future)
+                    written[code] += self._record(code, start, end, future)
+                    done_count += 1
+                    remaining[code] -= 1
+                    if remaining[code] == 0:
+                        reports[code] = self._finish(code, calendars[code], chunks, written[code])
+                if done_count and done_count % 20 == 0:
+                    print(f"   … {done_count}/{len(pending)} 구간 완료")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._save_manifest()
+        return reports
+
+    def _fetch_chunk(self, ticker: str, start: date, end: date) -> pd.DataFrame:
+        """구간 조회 (속도 제한 + 지수 백오프 재시도)"""
+        retries = BACKFILL_CONFIG['max_retries']
+        for attempt in range(retries + 1):
+            self.limiter.acquire()
+            try:
+                return self.fetch(ticker, start, end)
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _record(self, code: str, start: date, end: date, future) -> int:
+        """조회 결과를 히스토리에 기록하고 매니페스트 갱신 → 새로 기록한 행 수"""
+        key = chunk_key(start, end)
+        chunk = self.manifest[code]['chunks'].setdefault(key, {})
+        chunk['attempts'] = chunk.get('attempts', 0) + 1
+        try:
+            data = future.result()
+        except Exception as e:
+            chunk.update(status='failed', error=str(e)[:200])
+            print(f"❌ {code} {key} 조회 실패: {e}")
+            self._save_manifest()
+            return 0
+
+        # 구간 밖 행/중복 날짜는 이웃 구간과의 겹침으로 집계하고 버림
+        inside = (data.index >= pd.Timestamp(start)) & (data.index <= pd.Timestamp(end))
+        duplicated = data.index.duplicated(keep='last')
+        overlaps = int((~inside).sum() + (inside & duplicated).sum())
+        data = data[inside & ~duplicated]
+
+        rows = self.history.write(code, data, overwrite=False) if not data.empty else 0
+        chunk.update(status='done', rows=len(data), written=rows, overlaps=overlaps,
+                     first=data.index[0].strftime('%Y-%m-%d') if len(data) else None,
+                     last=data.index[-1].strftime('%Y-%m-%d') if len(data) else None)
+        chunk.pop('error', None)
+        self._save_manifest()
+        return rows
+
+    def _finish(self, code: str, calendar: MarketCalendar, chunks: List[Tuple[date, date]],
+                written: int) -> Dict:
+        """자산 백필 마무리: 델타 압축, 백분위 상태 재구성, 검증"""
+        if written:
+            self.history.compact(code)
+            try:
+                percentiles = PercentileStore(history=self.history)
+                percentiles.save(code, percentiles.build(code))
+            except ValueError:
+                pass
+        return self.verify(code, calendar, chunks)
+
+    # ==================== 검증 ====================
+
+    def verify(self, code: str, calendar: MarketCalendar, chunks: List[Tuple[date, date]]) -> Dict:
+        """구간 완료/겹침과 저장된 시계열의 공백 검증 결과"""
+        entries = self.manifest.get(code, {}).get('chunks', {})
+        keys = [chunk_key(*chunk) for chunk in chunks]
+        incomplete = [k for k in keys if entries.get(k, {}).get('status') != 'done']
+        overlaps = sum(entries.get(k, {}).get('overlaps', 0) for k in keys)
+
+        data = self.history.read(code)
+        report = {'rows': 0, 'first': None, 'last': None, 'incomplete': incomplete,
+                  'overlaps': overlaps, 'gaps': []}
+        if data is not None and not data.empty:
+            data = data[(data.index >= pd.Timestamp(chunks[0][0])) & (data.index <= pd.Timestamp(chunks[-1][1]))]
+        if data is not None and not data.empty:
+            report.update(rows=len(data), first=data.index[0].strftime('%Y-%m-%d'),
+                          last=data.index[-1].strftime('%Y-%m-%d'))
+            # 상장 이전은 공백이 아님: 첫 행부터 종료일까지 검사 (마지막 날은 미확정일 수 있음)
+            report['gaps'] = find_gaps(data.index, calendar, data.index[0].date(),
+                                       chunks[-1][1] - timedelta(days=1),
+                                       BACKFILL_CONFIG['max_gap_days'])
+
+        ok = not incomplete and not overlaps and not report['gaps']
+        line = (f"{'✅' if ok else '⚠️ '} {code} 백필 검증: {report['rows']:,}행"
+                f" ({report['first']} ~ {report['last']}), 미완료 구간 {len(incomplete)}, "
+                f"겹침 {overlaps}, 공백 {len(report['gaps'])}")
+        print(line)
+        for start, end, days in report['gaps'][:5]:
+            print(f"     공백: {start} ~ {end} ({days}거래일)")
+        return report
@@ -0,0 +1,147 @@
+"""
+가중 바스켓(합성 자산) 모듈
+
+ASSETS 항목의 'weights'로 정의한 바스켓(예: 귀금속, 아시아 통화)을 정렬된 종가 패널에서 계산합니다.
+리밸런싱 주기가 같은 바스켓은 (T x 구성 자산) @ (구성 자산 x 바스켓) 행렬곱 한 번으로 구간 수익률을 구하고,
+구간 끝 값을 누적곱으로 이어 기준값(base)에서 시작하는 지수로 만듭니다.
+결과는 패널에 일반 자산으로 추가되어 지표/알림/리포트를 그대로 통과합니다.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import get_enabled_assets
+from data_quality import AlignedPanel, OHLCV_COLUMNS
+
+# 리밸런싱 주기 → 기간 구분 (none: 시작일 비중으로 매수 후 보유)
+REBALANCE_PERIODS = {
+    'none': None,
+    'daily': 'D',
+    'weekly': 'W',
+    'monthly': 'M',
+    'quarterly': 'Q',
+}
+
+
+class Basket:
+    """바스켓 정의 (비중 합은 1로 정규화)"""
+
+    def __init__(self, code: str, weights: Dict[str, float], rebalance: str = 'monthly',
+                 base: float = 100.0):
+        if rebalance not in REBALANCE_PERIODS:
+            raise ValueError(f"바스켓 {code}: 지원하지 않는 리밸런싱 주기 {rebalance} "
+                             f"({', '.join(REBALANCE_PERIODS)})")
+        total = float(sum(weights.values()))
+        if not weights or total == 0:
+            raise ValueError(f"바스켓 {code}: 비중 합이 0입니다")
+        self.code = code
+        self.weights = {asset: float(w) / total for asset, w in weights.items()}
+        self.rebalance = rebalance
+        self.base = float(base)
+
+
+def basket_definitions(assets: Optional[Dict] = None) -> List[Basket]:
+    """활성 자산 중 바스켓 정의 (설정 순서)"""
+    assets = assets if assets is not None else get_enabled_assets()
+    return [
+        Basket(code, info['weights'], info.get('rebalance', 'monthly'), info.get('base', 100.0))
+        for members in assets.values()
+        for code, info in members.items()
+        if info.get('weights')
+    ]
+
+
+def _period_ids(dates: pd.DatetimeIndex, rebalance: str) -> np.ndarray:
+    """날짜별 리밸런싱 구간 번호 (0부터 연속)"""
+    freq = REBALANCE_PERIODS[rebalance]
+    if freq is None:
+        return np.zeros(len(dates), dtype=np.intp)
+    if freq == 'D':
+        return np.arange(len(dates), dtype=np.intp)
+    codes, _ = pd.factorize(dates.to_period(freq))
+    return codes.astype(np.intp)
+
+
+class BasketStage:
+    """정렬 패널에 바스켓 지수 추가"""
+
+    def __init__(self, baskets: Optional[List[Basket]] = None):
+        self.baskets = baskets if baskets is not None else basket_definitions()
+
+    def apply(self, panel: AlignedPanel) -> AlignedPanel:
+        """바스켓을 계산해 패널에 열로 추가한 새 패널 반환"""
+        if not self.baskets or not panel.codes:
+            return panel
+
+        groups = defaultdict(list)
+        for basket in self.baskets:
+            missing = [c for c in basket.weights if c not in panel.index]
+            if missing:
+                print(f"⚠️  바스켓 {basket.code} 건너뜀: 구성 자산 없음 ({', '.join(missing)})")
+                continue
+            groups[basket.rebalance].append(basket)
+
+        codes, closes, masks, frames = [], [], [], {}
+        for rebalance, members in groups.items():
+            levels, observed = self._evaluate(panel, members, rebalance)
+            for b, basket in enumerate(members):
+                codes.append(basket.code)
+                closes.append(levels[:, b])
+                masks.append(observed[:, b])
+                frames[basket.code] = self._to_frame(panel.dates, levels[:, b], observed[:, b])
+
+        if codes:
+            print(f"🧺 바스켓 {len(codes)}개 계산: {', '.join(codes)}")
+        return panel.extend(codes, closes, masks, frames)
+
+    @staticmethod
+    def _evaluate(panel: AlignedPanel, baskets: List[Basket], rebalance: str):
+        """리밸런싱 주기가 같은 바스켓들의 지수 (T x B) 와 관측 마스크"""
+        constituents = sorted({c for basket in baskets for c in basket.weights}, key=panel.index.get)
+        columns = [panel.index[c] for c in constituents]
+        position = {c: k for k, c in enumerate(constituents)}
+        weights = np.zeros((len(constituents), len(baskets)))
+        for b, basket in enumerate(baskets):
+            for asset, w in basket.weights.items():
+                weights[position[asset], b] = w
+
+        prices = panel.close[:, columns]
+        T = len(panel.dates)
+        levels = np.full((T, len(baskets)), np.nan)
+        held = weights != 0
+        observed = (panel.observed[:, columns].astype(np.float64) @ held) > 0
+
+        # 그룹 공통 시작일: 구성 자산이 모두 가격을 가진 첫 날
+        complete = np.isfinite(prices).all(axis=1)
+        if not complete.any():
+            return levels, np.zeros_like(observed)
+        start = int(np.argmax(complete))
+        prices = prices[start:]
+
+        # 구간 k의 기준가 = 구간 k-1 마지막 날 종가 (첫 구간은 시작일)
+        period = _period_ids(panel.dates[start:], rebalance)
+        n_periods = int(period[-1]) + 1
+        last_row = np.searchsorted(period, np.arange(n_periods), side='right') - 1
+        anchor_row = np.concatenate([[0], last_row[:-1]])
+        relative = prices / prices[anchor_row[period]]
+
+        growth = relative @ weights                     # (T', B) 구간 내 누적 수익
+        chain = np.vstack([np.ones(len(baskets)), np.cumprod(growth[last_row[:-1]], axis=0)])
+        base = np.array([basket.base for basket in baskets])
+        levels[start:] = base * chain[period] * growth
+
+        observed[:start] = False
+        return levels, observed
+
+    @staticmethod
+    def _to_frame(dates: pd.DatetimeIndex, levels: np.ndarray, mask: np.ndarray) -> pd.DataFrame:
+        """관측된 날짜만 OHLCV 프레임으로 (바스켓은 종가 지수만 있으므로 OHLC 동일)"""
+        values = levels[mask]
+        frame = pd.DataFrame({
+            'close': values,
+            'open': values,
+            'high': values,
+            'low': values,
+            'volume': np.zeros(len(values)),
+        }, index=dates[mask])
+        return frame[OHLCV_COLUMNS]
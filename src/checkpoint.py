@@ -0,0 +1,71 @@
+"""
+실행 단계 체크포인트 모듈
+
+각 단계(수집, 처리, 알림 생성, 리포트, 발송)의 결과를 실행 ID별 디렉터리에 바이너리(pickle)로 저장합니다.
+`--resume` 실행 시 마지막으로 완료된 단계 다음부터 이어서 진행하므로,
+발송 단계만 실패한 경우 재수집/재계산 없이 몇 초 만에 복구할 수 있습니다.
+"""
+import os
+import pickle
+import shutil
+from typing import Any, Optional
+from config import CHECKPOINT_CONFIG
+
+# 실행 순서대로의 단계 이름
+STAGES = ('collect', 'process', 'alerts', 'report', 'notify')
+
+
+class CheckpointStore:
+    """실행 ID(및 실행 범위)별 단계 체크포인트 저장소"""
+
+    def __init__(self, run_id: str, scope: str = 'main', base_dir: Optional[str] = None):
+        self.base_dir = base_dir or CHECKPOINT_CONFIG['dir']
+        self.run_id = run_id
+        self.run_dir = os.path.join(self.base_dir, run_id, scope)
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.run_dir, f"{stage}.pkl")
+
+    def save(self, stage: str, payload: Any):
+        """단계 결과 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(self.run_dir, exist_ok=True)
+        filepath = self._path(stage)
+        tmp_path = filepath + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, filepath)
+
+    def load(self, stage: str) -> Optional[Any]:
+        """단계 결과 로딩 (없으면 None)"""
+        filepath = self._path(stage)
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'rb') as f:
+            return pickle.load(f)
+
+    def has(self, stage: str) -> bool:
+        return os.path.exists(self._path(stage))
+
+    def last_completed(self) -> Optional[str]:
+        """연속으로 완료된 마지막 단계 (없으면 None)"""
+        last = None
+        for stage in STAGES:
+            if not self.has(stage):
+                break
+            last = stage
+        return last
+
+    def clear(self):
+        """이 실행 ID/범위의 체크포인트 삭제 (같은 실행 ID로 새로 시작할 때 이전 단계 결과 무효화)"""
+        shutil.rmtree(self.run_dir, ignore_errors=True)
+
+    def prune(self, keep: Optional[int] = None):
+        """오래된 실행 ID 디렉터리 정리 (최근 keep개 유지)"""
+        keep = keep or CHECKPOINT_CONFIG['keep_runs']
+        if not os.path.isdir(self.base_dir):
+            return
+        runs = sorted(d for d in os.listdir(self.base_dir)
+                      if os.path.isdir(os.path.join(self.base_dir, d)))
+        for run_id in runs[:-keep]:
+            if run_id != self.run_id:
+                shutil.rmtree(os.path.join(self.base_dir, run_id), ignore_errors=True)
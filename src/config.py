@@ -194,9 +194,67 @@ ASSETS = {
             'icon': '♦️',
             'enabled': False
         },
+    },
+    
+    # 파생 자산: 수집된 자산으로 계산 (추가 조회 없음, 수식은 자산 코드와 + - * / ** 괄호)
+    'derived': {
+        'KRW_JPY': {
+            'name': '원/100엔',
+            'formula': 'USD_KRW / USD_JPY * 100',
+            'icon': '💴',
+            'enabled': True
+        },
+        'EUR_KRW': {
+            'name': '유로/원',
+            'formula': 'EUR_USD * USD_KRW',
+            'icon': '💶',
+            'enabled': True
+        },
+        'GOLD_KRW_G': {
+            'name': '금 (원/g)',
+            'formula': 'GOLD * USD_KRW / 31.1035',   # 1 트로이온스 = 31.1035g
+            'unit': 'g',
+            'icon': '💰',
+            'enabled': True
+        },
+    },
+    
+    # 바스켓: 구성 자산 비중(합은 1로 정규화), 리밸런싱 주기(none/daily/weekly/monthly/quarterly), 기준값
+    'baskets': {
+        'PRECIOUS_METALS': {
+            'name': '귀금속 바스켓',
+            'weights': {'GOLD': 0.7, 'SILVER': 0.3},
+            'rebalance': 'monthly',
+            'base': 100,
+            'icon': '🧺',
+            'enabled': True
+        },
+        'ENERGY': {
+            'name': '에너지 바스켓',
+            'weights': {'CRUDE_OIL': 0.4, 'BRENT_OIL': 0.4, 'NATURAL_GAS': 0.2},
+            'rebalance': 'monthly',
+            'base': 100,
+            'icon': '🧺',
+            'enabled': False     # 구성 자산을 모두 활성화한 뒤 사용
+        },
+        'ASIA_FX': {
+            'name': '아시아 통화 바스켓 (달러 대비)',
+            'weights': {'USD_KRW': 0.5, 'USD_JPY': 0.5},
+            'rebalance': 'quarterly',
+            'base': 100,
+            'icon': '🧺',
+            'enabled': True
+        },
     }
 }
 
+# 외부 유니버스 파일 (CSV/YAML/JSON) - 지정하면 위 ASSETS 대신 사용
+# 실행 시 --universe 옵션으로도 지정 가능
+UNIVERSE_FILE = os.getenv('UNIVERSE_FILE', '')
+if UNIVERSE_FILE:
+    from universe import load_universe
+    ASSETS = load_universe(UNIVERSE_FILE)
+
 # 활성화된 자산만 필터링하는 헬퍼 함수
 def get_enabled_assets():
     """활성화된 자산만 반환"""
@@ -239,18 +297,173 @@ ALERT_THRESHOLDS = {
     'warning': {
         'daily_change': 2.0,      # 일간 변동률 ±2%
         'weekly_change': 5.0,     # 주간 변동률 ±5%
+        'intraday_change': 2.0,   # 장중 최근 구간 변동률 ±2%
     },
     # Level 3: 긴급 알림
     'emergency': {
         'daily_change': 3.0,      # 일간 변동률 ±3%
         'weekly_change': 7.0,     # 주간 변동률 ±7%
         '52w_extreme': True,      # 52주 최고/최저 경신
+        'intraday_change': 3.0,   # 장중 최근 구간 변동률 ±3%
     }
 }
 
+# 변동성 정규화(z-점수) 임계값: 고정 ±% 대신 |수익률 / EWMA 변동성| 기준
+# 방식 선택 우선순위: assets > categories > default_mode ('fixed' 또는 'zscore')
+VOLATILITY_ALERTS = {
+    'lambda': 0.94,               # EWMA 감쇠 계수 (RiskMetrics)
+    'warning_z': 2.0,             # 주의 알림 |z|
+    'emergency_z': 3.0,           # 긴급 알림 |z|
+    'min_observations': 20,       # z-점수 사용 전 최소 관측 수
+    'default_mode': 'fixed',
+    'categories': {
+        'cryptocurrencies': 'zscore',
+    },
+    'assets': {
+        'NATURAL_GAS': 'zscore',
+        'EUR_USD': 'zscore',
+    },
+    'state_file': os.path.join(DATA_DIR, 'state', 'ewma_volatility.json'),
+}
+
+# 과거 분포 백분위: 기간 창별 정렬 배열을 보존하고 현재가 위치를 계산
+PERCENTILE_CONFIG = {
+    'windows': [1, 3, 5, 10],     # 창 길이 (년)
+    'min_coverage': 0.9,          # 창 길이 대비 데이터가 이 비율 미만이면 표시하지 않음
+    'alert_window': 5,            # 알림 판단 창 (년)
+    'warning': 95.0,              # 주의: 백분위 95 이상 / 5 이하
+    'emergency': 99.0,            # 긴급: 백분위 99 이상 / 1 이하
+    'dir': os.path.join(DATA_DIR, 'state', 'percentiles'),
+}
+
+# ==================== 장중(인트라데이) 설정 ====================
+# 자산별 간격은 ASSETS 항목에 'intraday_interval': '1m' 처럼 지정 (없으면 기본값)
+INTRADAY_CONFIG = {
+    'default_interval': '5m',      # 1m, 5m, 15m, 1h
+    'buffer_size': 1024,           # 자산별 링버퍼 크기 (최근 N개 봉, 메모리 고정)
+    'fetch_period': '1d',          # 폴링 시 요청 기간
+    'poll_seconds': 60,            # 폴링 주기 (초)
+    'alert_window_minutes': 60,    # 장중 알림 판단 구간 (최근 1시간)
+}
+
+# ==================== 틱 수신(푸시) 설정 ====================
+# 상위 프로세스가 라인 프로토콜로 틱/봉을 밀어 넣는 로컬 수신 엔드포인트 (--ingest)
+INGEST_CONFIG = {
+    'host': '127.0.0.1',
+    'port': int(os.getenv('INGEST_PORT', '8766')),
+    'unix_socket': os.getenv('INGEST_SOCKET', ''),   # 지정하면 TCP 대신 유닉스 소켓
+    'max_batch_lines': 200000,     # 한 번에 처리하는 최대 라인 수 (대기 중인 수신분을 모아서 처리)
+    'roll_up_seconds': 300,        # 완료된 일자 히스토리 반영/변동성 상태 저장 주기
+}
+
+# ==================== 히스토리 저장 설정 ====================
+# 자산별 일별 델타(변경 행만) + 연도별 세그먼트 (git 커밋 diff 최소화)
+HISTORY_CONFIG = {
+    'dir': os.path.join(DATA_DIR, 'history'),
+    'compact_after': 30,           # 델타 파일이 이 개수에 도달하면 연도별 세그먼트로 압축
+    # 자산별 마지막 네트워크 조회 시각 (커밋하지 않는 상태 디렉터리 - 매일 index.json이 바뀌지 않도록)
+    'fetched_dir': os.path.join(DATA_DIR, 'state', 'fetched'),
+}
+
+# ==================== 히스토리 백필 설정 ====================
+# 신규 자산/유니버스의 장기 히스토리 채우기 (--backfill): 구간 병렬 조회 + 진행 매니페스트로 재개
+BACKFILL_CONFIG = {
+    'since': '2000-01-01',         # 기본 시작일
+    'chunk_years': 2,              # 조회 구간 길이 (년, 달력 연도 경계에 맞춤)
+    'workers': 4,                  # 동시 조회 수
+    'rate': 2.0,                   # 초당 조회 수 (Yahoo Finance 부하 제한)
+    'burst': 4,
+    'max_retries': 3,              # 구간별 재시도 횟수 (실패 구간은 다음 실행에서 다시 시도)
+    'max_gap_days': 5,             # 검증 시 허용하는 연속 누락 거래일 수 (초과하면 공백으로 보고)
+    'manifest': os.path.join(DATA_DIR, 'state', 'backfill_manifest.json'),
+}
+
+# ==================== 시세 제공자 설정 ====================
+# 자산이 지원하는 제공자 중 건강 점수(예상 지연: 지연 중앙값 + 실패율 × 실패 비용) 순으로 조회하고, 1순위가 느리면 다음 제공자에 헤지 요청
+# Alpha Vantage는 ALPHA_VANTAGE_API_KEY가 있을 때만 사용 (환율/암호화폐/WTI·브렌트·천연가스)
+PROVIDER_CONFIG = {
+    'providers': ['yahoo', 'alpha_vantage'],  # 사용할 제공자 (점수가 같으면 이 순서)
+    'hedge_percentile': 90,        # 1순위 응답이 최근 지연의 이 백분위를 넘기면 헤지 요청
+    'hedge_min_seconds': 0.5,      # 헤지 대기 하한/상한 (초)
+    'hedge_max_seconds': 8.0,
+    'default_hedge_seconds': 3.0,  # 지연 표본이 부족할 때 헤지 대기
+    'min_samples': 10,             # 백분위 계산에 필요한 최소 지연 표본 수
+    'latency_samples': 200,        # 제공자별 보관하는 최근 지연 표본 수
+    'success_alpha': 0.02,         # 성공률 EWMA 가중치 (한두 번의 실패로 순위가 뒤집히지 않도록 작게)
+    'failure_penalty_seconds': 1.0,  # 점수(예상 지연) = 지연 중앙값 + 실패율 × 이 값, 낮을수록 우선
+    'request_timeout': 15,         # 제공자 요청 1건 제한 시간 (초)
+    'deadline_seconds': 30,        # 자산 1개 조회 전체 제한 시간 (초과 시 저장된 히스토리 사용)
+    'workers': 8,
+    'health_file': os.path.join(DATA_DIR, 'state', 'provider_health.json'),
+}
+
+# ==================== 조회 응답 캐시 설정 ====================
+# 일봉은 당일 자정까지, 휴장 중에는 다음 장 시작까지 캐시 (같은 날 재실행 시 네트워크 호출 없음)
+FETCH_CACHE = {
+    'enabled': os.getenv('FETCH_CACHE', '1') != '0',
+    'dir': os.path.join(DATA_DIR, 'cache'),
+    'max_bytes': 200 * 1024 * 1024,        # 캐시 전체 용량 한도 (초과 시 LRU 제거)
+    'intraday_ttl_seconds': 30,            # 장중 봉 캐시 유지 시간 (장 운영 중)
+    'negative_min_failures': 3,            # 이 횟수만큼 연속 실패한 티커부터 재확인 간격 적용 (일시 장애는 제외)
+    'negative_base_seconds': 3600,         # 실패 티커 첫 재확인 간격 (이후 2배씩 증가)
+    'negative_max_seconds': 7 * 24 * 3600, # 재확인 간격 상한
+}
+
+# ==================== 거래 캘린더 설정 ====================
+# 거래일 D의 세션: D-1일 open ~ D일 close (거래소 현지 시각, open >= close면 전날 저녁 개장)
+# 마지막 조회 이후 열린 세션이 없으면 조회를 건너뛰고 저장된 히스토리를 사용
+# 자산별로 다르게 하려면 ASSETS 항목에 'calendar': 'cme' 처럼 지정
+MARKET_CALENDARS = {
+    'calendars': {
+        # CME Globex: 일~금 17:00-16:00 CT (미국 거래소 휴일은 전체 휴장으로 근사)
+        'cme': {
+            'timezone': 'America/Chicago',
+            'open': '17:00',
+            'close': '16:00',
+            'holidays': [
+                '2025-01-01', '2025-01-20', '2025-02-17', '2025-04-18', '2025-05-26',
+                '2025-06-19', '2025-07-04', '2025-09-01', '2025-11-27', '2025-12-25',
+                '2026-01-01', '2026-01-19', '2026-02-16', '2026-04-03', '2026-05-25',
+                '2026-06-19', '2026-07-03', '2026-09-07', '2026-11-26', '2026-12-25',
+                '2027-01-01', '2027-01-18', '2027-02-15', '2027-03-26', '2027-05-31',
+                '2027-06-18', '2027-07-05', '2027-09-06', '2027-11-25', '2027-12-24',
+            ],
+        },
+        # 외환: 24/5 (뉴욕 일요일 17:00 ~ 금요일 17:00)
+        'fx': {
+            'timezone': 'America/New_York',
+            'open': '17:00',
+            'close': '17:00',
+            'holidays': ['2025-12-25', '2026-01-01', '2026-12-25', '2027-01-01'],
+        },
+        # 암호화폐: 24/7
+        'crypto': {'always_open': True},
+    },
+    'categories': {
+        'commodities': 'cme',
+        'currencies': 'fx',
+        'cryptocurrencies': 'crypto',
+    },
+    'default': 'crypto',           # 매핑 없는 카테고리는 항상 조회
+    'settle_minutes': 30,          # 장 마감 후 일봉 확정까지 대기
+}
+
 # ==================== 이동평균선 설정 ====================
 MOVING_AVERAGES = [5, 20, 60, 120]
 
+# ==================== 기술적 지표 설정 ====================
+INDICATOR_CONFIG = {
+    'enabled': ['rsi', 'macd', 'bollinger', 'atr', 'ema', 'volatility'],
+    'rsi_period': 14,
+    'macd': (12, 26, 9),          # (단기 EMA, 장기 EMA, 시그널)
+    'bollinger': (20, 2.0),       # (기간, 표준편차 배수)
+    'atr_period': 14,
+    'ema_periods': [12, 26],      # MACD와 같은 기간은 중간값 공유
+    'volatility_window': 20,      # 연율화 변동성 계산 구간
+    'rsi_overbought': 70,         # RSI 과매수 (주의 알림)
+    'rsi_oversold': 30,           # RSI 과매도 (주의 알림)
+}
+
 # ==================== 상관관계 설정 ====================
 CORRELATION_PATTERNS = {
     'USD_KRW_GOLD': {
@@ -267,6 +480,30 @@ CORRELATION_PATTERNS = {
     },
 }
 
+# 상관관계 계산 방식 (자산 수가 tiled_threshold를 넘으면 타일 방식 사용)
+CORRELATION_CONFIG = {
+    'window': 60,                 # 최근 상관관계 구간 (거래일)
+    'min_periods': 21,            # 쌍별 최소 공통 관측 수
+    'tiled_threshold': 200,       # 이 자산 수 초과 시 타일 계산 + 상위 K개만 보관
+    'tile_size': 256,             # 타일 한 변의 자산 수
+    'top_k': 50,                  # 보관할 상위 쌍/이탈 쌍 개수
+    'baseline_window': 250,       # 장기 기준 상관관계 구간
+}
+
+# 전체 쌍 상관관계 이탈 자동 탐지 (최근 구간 vs 장기 기준)
+CORRELATION_BREAK_CONFIG = {
+    'enabled': True,
+    'recent_window': 20,          # 최근 상관관계 구간 (거래일)
+    'baseline_window': 250,       # 장기 기준 구간 (거래일)
+    'min_periods': 15,            # 쌍별 최소 공통 관측 수
+    'dispersion_halflife': 60,    # 과거 이탈 분산의 지수가중 반감기 (거래일)
+    'min_dispersion_samples': 60, # z-점수를 내기 전 쌍별로 필요한 과거 이탈 표본 수
+    'z_threshold': 3.0,           # 유의한 이탈로 볼 |z| 기준
+    'max_results': 20,            # 반환/알림할 최대 쌍 수
+    'state_dir': os.path.join(DATA_DIR, 'state'),
+    'stale_state_days': 7,        # 이 기간 갱신되지 않은 (자산 구성이 바뀐) 상태 파일 삭제
+}
+
 # ==================== 데이터 기간 설정 ====================
 LOOKBACK_PERIODS = {
     'daily': 7,
@@ -280,9 +517,77 @@ ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', '')
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
 
+# ==================== 알림 분배(다중 구독자) 설정 ====================
+# 구독자 파일 형식은 src/subscribers.py 참조 (없으면 TELEGRAM_CHAT_ID 하나로 발송)
+FANOUT_CONFIG = {
+    'subscribers_file': os.getenv('SUBSCRIBERS_FILE', ''),
+    'api_base': os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org'),
+    'workers': 16,                 # 동시 발송 스레드 수
+    'global_rate': 30,             # 전역 초당 메시지 수 (텔레그램 봇 제한)
+    'global_burst': 30,
+    'per_chat_interval': 1.0,      # 같은 채팅방 최소 발송 간격 (초)
+    'max_retries': 3,              # 429 응답 재시도 횟수
+    'max_document_bytes': 50 * 1024 * 1024,  # 봇 API 파일 업로드 한도 (초과 파일은 발송하지 않음)
+    # 리포트 내용 해시 → file_id, 채팅방별 마지막 발송 내용 (바뀌지 않은 리포트는 다시 보내지 않음)
+    'document_index': os.path.join(DATA_DIR, 'state', 'telegram_documents.json'),
+    'document_index_size': 500,    # 보관할 file_id 수 (최근 사용 순)
+}
+
 # ==================== 엑셀 리포트 설정 ====================
 EXCEL_CONFIG = {
     'daily_update': True,
     'weekly_summary': True,
     'monthly_summary': True,
 }
+
+# ==================== 실행 체크포인트 설정 ====================
+CHECKPOINT_CONFIG = {
+    'dir': os.path.join(DATA_DIR, 'checkpoints'),  # 실행 ID별 단계 결과 (--resume 재개용)
+    'keep_runs': 7,                                # 보관할 최근 실행 수
+}
+
+# ==================== 조회 서비스 설정 ====================
+# --serve 실행 시 최신 처리 결과를 로컬 HTTP/JSON으로 제공 (읽기 전용)
+QUERY_SERVICE_CONFIG = {
+    'host': '127.0.0.1',
+    'port': int(os.getenv('QUERY_SERVICE_PORT', '8765')),
+    'refresh_minutes': 0,          # 0이면 1회 실행 후 서비스만 유지, 양수면 주기적으로 재실행
+}
+
+# ==================== 리포트 출력 설정 ====================
+REPORT_CONFIG = {
+    # 출력 포맷: xlsx, html, json, csv (실행 시 --formats 로 변경 가능)
+    'formats': [f for f in os.getenv('REPORT_FORMATS', 'xlsx').split(',') if f],
+    'parallel': True,             # 포맷별 렌더러 병렬 실행 (그룹별 분할 시 프로세스 풀)
+    # 파일 분할: none, category(카테고리별), groups(아래 groups 기준), auto(자산이 split_min_assets개 초과면 category)
+    'split': os.getenv('REPORT_SPLIT', 'auto'),
+    'split_min_assets': 60,
+    'groups': {},                 # split='groups'일 때 {그룹 이름: [자산 코드]} (어디에도 없는 자산은 'others')
+    'max_assets_per_part': 200,   # 그룹이 이보다 크면 여러 파일로 나눔
+    'workers': None,              # 리포트 생성 프로세스 수 (None이면 CPU 코어 수)
+    'bundle': os.getenv('REPORT_BUNDLE', '0') == '1',  # 리포트 파일을 zip으로 묶어 발송
+}
+
+# ==================== 추이 스파크라인 설정 ====================
+# 정렬 패널에서 자산별 추이선을 한 캔버스에 일괄 래스터화 (Pillow/matplotlib 불필요)
+SPARKLINE_CONFIG = {
+    'enabled': True,
+    'windows': {'7D': 7, '3M': 91, '1Y': 365},  # 창 이름(이미지 머리글, 영문/숫자) → 달력 일수
+    'width': 96,                  # 추이선 1칸 너비 (px)
+    'height': 24,                 # 추이선 높이 (px)
+    'font_scale': 2,              # 내장 3x5 비트맵 글꼴 배율 (자산 코드/변동률 표시)
+    'grid_columns': 0,            # 합성 이미지의 자산 열 수 (0이면 자산 수에 맞춰 자동)
+    'png_level': 6,               # PNG 압축 수준 (zlib)
+    'text_width': 12,             # 리포트 표의 텍스트 스파크라인 글자 수
+    'message_text': True,         # 일일 리포트 메시지 줄에 최근 종가 텍스트 스파크라인 추가
+    'excel_image': True,          # 엑셀 추이 시트에 합성 이미지 삽입 (Pillow 설치 시)
+    'send_image': os.getenv('SPARKLINE_IMAGE', '1') == '1',  # 합성 PNG를 리포트와 함께 발송
+}
+
+# ==================== 설정 핫 리로드 ====================
+# 장기 실행(--serve/--intraday/--ingest) 중 외부 설정 파일(JSON/YAML)을 감시해 바뀐 부분만 다시 계산
+# 파일에는 ASSETS/ALERT_THRESHOLDS/MOVING_AVERAGES/CORRELATION_PATTERNS 중 바꿀 값만 적음 (위 기본값에 덮어씀)
+CONFIG_RELOAD = {
+    'file': os.getenv('CONFIG_FILE', ''),  # 비어 있으면 감시하지 않음
+    'poll_seconds': 5,                     # 파일 변경 확인 주기 (초)
+}
@@ -0,0 +1,215 @@
+"""
+설정 핫 리로드 모듈
+
+장기 실행(--serve/--intraday/--ingest) 중 외부 설정 파일(JSON/YAML)을 감시하다가 바뀌면
+config.py 기본값 위에 파일 내용을 덮어쓴 새 설정을 config 모듈에 반영합니다.
+각 모듈은 아래 항목을 사용 시점에 config에서 읽으므로 재시작 없이 다음 계산부터 새 값이 쓰이고,
+이전/새 설정의 차이(ConfigChange)로 영향받는 부분만 다시 계산합니다.
+
+    - 새로 켠 자산(또는 티커 등이 바뀐 자산): 해당 자산만 수집/처리
+    - 알림 기준/상관관계 패턴: 보관 중인 처리 결과로 알림만 다시 판단
+    - 이동평균 기간: 추가된 기간만 계산하고 빠진 기간은 삭제
+
+    config/overrides.yaml (CONFIG_FILE)
+        ALERT_THRESHOLDS: {warning: {daily_change: 1.5}}
+        MOVING_AVERAGES: [5, 20, 60, 120, 200]
+        ASSETS: {commodities: {COPPER: {enabled: false}}}
+
+파일에서 항목을 지우면 해당 항목은 기본값으로 돌아갑니다.
+"""
+import copy
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set
+import config
+from config import CONFIG_RELOAD
+
+# 다시 읽을 수 있는 설정 항목
+RELOADABLE = ('ASSETS', 'ALERT_THRESHOLDS', 'MOVING_AVERAGES', 'CORRELATION_PATTERNS')
+
+# 바뀌어도 다시 수집할 필요 없는 자산 항목 (표시용)
+DISPLAY_KEYS = {'name', 'icon', 'unit', 'enabled'}
+
+
+def snapshot() -> Dict:
+    """현재 적용 중인 리로드 대상 설정 (깊은 복사)"""
+    return {name: copy.deepcopy(getattr(config, name)) for name in RELOADABLE}
+
+
+def merge(base, override):
+    """dict는 키별로 재귀 병합, 그 외(리스트/스칼라)는 덮어씀"""
+    if isinstance(base, dict) and isinstance(override, dict):
+        merged = copy.deepcopy(base)
+        for key, value in override.items():
+            merged[key] = merge(base[key], value) if key in base else copy.deepcopy(value)
+        return merged
+    return copy.deepcopy(override)
+
+
+def load_overrides(path: str) -> Dict:
+    """설정 파일 읽기 + 검증 → {항목: 덮어쓸 값}"""
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding='utf-8') as f:
+        if ext in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("YAML 설정 파일을 읽으려면 PyYAML이 필요합니다: pip install pyyaml")
+            overrides = yaml.safe_load(f)
+        elif ext == '.json':
+            overrides = json.load(f)
+        else:
+            raise ValueError(f"지원하지 않는 설정 파일 형식: {ext} (json/yaml)")
+
+    overrides = overrides or {}
+    if not isinstance(overrides, dict):
+        raise ValueError("설정 파일 최상위는 {항목: 값} 형태여야 합니다")
+    unknown = set(overrides) - set(RELOADABLE)
+    if unknown:
+        raise ValueError(f"다시 읽을 수 없는 설정 항목: {', '.join(sorted(unknown))} "
+                         f"(가능: {', '.join(RELOADABLE)})")
+    periods = overrides.get('MOVING_AVERAGES')
+    if periods is not None and (not isinstance(periods, list) or
+                                not all(isinstance(p, int) and p > 0 for p in periods)):
+        raise ValueError("MOVING_AVERAGES는 양의 정수 목록이어야 합니다")
+    for name in ('ASSETS', 'ALERT_THRESHOLDS', 'CORRELATION_PATTERNS'):
+        if name in overrides and not isinstance(overrides[name], dict):
+            raise ValueError(f"{name}은(는) dict여야 합니다")
+    return overrides
+
+
+class ConfigChange:
+    """이전/새 설정 차이"""
+
+    def __init__(self):
+        self.added: Set[str] = set()      # 새로 켰거나 수집 항목(티커 등)이 바뀐 자산 → 수집/처리
+        self.removed: Set[str] = set()    # 껐거나 수집 항목이 바뀐 자산 → 결과/상태 정리
+        self.relabeled: Set[str] = set()  # 이름/아이콘만 바뀐 자산 → 알림 문구만
+        self.rules: Set[str] = set()      # 바뀐 알림 규칙 항목 (ALERT_THRESHOLDS, CORRELATION_PATTERNS)
+        self.ma_added: List[int] = []
+        self.ma_removed: List[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.relabeled or self.rules
+                    or self.ma_added or self.ma_removed)
+
+    @property
+    def changed(self) -> Set[str]:
+        """수집 항목이 바뀐 자산 (기존 결과/링버퍼를 버리고 다시 수집)"""
+        return self.added & self.removed
+
+    def __str__(self) -> str:
+        parts = []
+        if self.added - self.removed:
+            parts.append(f"자산 추가 {', '.join(sorted(self.added - self.removed))}")
+        if self.removed - self.added:
+            parts.append(f"자산 제외 {', '.join(sorted(self.removed - self.added))}")
+        if self.changed:
+            parts.append(f"자산 변경 {', '.join(sorted(self.changed))}")
+        if self.relabeled:
+            parts.append(f"표시 변경 {len(self.relabeled)}개")
+        if self.rules:
+            parts.append(f"알림 규칙 {', '.join(sorted(self.rules))}")
+        if self.ma_added or self.ma_removed:
+            parts.append(f"이동평균 +{self.ma_added} -{self.ma_removed}")
+        return ' / '.join(parts) or '변경 없음'
+
+
+def _enabled(assets: Dict) -> Dict:
+    """활성 자산 {code: (category, info)}"""
+    return {
+        code: (category, info)
+        for category, members in assets.items()
+        for code, info in members.items()
+        if info.get('enabled', True)
+    }
+
+
+def _data_keys(info: Dict) -> Dict:
+    return {key: value for key, value in info.items() if key not in DISPLAY_KEYS}
+
+
+def diff_config(old: Dict, new: Dict) -> ConfigChange:
+    """두 설정 스냅샷 비교 → 다시 계산할 범위"""
+    change = ConfigChange()
+    before, after = _enabled(old['ASSETS']), _enabled(new['ASSETS'])
+    for code, (category, info) in after.items():
+        if code not in before:
+            change.added.add(code)
+            continue
+        prev_category, prev = before[code]
+        if category != prev_category or _data_keys(info) != _data_keys(prev):
+            change.added.add(code)
+            change.removed.add(code)
+        elif info != prev:
+            change.relabeled.add(code)
+    change.removed |= set(before) - set(after)
+
+    change.rules = {name for name in ('ALERT_THRESHOLDS', 'CORRELATION_PATTERNS') if old[name] != new[name]}
+    old_periods, new_periods = set(old['MOVING_AVERAGES']), set(new['MOVING_AVERAGES'])
+    change.ma_added = sorted(new_periods - old_periods)
+    change.ma_removed = sorted(old_periods - new_periods)
+    return change
+
+
+class ConfigWatcher:
+    """설정 파일 감시 (수정 시각/크기가 바뀌면 다시 읽어 config에 반영)"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = CONFIG_RELOAD['file'] if path is None else path
+        self.poll_seconds = CONFIG_RELOAD['poll_seconds']
+        # 파일을 덮어쓸 기준값 (config.py 또는 --universe 로 읽은 자산)
+        self.defaults = snapshot()
+        self.signature = None
+
+    def poll(self) -> Optional[ConfigChange]:
+        """파일이 바뀌었으면 새 설정을 반영하고 변경 내역 반환 (없거나 읽기 실패면 None)"""
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if signature == self.signature:
+            return None
+        self.signature = signature
+
+        try:
+            overrides = load_overrides(self.path) if signature else {}
+        except Exception as e:
+            print(f"⚠️  설정 파일 오류 - 이전 설정 유지: {e}")
+            return None
+
+        new = {
+            name: merge(self.defaults[name], overrides[name]) if name in overrides
+            else copy.deepcopy(self.defaults[name])
+            for name in RELOADABLE
+        }
+        change = diff_config(snapshot(), new)
+        for name in RELOADABLE:
+            setattr(config, name, new[name])
+        if not change:
+            return None
+        print(f"🔄 설정 파일 반영 ({self.path}): {change}")
+        return change
+
+    def wait(self, seconds: Optional[float], on_change) -> None:
+        """seconds 동안 (None이면 계속) 대기하며 설정이 바뀌면 on_change(change) 호출"""
+        deadline = None if seconds is None else time.monotonic() + seconds
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return
+            if not self.path:
+                # 감시할 파일이 없으면 그냥 대기
+                if remaining is None:
+                    threading.Event().wait()
+                time.sleep(remaining)
+                return
+            time.sleep(self.poll_seconds if remaining is None else min(remaining, self.poll_seconds))
+            change = self.poll()
+            if change:
+                on_change(change)
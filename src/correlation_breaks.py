@@ -0,0 +1,234 @@
+"""
+상관관계 이탈(브레이크) 자동 탐지 모듈
+
+모든 자산 쌍에 대해 최근 구간 상관계수를 장기 기준 상관계수 및 과거 분산과 비교해
+통계적으로 유의한 이탈을 z-점수로 찾아냅니다.
+두 구간의 합계 행렬은 새 거래일마다 랭크-1 갱신(추가/만료)으로 유지하고
+실행 간 상태 파일로 보존하므로, 매 실행마다 전체 이력을 다시 계산하지 않습니다.
+마지막 거래일은 진행 중일 수 있으므로 확정 상태에는 직전 거래일까지만 반영하고,
+마지막 거래일은 확정 상태의 사본에만 반영해 판정한 뒤 다음 실행에서 다시 계산합니다.
+"""
+import copy
+import glob
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from config import CORRELATION_BREAK_CONFIG
+from data_quality import AlignedPanel
+
+
+class _WindowSums:
+    """쌍별 공통 관측 기준 합계 행렬 (N, Σx, Σx², Σxy)"""
+
+    def __init__(self, n: int):
+        self.count = np.zeros((n, n))
+        self.sum_x = np.zeros((n, n))    # [i, j]: j가 관측된 날의 x_i 합
+        self.sum_xx = np.zeros((n, n))
+        self.sum_xy = np.zeros((n, n))
+
+    def add(self, x: np.ndarray, m: np.ndarray, sign: float = 1.0):
+        """한 거래일 수익률 반영 (sign=-1이면 만료 제거)"""
+        self.count += sign * np.outer(m, m)
+        self.sum_x += sign * np.outer(x, m)
+        self.sum_xx += sign * np.outer(x * x, m)
+        self.sum_xy += sign * np.outer(x, x)
+
+    def corr(self, min_periods: int) -> np.ndarray:
+        """쌍별 피어슨 상관계수 행렬"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = self.count
+            mean_i = self.sum_x / n
+            mean_j = self.sum_x.T / n
+            cov = self.sum_xy / n - mean_i * mean_j
+            var_i = self.sum_xx / n - mean_i ** 2
+            var_j = self.sum_xx.T / n - mean_j ** 2
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def to_state(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f'{prefix}_{k}': v for k, v in vars(self).items()}
+
+    @classmethod
+    def from_state(cls, state, prefix: str) -> '_WindowSums':
+        sums = cls.__new__(cls)
+        for key in ('count', 'sum_x', 'sum_xx', 'sum_xy'):
+            setattr(sums, key, np.array(state[f'{prefix}_{key}']))
+        return sums
+
+
+class CorrelationBreakScanner:
+    """전체 쌍 상관관계 이탈 스캐너 (증분 상태 유지)"""
+
+    def __init__(self, codes: List[str], state_dir: Optional[str] = None):
+        cfg = CORRELATION_BREAK_CONFIG
+        self.codes = list(codes)
+        self.recent_window = cfg['recent_window']
+        self.baseline_window = cfg['baseline_window']
+        self.min_periods = cfg['min_periods']
+        self.min_dispersion_samples = cfg['min_dispersion_samples']
+        self.decay = 0.5 ** (1.0 / cfg['dispersion_halflife'])
+        self.state_path = os.path.join(
+            state_dir or cfg['state_dir'], f"correlation_breaks_{self._signature()}.npz"
+        )
+        self._reset()
+
+    def _signature(self) -> str:
+        """자산 구성별 상태 파일 구분자"""
+        return hashlib.blake2b('|'.join(self.codes).encode('utf-8'), digest_size=6).hexdigest()
+
+    def _reset(self):
+        n = len(self.codes)
+        self.last_date: Optional[pd.Timestamp] = None
+        # 장기 구간 수익률 링버퍼 (만료 행 제거용)
+        self.ring_x = np.zeros((self.baseline_window, n))
+        self.ring_m = np.zeros((self.baseline_window, n))
+        self.filled = 0
+        self.head = 0
+        self.recent = _WindowSums(n)
+        self.baseline = _WindowSums(n)
+        # (최근 - 기준) 차이의 지수가중 제곱 평균 → 과거 분산
+        self.dispersion = np.zeros((n, n))
+        self.dispersion_weight = 0.0
+        # 쌍별로 과거 분산에 반영된 이탈 표본 수 (부족하면 z-점수 미산출)
+        self.dispersion_count = np.zeros((n, n))
+        self.z = np.full((n, n), np.nan)
+
+    def load(self) -> bool:
+        """저장된 상태 로딩 (자산 구성이 같을 때만)"""
+        if not os.path.exists(self.state_path):
+            return False
+        with np.load(self.state_path, allow_pickle=False) as state:
+            if list(state['codes']) != self.codes or 'dispersion_count' not in state.files:
+                return False
+            self.last_date = pd.Timestamp(str(state['last_date']))
+            self.ring_x = state['ring_x'].copy()
+            self.ring_m = state['ring_m'].copy()
+            self.filled = int(state['filled'])
+            self.head = int(state['head'])
+            self.recent = _WindowSums.from_state(state, 'recent')
+            self.baseline = _WindowSums.from_state(state, 'baseline')
+            self.dispersion = state['dispersion'].copy()
+            self.dispersion_weight = float(state['dispersion_weight'])
+            self.dispersion_count = state['dispersion_count'].copy()
+            self.z = state['z'].copy()
+        return True
+
+    def save(self):
+        """상태 저장 (임시 파일에 쓴 뒤 교체)"""
+        if self.last_date is None:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            codes=np.array(self.codes),
+            last_date=np.array(str(self.last_date.date())),
+            ring_x=self.ring_x, ring_m=self.ring_m,
+            filled=self.filled, head=self.head,
+            dispersion=self.dispersion, dispersion_weight=self.dispersion_weight,
+            dispersion_count=self.dispersion_count,
+            z=self.z,
+            **self.recent.to_state('recent'),
+            **self.baseline.to_state('baseline'),
+        )
+        os.replace(tmp_path, self.state_path)
+        self._remove_stale()
+
+    def _remove_stale(self):
+        """자산 구성이 바뀌어 더 이상 쓰이지 않는 상태 파일 정리 (샤드별 상태는 매 실행 갱신되므로 유지)"""
+        cutoff = time.time() - CORRELATION_BREAK_CONFIG['stale_state_days'] * 86400
+        pattern = os.path.join(os.path.dirname(self.state_path), 'correlation_breaks_*.npz')
+        for path in glob.glob(pattern):
+            if path != self.state_path and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def update(self, x: np.ndarray, m: np.ndarray):
+        """새 거래일 1행 반영: O(n²) 랭크-1 갱신"""
+        w_long, w_recent = self.baseline_window, self.recent_window
+
+        # 장기 구간에서 만료되는 행 제거
+        if self.filled == w_long:
+            self.baseline.add(self.ring_x[self.head], self.ring_m[self.head], -1.0)
+        # 최근 구간에서 만료되는 행 제거
+        if self.filled >= w_recent:
+            old = (self.head - w_recent) % w_long
+            self.recent.add(self.ring_x[old], self.ring_m[old], -1.0)
+
+        self.ring_x[self.head] = x
+        self.ring_m[self.head] = m
+        self.head = (self.head + 1) % w_long
+        self.filled = min(w_long, self.filled + 1)
+        self.baseline.add(x, m)
+        self.recent.add(x, m)
+
+        if self.filled < w_long:
+            return
+
+        # 과거 분산(갱신 전 값) 대비 현재 이탈의 z-점수
+        diff = self.recent.corr(self.min_periods) - self.baseline.corr(self.min_periods)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sigma = np.sqrt(self.dispersion / self.dispersion_weight) if self.dispersion_weight else None
+            self.z = diff / sigma if sigma is not None else np.full(diff.shape, np.nan)
+        self.z[self.dispersion_count < self.min_dispersion_samples] = np.nan
+
+        valid = np.isfinite(diff)
+        self.dispersion = np.where(valid, self.decay * self.dispersion + (1 - self.decay) * diff ** 2,
+                                   self.dispersion)
+        self.dispersion_count += valid
+        self.dispersion_weight = self.decay * self.dispersion_weight + (1 - self.decay)
+
+    def scan(self, panel: AlignedPanel) -> List[Tuple]:
+        """패널의 새 거래일만 반영 후 유의한 이탈 쌍을 |z| 내림차순으로 반환
+
+        확정 상태에는 직전 거래일까지만 반영해 저장하고, 마지막 거래일(진행 중일 수 있음)은
+        확정 상태의 사본에만 반영해 판정하므로 다음 실행에서 수정된 값으로 다시 계산됩니다.
+
+        반환값: [(code1, code2, recent_corr, baseline_corr, z)]
+        """
+        self.load()
+        columns = np.array([panel.index[code] for code in self.codes])
+        returns = panel.returns()[:, columns]
+        observed = np.isfinite(returns)
+        dates = panel.dates
+
+        def row(t: int):
+            return np.where(observed[t], returns[t], 0.0), observed[t].astype(np.float64)
+
+        start = 1
+        if self.last_date is not None:
+            start = max(1, int(dates.searchsorted(self.last_date, side='right')))
+        for t in range(start, len(dates) - 1):
+            self.update(*row(t))
+        if len(dates) > 1 and (self.last_date is None or dates[-2] > self.last_date):
+            self.last_date = dates[-2]
+        self.save()
+
+        current = self
+        if len(dates) > 1 and dates[-1] > self.last_date:
+            current = copy.deepcopy(self)
+            current.update(*row(len(dates) - 1))
+        return current.breaks()
+
+    def breaks(self) -> List[Tuple]:
+        """현재 z-점수 기준 유의한 이탈 목록"""
+        cfg = CORRELATION_BREAK_CONFIG
+        recent = self.recent.corr(self.min_periods)
+        baseline = self.baseline.corr(self.min_periods)
+
+        rows, cols = np.triu_indices(len(self.codes), k=1)
+        z = self.z[rows, cols]
+        hit = np.flatnonzero(np.isfinite(z) & (np.abs(z) >= cfg['z_threshold']))
+        hit = hit[np.argsort(-np.abs(z[hit]))][:cfg['max_results']]
+
+        return [
+            (self.codes[rows[k]], self.codes[cols[k]],
+             float(recent[rows[k], cols[k]]), float(baseline[rows[k], cols[k]]), float(z[k]))
+            for k in hit
+        ]
@@ -0,0 +1,169 @@
+"""
+대규모 유니버스용 타일 상관관계 계산 모듈
+
+자산 블록 단위로 수익률과 관측 마스크를 메모리 매핑 파일에 기록한 뒤(전체 T x N을 메모리에 두지 않음)
+자산 쌍 타일 단위로 순회합니다. 타일마다 쌍별 공통 관측 구간의 합계로 상관계수를 구하므로
+소규모 유니버스의 pandas 계산(pairwise-complete)과 같은 값이 나옵니다.
+가장 강한 상관 쌍 상위 K개와 장기 기준 대비 이탈이 큰 쌍 K개만 힙에 유지하므로
+메모리는 n²이 아니라 K(와 타일 크기)에 비례합니다.
+"""
+import heapq
+import os
+import shutil
+import tempfile
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from config import CORRELATION_CONFIG
+from data_quality import AlignedPanel
+
+
+class _BoundedHeap:
+    """점수 상위 K개만 유지하는 최소 힙"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.items: List[Tuple] = []
+
+    @property
+    def floor(self) -> float:
+        """힙에 들어가기 위한 최소 점수"""
+        return self.items[0][0] if len(self.items) >= self.k else -np.inf
+
+    def push(self, score: float, item: Tuple):
+        entry = (score,) + item
+        if len(self.items) < self.k:
+            heapq.heappush(self.items, entry)
+        elif score > self.items[0][0]:
+            heapq.heapreplace(self.items, entry)
+
+    def sorted(self) -> List[Tuple]:
+        return sorted(self.items, reverse=True)
+
+
+class TiledCorrelation:
+    """메모리 매핑 표준화 블록 기반 타일 상관관계"""
+
+    def __init__(self, panel: AlignedPanel, columns: Optional[np.ndarray] = None,
+                 window: Optional[int] = None, baseline_window: Optional[int] = None,
+                 tile_size: Optional[int] = None, top_k: Optional[int] = None,
+                 min_periods: Optional[int] = None, workdir: Optional[str] = None):
+        self.panel = panel
+        self.columns = np.arange(len(panel.codes)) if columns is None else np.asarray(columns)
+        self.codes = [panel.codes[i] for i in self.columns]
+        self.window = window or CORRELATION_CONFIG['window']
+        self.baseline_window = baseline_window or CORRELATION_CONFIG['baseline_window']
+        self.tile_size = tile_size or CORRELATION_CONFIG['tile_size']
+        self.top_k = top_k or CORRELATION_CONFIG['top_k']
+        self.min_periods = min_periods or CORRELATION_CONFIG['min_periods']
+        self.workdir = workdir
+
+    def run(self) -> Dict[str, List[Tuple]]:
+        """타일 순회 후 상위 쌍과 기준 이탈 쌍 반환
+
+        반환값:
+            top_pairs: [(code1, code2, corr)] - |corr| 내림차순
+            deviations: [(code1, code2, corr, baseline, corr - baseline)] - |이탈| 내림차순
+        """
+        workdir = tempfile.mkdtemp(prefix='corr_tiles_', dir=self.workdir)
+        try:
+            recent = self._write_blocks(self.window, workdir, 'recent')
+            baseline = self._write_blocks(self.baseline_window, workdir, 'baseline')
+
+            top = _BoundedHeap(self.top_k)
+            deviations = _BoundedHeap(self.top_k)
+            n = len(self.codes)
+            size = self.tile_size
+
+            for start_i in range(0, n, size):
+                for start_j in range(start_i, n, size):
+                    block_i = slice(start_i, min(start_i + size, n))
+                    block_j = slice(start_j, min(start_j + size, n))
+                    corr = self._tile(recent, block_i, block_j)
+                    base = self._tile(baseline, block_i, block_j)
+                    self._collect(top, deviations, corr, base, start_i, start_j)
+
+            return {
+                'top_pairs': [
+                    (self.codes[i], self.codes[j], c) for _, i, j, c in top.sorted()
+                ],
+                'deviations': [
+                    (self.codes[i], self.codes[j], c, b, c - b)
+                    for _, i, j, c, b in deviations.sorted()
+                ],
+            }
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _write_blocks(self, length: int, workdir: str, name: str) -> Dict[str, np.memmap]:
+        """자산별 최근 length개 관측 수익률(X, 자산별 평균 차감)과 관측 마스크(M)를 (자산 x 시간) 메모리 매핑으로 기록
+
+        자산 블록(tile_size)씩 계산해 바로 기록하므로 메모리에는 한 블록만 올라갑니다.
+        평균 차감은 상관계수에 영향이 없고 타일 합계의 수치 오차만 줄입니다.
+        """
+        n = len(self.columns)
+        blocks = [slice(start, min(start + self.tile_size, n)) for start in range(0, n, self.tile_size)]
+        # 가장 이른 관측이 남는 행부터 기록 (블록별 1차 순회로 행 수 결정)
+        span = 0
+        for block in blocks:
+            returns = self.panel.recent_returns(length, self.columns[block])
+            kept = np.flatnonzero(np.isfinite(returns).any(axis=1))
+            if len(kept):
+                span = max(span, len(self.panel.dates) - kept[0])
+        shape = (n, span)
+        paths = {key: os.path.join(workdir, f'{name}_{key}.npy') for key in ('x', 'm')}
+        x = np.lib.format.open_memmap(paths['x'], mode='w+', dtype=np.float64, shape=shape)
+        m = np.lib.format.open_memmap(paths['m'], mode='w+', dtype=np.float32, shape=shape)
+
+        for block in blocks:
+            returns = self.panel.recent_returns(length, self.columns[block])[len(self.panel.dates) - span:]
+            observed = np.isfinite(returns)
+            counts = observed.sum(axis=0)
+            mean = np.where(counts > 0, np.nansum(returns, axis=0) / np.maximum(counts, 1), 0.0)
+            x[block] = np.where(observed, returns - mean, 0.0).T
+            m[block] = observed.T
+
+        for mm in (x, m):
+            mm.flush()
+        del x, m
+        return {key: np.load(path, mmap_mode='r') for key, path in paths.items()}
+
+    def _tile(self, blocks: Dict[str, np.memmap], block_i: slice, block_j: slice) -> np.ndarray:
+        """타일 상관계수: 쌍별 공통 관측 구간의 합계(N, Σx, Σy, Σx², Σy², Σxy)로 계산"""
+        xi, xj = np.asarray(blocks['x'][block_i]), np.asarray(blocks['x'][block_j])
+        mi = np.asarray(blocks['m'][block_i], dtype=np.float64)
+        mj = np.asarray(blocks['m'][block_j], dtype=np.float64)
+
+        common = mi @ mj.T
+        sum_i, sum_j = xi @ mj.T, mi @ xj.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cov = xi @ xj.T - sum_i * sum_j / common
+            var_i = (xi * xi) @ mj.T - sum_i ** 2 / common
+            var_j = mi @ (xj * xj).T - sum_j ** 2 / common
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[(common < self.min_periods) | ~np.isfinite(corr)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def _collect(self, top: _BoundedHeap, deviations: _BoundedHeap,
+                 corr: np.ndarray, base: np.ndarray, offset_i: int, offset_j: int):
+        """타일에서 후보만 골라 힙에 반영 (타일 전체를 힙에 넣지 않음)"""
+        rows, cols = np.indices(corr.shape)
+        valid = np.isfinite(corr) & (rows + offset_i < cols + offset_j)
+        if not valid.any():
+            return
+
+        rows, cols = rows[valid] + offset_i, cols[valid] + offset_j
+        values, baselines = corr[valid], base[valid]
+
+        for heap, score, extra in (
+            (top, np.abs(values), None),
+            (deviations, np.abs(values - baselines), baselines),
+        ):
+            score = np.where(np.isfinite(score), score, -np.inf)
+            candidates = np.flatnonzero(score > heap.floor)
+            if len(candidates) > heap.k:
+                candidates = candidates[np.argpartition(-score[candidates], heap.k - 1)[:heap.k]]
+            for idx in candidates:
+                item = (int(rows[idx]), int(cols[idx]), float(values[idx]))
+                if extra is not None:
+                    item += (float(extra[idx]),)
+                heap.push(float(score[idx]), item)
@@ -3,88 +3,193 @@
 """
 import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
 import time
-from config import get_enabled_assets, LOOKBACK_PERIODS, DATA_DIR
-import os
+from config import get_enabled_assets, LOOKBACK_PERIODS, INTRADAY_CONFIG, FETCH_CACHE, SPARKLINE_CONFIG, CORRELATION_BREAK_CONFIG
+from fetch_cache import FetchCache
+from history_store import HistoryStore
+from market_calendar import MarketCalendar, calendar_for, settle_delay
+from providers import FailoverFetcher, yahoo_daily
 
 class DataCollector:
     """데이터 수집 클래스"""
     
-    def __init__(self):
+    # 카테고리별 진행 표시 아이콘
+    CATEGORY_ICONS = {
+        'commodities': '📊',
+        'currencies': '💱',
+        'cryptocurrencies': '₿',
+    }
+    
+    def __init__(self, assets: Optional[Dict] = None):
+        # 이동평균 계산 기간 + 여유, 추이 스파크라인의 가장 긴 창(1년)도 패널에 들어오도록
         self.lookback_days = LOOKBACK_PERIODS['ma_calculation'] + 30
-        self.assets = get_enabled_assets()
+        if SPARKLINE_CONFIG['enabled']:
+            self.lookback_days = max(self.lookback_days, max(SPARKLINE_CONFIG['windows'].values()) + 7)
+        if CORRELATION_BREAK_CONFIG['enabled']:
+            # 상관관계 이탈 탐지가 첫 실행(상태 파일 없음)부터 z-점수를 내도록
+            # 기준 구간 + 과거 이탈 표본 + 진행 중 봉만큼의 거래일 (주 5거래일 + 휴일 여유)
+            cfg = CORRELATION_BREAK_CONFIG
+            rows = cfg['baseline_window'] + cfg['min_dispersion_samples'] + 2
+            self.lookback_days = max(self.lookback_days, rows * 7 // 5 + 14)
+        self.assets = assets if assets is not None else get_enabled_assets()
+        self.cache = FetchCache() if FETCH_CACHE['enabled'] else None
+        self.history = HistoryStore()
+        self.fetcher = FailoverFetcher()
         
     def collect_all_data(self) -> Dict[str, pd.DataFrame]:
-        """모든 자산 데이터 수집"""
+        """모든 자산 데이터 수집 (설정된 카테고리 순서대로)"""
         all_data = {}
+        skipped = stale = 0
         
-        # 원자재 데이터 수집
-        for code, info in self.assets.get('commodities', {}).items():
-            print(f"📊 {info['name']} 데이터 수집 중...")
-            ticker = info.get('spot_ticker') or info.get('ticker')
-            data = self._fetch_yfinance_data(ticker)
-            if data is not None:
-                all_data[code] = data
-                self._save_to_csv(code, data)
-            time.sleep(1)
+        for category, assets in self.assets.items():
+            icon = self.CATEGORY_ICONS.get(category, '📊')
+            for code, info in assets.items():
+                ticker = info.get('spot_ticker') or info.get('ticker')
+                if not ticker:
+                    continue  # 파생 자산 등 조회 대상이 아닌 자산
+                calendar = calendar_for(category, info)
+                if not self.may_have_new_data(code, calendar):
+                    stored = self._load_stored(code)
+                    if stored is not None:
+                        all_data[code] = stored
+                        skipped += 1
+                        continue
+                
+                print(f"{icon} {info['name']} 데이터 수집 중...")
+                data, from_network = self._fetch_daily(code, category, info, calendar)
+                if data is not None:
+                    all_data[code] = data
+                    self._save_history(code, data)
+                    if from_network:
+                        self.history.mark_fetched(code, datetime.now(timezone.utc))
+                else:
+                    # 모든 제공자가 실패해도 자산이 빠지지 않도록 저장된 히스토리로 대체
+                    stored = self._load_stored(code)
+                    if stored is not None:
+                        print(f"📁 {code} 조회 실패 → 저장된 히스토리 사용 "
+                              f"(마지막 {stored.index[-1]:%Y-%m-%d})")
+                        all_data[code] = stored
+                        stale += 1
+                if from_network:
+                    time.sleep(1)
         
-        # 통화 데이터 수집
-        for code, info in self.assets.get('currencies', {}).items():
-            print(f"💱 {info['name']} 데이터 수집 중...")
-            data = self._fetch_yfinance_data(info['ticker'])
-            if data is not None:
-                all_data[code] = data
-                self._save_to_csv(code, data)
-            time.sleep(1)
+        # 건강 상태 저장 + 조회 스레드 풀 종료 (진 헤지 요청은 기다리지 않음)
+        self.fetcher.close()
+        if skipped:
+            print(f"💤 마지막 조회 이후 거래가 없는 {skipped}개 자산은 저장된 히스토리 사용")
+        if self.fetcher.hedges or stale:
+            print(f"🛰️  헤지 요청 {self.fetcher.hedges}건, 조회 실패로 저장된 히스토리 사용 {stale}개")
+        return all_data
+    
+    def may_have_new_data(self, code: str, calendar: MarketCalendar) -> bool:
+        """마지막 조회 이후 열린 세션이 있으면 True (조회해도 새 데이터가 없으면 False)"""
+        return calendar.has_traded_between(self.history.fetched_at(code),
+                                           datetime.now(timezone.utc), settle_delay())
+    
+    def _load_stored(self, code: str) -> Optional[pd.DataFrame]:
+        """히스토리 저장소에서 조회 기간만큼 읽기"""
+        data = self.history.read(code)
+        if data is None or data.empty:
+            return None
+        return data[data.index >= datetime.now() - timedelta(days=self.lookback_days)]
+    
+    def _fetch_daily(self, code: str, category: str, info: Dict,
+                     calendar: MarketCalendar) -> Tuple[Optional[pd.DataFrame], bool]:
+        """일봉 조회 (캐시 우선, 제공자 장애 조치) → (데이터, 네트워크 사용 여부)"""
+        ticker = info.get('spot_ticker') or info.get('ticker')
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=self.lookback_days)
+        if self.cache is None:
+            return self._fetch_from_providers(code, category, info, start_date, end_date), True
         
-        # 암호화폐 데이터 수집 (있다면)
-        for code, info in self.assets.get('cryptocurrencies', {}).items():
-            print(f"₿ {info['name']} 데이터 수집 중...")
-            data = self._fetch_yfinance_data(info['ticker'])
-            if data is not None:
-                all_data[code] = data
-                self._save_to_csv(code, data)
-            time.sleep(1)
+        key = self.cache.make_key(ticker, '1d', start_date, end_date)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"💾 {ticker} 캐시 사용")
+            return cached, False
+        if self.cache.is_suppressed(ticker, '1d'):
+            print(f"⏭️  {ticker} 최근 조회 실패로 건너뜀 (부정 캐시)")
+            return None, False
         
-        return all_data
+        data = self._fetch_from_providers(code, category, info, start_date, end_date)
+        if data is None:
+            self.cache.record_failure(ticker, '1d', 'empty or error')
+        else:
+            self.cache.record_success(ticker, '1d')
+            self.cache.put(key, data, self.cache.expires_at(calendar, '1d'))
+        return data, True
     
-    def _fetch_yfinance_data(self, ticker: str) -> Optional[pd.DataFrame]:
-        """Yahoo Finance에서 데이터 가져오기"""
+    def _fetch_from_providers(self, code: str, category: str, info: Dict,
+                              start_date: datetime, end_date: datetime) -> Optional[pd.DataFrame]:
+        """설정된 시세 제공자에서 조회 (건강 점수 순, 1순위 지연 시 헤지 요청)"""
+        data, provider = self.fetcher.fetch(code, category, info, start_date, end_date)
+        if data is not None and provider != self.fetcher.providers[0].name:
+            print(f"🔀 {code} {provider} 응답 사용")
+        return data
+    
+    @staticmethod
+    def fetch_daily_range(ticker: str, start: date, end: date) -> pd.DataFrame:
+        """기간 일봉 조회 (start ~ end 포함, 백필용)
+        
+        스레드에서 호출해도 안전하며, 구간에 거래가 없으면 빈 프레임,
+        네트워크/응답 오류는 예외로 전달해 호출 측에서 재시도합니다.
+        """
+        return yahoo_daily(ticker, start, end + timedelta(days=1))
+    
+    def fetch_intraday(self, code: str, info: Dict, interval: str,
+                       category: str = '') -> Optional[pd.DataFrame]:
+        """장중 봉 데이터 가져오기 (타임존 유지, 캐시 우선)"""
+        ticker = info.get('spot_ticker') or info.get('ticker')
+        calendar = calendar_for(category, info)
+        if self.cache is None:
+            return self._download_intraday(ticker, interval)
+        
+        key = self.cache.make_key(ticker, interval, period=INTRADAY_CONFIG['fetch_period'])
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if self.cache.is_suppressed(ticker, interval):
+            return None
+        
+        data = self._download_intraday(ticker, interval)
+        if data is None:
+            self.cache.record_failure(ticker, interval, 'empty or error')
+        else:
+            self.cache.record_success(ticker, interval)
+            self.cache.put(key, data, self.cache.expires_at(calendar, interval))
+        return data
+    
+    def _download_intraday(self, ticker: str, interval: str) -> Optional[pd.DataFrame]:
+        """Yahoo Finance에서 장중 봉 가져오기"""
         try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=self.lookback_days)
-            
             data = yf.download(
                 ticker,
-                start=start_date,
-                end=end_date,
+                period=INTRADAY_CONFIG['fetch_period'],
+                interval=interval,
                 progress=False
             )
             
             if data.empty:
-                print(f"⚠️  {ticker} 데이터 없음")
                 return None
             
-            # 컬럼명 정리
-            data = data.rename(columns={
-                'Open': 'open',
-                'High': 'high',
-                'Low': 'low',
-                'Close': 'close',
-                'Volume': 'volume'
-            })
-            
-            return data[['close', 'open', 'high', 'low', 'volume']]
+            if isinstance(data.columns, pd.MultiIndex):
+                data.columns = data.columns.get_level_values(0)
+            data.columns = [str(c).lower() for c in data.columns]
+            return data[['open', 'high', 'low', 'close', 'volume']]
             
         except Exception as e:
-            print(f"❌ {ticker} 수집 실패: {e}")
+            print(f"❌ {ticker} 장중 데이터 수집 실패: {e}")
             return None
     
-    def _save_to_csv(self, code: str, data: pd.DataFrame):
-        """CSV 파일로 저장"""
-        os.makedirs(DATA_DIR, exist_ok=True)
-        filepath = f"{DATA_DIR}/{code}_history.csv"
-        data.to_csv(filepath)
-        print(f"✅ {code} 데이터 저장: {filepath}")
+    def update_history(self, code: str, daily: pd.DataFrame):
+        """완료된 일봉을 기존 히스토리에 병합 저장 (기존 날짜는 유지)"""
+        rows = self.history.write(code, daily, overwrite=False)
+        if rows:
+            print(f"✅ {code} 히스토리 {rows}행 추가")
+    
+    def _save_history(self, code: str, data: pd.DataFrame):
+        """히스토리 저장소에 새 행/변경 행만 델타로 기록"""
+        rows = self.history.write(code, data)
+        print(f"✅ {code} 데이터 저장: {rows}행 갱신")
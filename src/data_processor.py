@@ -4,63 +4,137 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
-from config import MOVING_AVERAGES, LOOKBACK_PERIODS
+from typing import Dict, Iterable, List, Optional
+import config
+from config import (
+    LOOKBACK_PERIODS, CORRELATION_CONFIG, CORRELATION_BREAK_CONFIG
+)
+from data_quality import DataQualityStage, AlignedPanel
+from correlation_engine import TiledCorrelation
+from correlation_breaks import CorrelationBreakScanner
+from indicators import IndicatorPlanner
+from volatility import EwmaVolatilityState
+from percentiles import PercentileStore
+from results import ResultStore
 
 class DataProcessor:
     """데이터 처리 및 지표 계산 클래스"""
     
-    def __init__(self, data: Dict[str, pd.DataFrame]):
-        self.data = data
-        self.results = {}
+    def __init__(self, data: Dict[str, pd.DataFrame], panel: Optional[AlignedPanel] = None):
+        # 정렬 패널이 없으면 품질 검증 단계를 먼저 수행
+        self.panel = panel if panel is not None else DataQualityStage(data).run()
+        self.data = self.panel.frames
+        self.results = ResultStore(list(self.data))
+        self.indicators = {}
+        self.volatility = EwmaVolatilityState()
+        self.percentiles = PercentileStore()
     
-    def process_all(self) -> Dict:
+    def process_all(self) -> ResultStore:
         """모든 자산 데이터 처리"""
-        for code, df in self.data.items():
-            self.results[code] = self._process_single_asset(code, df)
+        self.process_assets()
         
         # 상관관계 계산
-        self.results['correlations'] = self._calculate_correlations()
+        self.process_correlations()
         
         return self.results
     
-    def _process_single_asset(self, code: str, df: pd.DataFrame) -> Dict:
-        """개별 자산 데이터 처리"""
-        if df.empty or len(df) < 20:
-            return {'error': '데이터 부족'}
+    def process_assets(self, codes: Optional[List[str]] = None) -> ResultStore:
+        """자산별 지표/통계 처리 (codes 없으면 전체, 샤드 병합 시에는 샤드에 없던 자산만)"""
+        codes = list(self.data) if codes is None else list(codes)
+        if not codes:
+            return self.results
+        
+        # 기술적 지표: 자산 패널을 한 번에 계산
+        panel = self.panel if len(codes) == len(self.panel.codes) else self.panel.subset(codes)
+        self.indicators = IndicatorPlanner().latest(panel)
+        
+        for code in codes:
+            self._process_single_asset(code, self.data[code])
+        
+        # EWMA 변동성 상태 보존 (다음 실행은 새 봉만 반영)
+        self.volatility.save()
+        
+        return self.results
+    
+    def process_correlations(self) -> Dict:
+        """상관관계만 계산 (샤드 병합 시 자산별 결과는 재사용)"""
+        self.results.correlations = self._calculate_correlations()
         
-        result = {}
+        # 전체 쌍 상관관계 이탈 탐지 (증분 상태 기반)
+        if CORRELATION_BREAK_CONFIG['enabled']:
+            codes = [self.panel.codes[i] for i in self._eligible_columns()]
+            if len(codes) >= 2:
+                self.results.correlation_breaks = CorrelationBreakScanner(codes).scan(self.panel)
+        
+        return self.results.correlations
+    
+    def refresh_moving_averages(self, added: List[int], removed: List[int]):
+        """이동평균 기간 변경 반영 - 추가된 기간만 계산하고 빠진 기간 컬럼은 삭제 (다른 지표는 유지)"""
+        for period in removed:
+            self.results.columns.pop(f'moving_averages.MA{period}', None)
+        if not added:
+            return
+        for code in self.results:
+            if code in self.data:
+                self.results.set_group(code, 'moving_averages',
+                                       self._calculate_moving_averages(self.data[code], added))
+    
+    def _eligible_columns(self) -> np.ndarray:
+        """상관관계 대상 자산 (관측 60개 이상)"""
+        return np.flatnonzero(self.panel.observation_counts() >= CORRELATION_CONFIG['window'])
+    
+    def _process_single_asset(self, code: str, df: pd.DataFrame):
+        """개별 자산 데이터 처리 → 결과 저장소 컬럼에 기록"""
+        store = self.results
+        if df.empty or len(df) < 20:
+            store.mark_error(code, '데이터 부족')
+            return
         
         # 기본 정보
-        result['current_price'] = float(df['close'].iloc[-1])
-        result['previous_close'] = float(df['close'].iloc[-2])
+        current_price = float(df['close'].iloc[-1])
+        previous_close = float(df['close'].iloc[-2])
+        store.set(code, 'current_price', current_price)
+        store.set(code, 'previous_close', previous_close)
         
         # 일간 변동
-        result['daily_change'] = result['current_price'] - result['previous_close']
-        result['daily_change_pct'] = (result['daily_change'] / result['previous_close']) * 100
+        daily_change = current_price - previous_close
+        store.set(code, 'daily_change', daily_change)
+        store.set(code, 'daily_change_pct', (daily_change / previous_close) * 100)
         
-        # 최근 7일 데이터
-        result['last_7days'] = df['close'].tail(7).to_dict()
+        # EWMA 변동성 및 일간 z-점수 (새 봉만 O(1) 갱신)
+        self.volatility.update_series(code, df['close'])
+        sigma = self.volatility.sigma(code)
+        store.set(code, 'ewma_vol', sigma * np.sqrt(252) * 100 if sigma else None)
+        store.set(code, 'daily_zscore', self.volatility.zscore(code))
         
-        # 주간 데이터
-        result['weekly'] = self._calculate_period_stats(df, 'W')
+        # 최근 7일 데이터
+        store.series[code] = df['close'].tail(7)
         
-        # 월간 데이터
-        result['monthly'] = self._calculate_period_stats(df, 'M')
+        # 주간/월간 데이터
+        store.set_group(code, 'weekly', self._calculate_period_stats(df, 'W'))
+        store.set_group(code, 'monthly', self._calculate_period_stats(df, 'M'))
         
-        # 이동평균선
-        result['moving_averages'] = self._calculate_moving_averages(df)
+        # 이동평균선 (괴리율/위치는 현재가와 벡터 연산으로 파생)
+        store.set_group(code, 'moving_averages', self._calculate_moving_averages(df))
         
         # 52주 최고/최저
-        result['52w_high'] = float(df['close'].tail(252).max())
-        result['52w_low'] = float(df['close'].tail(252).min())
-        result['is_52w_high'] = result['current_price'] >= result['52w_high'] * 0.999
-        result['is_52w_low'] = result['current_price'] <= result['52w_low'] * 1.001
+        high_52w = float(df['close'].tail(252).max())
+        low_52w = float(df['close'].tail(252).min())
+        store.set(code, '52w_high', high_52w)
+        store.set(code, '52w_low', low_52w)
+        store.set(code, 'is_52w_high', current_price >= high_52w * 0.999)
+        store.set(code, 'is_52w_low', current_price <= low_52w * 1.001)
+        
+        # 기간별 과거 분포 백분위 (보존된 정렬 배열에 변경분만 반영)
+        store.set_group(code, 'percentile', self.percentiles.update(code, df))
         
         # 골든크로스/데드크로스 감지
-        result['cross_signals'] = self._detect_cross_signals(df)
+        store.set_group(code, 'cross_signals', self._detect_cross_signals(df))
+        
+        # 기술적 지표 (RSI, MACD, 볼린저밴드 등)
+        store.set_group(code, 'indicators', self.indicators.get(code, {}))
         
-        return result
+        store.mark_valid(code)
     
     def _calculate_period_stats(self, df: pd.DataFrame, freq: str) -> Dict:
         """기간별 통계 계산"""
@@ -81,19 +155,13 @@ class DataProcessor:
         
         return stats
     
-    def _calculate_moving_averages(self, df: pd.DataFrame) -> Dict:
-        """이동평균선 계산"""
+    def _calculate_moving_averages(self, df: pd.DataFrame, periods: Optional[Iterable[int]] = None) -> Dict:
+        """이동평균선 계산 (periods 없으면 설정된 전체 기간)"""
         ma_values = {}
-        current_price = float(df['close'].iloc[-1])
         
-        for period in MOVING_AVERAGES:
+        for period in config.MOVING_AVERAGES if periods is None else periods:
             if len(df) >= period:
-                ma = float(df['close'].tail(period).mean())
-                ma_values[f'MA{period}'] = {
-                    'value': ma,
-                    'divergence': ((current_price - ma) / ma) * 100,
-                    'position': 'above' if current_price > ma else 'below'
-                }
+                ma_values[f'MA{period}'] = float(df['close'].tail(period).mean())
         
         return ma_values
     
@@ -130,26 +198,32 @@ class DataProcessor:
         return signals
     
     def _calculate_correlations(self) -> Dict:
-        """자산 간 상관관계 계산"""
+        """자산 간 상관관계 계산 (정렬 패널 기준, 자산별 최근 60개 관측)"""
         correlations = {}
-        
-        # 최근 60일 데이터로 상관관계 계산
-        price_data = {}
-        for code, df in self.data.items():
-            if len(df) >= 60:
-                price_data[code] = df['close'].tail(60).pct_change().dropna()
-        
-        # 모든 쌍의 상관관계 계산
-        codes = list(price_data.keys())
-        for i in range(len(codes)):
-            for j in range(i+1, len(codes)):
-                code1, code2 = codes[i], codes[j]
-                if len(price_data[code1]) > 0 and len(price_data[code2]) > 0:
-                    common_idx = price_data[code1].index.intersection(price_data[code2].index)
-                    if len(common_idx) > 20:
-                        corr = price_data[code1].loc[common_idx].corr(
-                            price_data[code2].loc[common_idx]
-                        )
-                        correlations[f"{code1}_{code2}"] = float(corr)
+        panel = self.panel
+        window = CORRELATION_CONFIG['window']
+        
+        eligible = self._eligible_columns()
+        if len(eligible) < 2:
+            return correlations
+        
+        # 대규모 유니버스: 타일 계산으로 상위 K개 쌍과 기준 이탈 쌍만 보관
+        if len(eligible) > CORRELATION_CONFIG['tiled_threshold']:
+            tiled = TiledCorrelation(panel, columns=eligible).run()
+            for code1, code2, corr in tiled['top_pairs']:
+                correlations[f"{code1}_{code2}"] = corr
+            self.results.correlation_deviations = tiled['deviations']
+            return correlations
+        
+        # 자산별 최근 60개 관측 수익률 (휴장일은 NaN → 쌍별 공통 구간이 min_periods 이상인 쌍만 사용)
+        returns = panel.recent_returns(window, eligible)
+        returns = pd.DataFrame(returns[np.isfinite(returns).any(axis=1)])
+        corr = returns.corr(min_periods=CORRELATION_CONFIG['min_periods']).to_numpy()
+        
+        codes = [panel.codes[i] for i in eligible]
+        rows, cols = np.triu_indices(len(codes), k=1)
+        for i, j in zip(rows, cols):
+            if np.isfinite(corr[i, j]):
+                correlations[f"{codes[i]}_{codes[j]}"] = float(corr[i, j])
         
         return correlations
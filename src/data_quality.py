@@ -0,0 +1,213 @@
+"""
+데이터 품질 검증 및 캘린더 정렬 모듈
+
+수집 직후 한 번 실행되어 OHLCV를 검증/정리하고,
+모든 자산을 하나의 마스터 캘린더(전진 채움 + 결측 마스크)로 정렬합니다.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+OHLCV_COLUMNS = ['close', 'open', 'high', 'low', 'volume']
+
+
+class AlignedPanel:
+    """마스터 캘린더 기준으로 정렬된 자산 패널"""
+
+    def __init__(self, dates: pd.DatetimeIndex, codes: List[str], close: np.ndarray,
+                 observed: np.ndarray, frames: Dict[str, pd.DataFrame],
+                 quality: Optional[Dict[str, Dict]] = None):
+        self.dates = dates
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)}
+        # close: 전진 채움된 종가 (T x N), observed: 실제 거래 여부 (T x N)
+        self.close = close
+        self.observed = observed
+        self.frames = frames
+        self.quality = quality or {}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def gaps(self) -> np.ndarray:
+        """결측 마스크 (휴장/누락으로 전진 채움된 칸)"""
+        return ~self.observed
+
+    def close_frame(self, fill: bool = True) -> pd.DataFrame:
+        """종가 패널을 DataFrame으로 반환 (fill=False면 결측은 NaN)"""
+        values = self.close if fill else np.where(self.observed, self.close, np.nan)
+        return pd.DataFrame(values, index=self.dates, columns=self.codes)
+
+    def returns(self, columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """실제 거래일 기준 수익률 (T x N, 휴장일은 NaN, columns 지정 시 해당 열만)
+
+        전진 채움 가격으로 계산하므로 휴장 다음 거래일의 수익률은
+        직전 실제 종가 대비 변동을 그대로 반영합니다.
+        """
+        close = self.close if columns is None else self.close[:, columns]
+        observed = self.observed if columns is None else self.observed[:, columns]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rets = np.full(close.shape, np.nan)
+            rets[1:] = close[1:] / close[:-1] - 1
+        rets[~observed] = np.nan
+        return rets
+
+    def recent_returns(self, window: int, columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """자산별 최근 window개 실제 관측 수익률만 남긴 수익률 (T x N, 나머지는 NaN)
+
+        마스터 캘린더 최근 window행이 아니라 자산마다 자기 관측 window개를 쓰므로
+        휴장일이 많은 자산도 다른 자산과 같은 관측 수의 창으로 비교됩니다.
+        """
+        rets = self.returns(columns)
+        observed = np.isfinite(rets)
+        # 아래(최신)부터 센 관측 순번
+        rank = observed[::-1].cumsum(axis=0)[::-1]
+        rets[rank > window] = np.nan
+        return rets
+
+    def observation_aligned(self, field: str = 'close') -> np.ndarray:
+        """자산별 실제 관측값만 아래(최신)쪽으로 모은 행렬 (T x N, 앞부분은 NaN)
+
+        휴장일 전진 채움 없이 자산마다 자기 거래일 기준으로 창(window) 계산을
+        하되, 모든 자산을 하나의 배열로 벡터화해 처리하기 위한 배치입니다.
+        """
+        if field == 'close':
+            values = self.close
+        else:
+            values = pd.concat(
+                [self.frames[code][field] for code in self.codes], axis=1, keys=self.codes
+            ).reindex(self.dates).to_numpy(dtype=np.float64)
+
+        order = np.argsort(self.observed, axis=0, kind='stable')
+        aligned = np.take_along_axis(values, order, axis=0)
+        aligned[~np.take_along_axis(self.observed, order, axis=0)] = np.nan
+        return aligned
+
+    def observation_counts(self) -> np.ndarray:
+        """자산별 실제 관측 개수"""
+        return self.observed.sum(axis=0)
+
+    def extend(self, codes: List[str], closes: List[np.ndarray], observed: List[np.ndarray],
+               frames: Dict[str, pd.DataFrame]) -> 'AlignedPanel':
+        """계산된 자산(파생/바스켓)을 열로 추가한 새 패널"""
+        if not codes:
+            return self
+        return AlignedPanel(
+            self.dates,
+            self.codes + list(codes),
+            np.column_stack([self.close] + list(closes)),
+            np.column_stack([self.observed] + list(observed)),
+            {**self.frames, **frames},
+            self.quality,
+        )
+
+    def subset(self, codes: List[str]) -> 'AlignedPanel':
+        """일부 자산만 담은 패널 (같은 마스터 캘린더)"""
+        columns = [self.index[code] for code in codes]
+        return AlignedPanel(self.dates, list(codes), self.close[:, columns],
+                            self.observed[:, columns], {c: self.frames[c] for c in codes},
+                            {c: self.quality[c] for c in codes if c in self.quality})
+
+
+class DataQualityStage:
+    """수집 데이터 검증 및 정렬 단계"""
+
+    def __init__(self, data: Dict[str, pd.DataFrame]):
+        self.data = data
+
+    def run(self) -> AlignedPanel:
+        """검증/정리 후 마스터 캘린더 패널 생성"""
+        frames = {}
+        quality = {}
+
+        for code, df in self.data.items():
+            cleaned, report = self._clean_frame(df)
+            quality[code] = report
+            if cleaned.empty:
+                print(f"⚠️  {code} 유효 데이터 없음 (품질 검사 후 제외)")
+                continue
+            if report['duplicates'] or report['dropped'] or report['repaired']:
+                print(f"🧹 {code} 정리: 중복 {report['duplicates']}, "
+                      f"제거 {report['dropped']}, 보정 {report['repaired']}")
+            frames[code] = cleaned
+
+        return self._align(frames, quality)
+
+    def _clean_frame(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict]:
+        """개별 자산 OHLCV 검증 및 정리"""
+        report = {'rows': 0 if df is None else len(df),
+                  'duplicates': 0, 'dropped': 0, 'repaired': 0}
+        if df is None or df.empty:
+            return pd.DataFrame(columns=OHLCV_COLUMNS), report
+
+        df = self._flatten_columns(df)
+
+        # 타임존 정규화: 거래소 현지 날짜를 유지한 채 tz 제거
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        df.index = index.normalize()
+        df.index.name = 'Date'
+
+        # 중복 날짜 제거 (마지막 값 유지) 및 정렬
+        duplicated = df.index.duplicated(keep='last')
+        report['duplicates'] = int(duplicated.sum())
+        df = df[~duplicated].sort_index()
+
+        # 종가가 없거나 0 이하인 행 제거
+        close = df['close'].to_numpy(dtype=np.float64)
+        valid = np.isfinite(close) & (close > 0)
+        report['dropped'] = int((~valid).sum())
+        df = df[valid]
+
+        # OHLC 보정: 결측은 종가로, high/low는 OHLC 범위를 포함하도록
+        ohlc = df[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64)
+        bad = ~np.isfinite(ohlc) | (ohlc <= 0)
+        ohlc = np.where(bad, ohlc[:, [3]], ohlc)
+        high = ohlc.max(axis=1)
+        low = ohlc.min(axis=1)
+        report['repaired'] = int(bad.any(axis=1).sum()
+                                 + (high != ohlc[:, 1]).sum() + (low != ohlc[:, 2]).sum())
+
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        volume = np.where(np.isfinite(volume) & (volume >= 0), volume, 0.0)
+
+        cleaned = pd.DataFrame({
+            'close': ohlc[:, 3],
+            'open': ohlc[:, 0],
+            'high': high,
+            'low': low,
+            'volume': volume,
+        }, index=df.index)
+        return cleaned, report
+
+    def _flatten_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """yf.download 멀티인덱스 컬럼 평탄화 및 컬럼명 통일"""
+        df = df.copy()
+        if isinstance(df.columns, pd.MultiIndex):
+            # ('Close', 'GC=F') 형태 → 가격 필드 레벨만 사용
+            level = 0 if any(str(v).lower() in OHLCV_COLUMNS
+                             for v in df.columns.get_level_values(0)) else -1
+            df.columns = df.columns.get_level_values(level)
+            df = df.loc[:, ~df.columns.duplicated()]
+
+        df.columns = [str(c).lower() for c in df.columns]
+        for column in OHLCV_COLUMNS:
+            if column not in df.columns:
+                df[column] = df['close'] if column != 'volume' else 0.0
+        return df[OHLCV_COLUMNS]
+
+    def _align(self, frames: Dict[str, pd.DataFrame], quality: Dict) -> AlignedPanel:
+        """마스터 캘린더 구성 (모든 자산 거래일의 합집합)"""
+        codes = list(frames.keys())
+        if not codes:
+            empty = np.empty((0, 0))
+            return AlignedPanel(pd.DatetimeIndex([]), [], empty,
+                                empty.astype(bool), frames, quality)
+
+        closes = pd.concat([frames[code]['close'] for code in codes], axis=1, keys=codes)
+        observed = closes.notna().to_numpy()
+        close = closes.ffill().to_numpy(dtype=np.float64)
+
+        return AlignedPanel(closes.index, codes, close, observed, frames, quality)
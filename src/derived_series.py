@@ -0,0 +1,145 @@
+"""
+파생 시계열 모듈 (교차 환율, 현지 통화/단위 환산)
+
+ASSETS 항목의 'formula'(예: 'GOLD * USD_KRW / 31.1035')를 수집된 자산의 정렬 패널에서
+벡터 연산으로 계산해 일반 자산처럼 패널에 추가합니다. 추가 네트워크 조회가 없고,
+이후 DataProcessor/AlertManager/리포트는 파생 자산을 다른 자산과 똑같이 처리합니다.
+"""
+import ast
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import get_enabled_assets
+from data_quality import AlignedPanel, OHLCV_COLUMNS
+
+# 수식을 적용하는 가격 필드 (거래량은 파생 자산에서 0)
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+_BINARY_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+
+
+class Formula:
+    """자산 코드와 숫자, 사칙연산/거듭제곱/괄호만 허용하는 수식"""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        try:
+            self._tree = ast.parse(expression, mode='eval').body
+        except SyntaxError as e:
+            raise ValueError(f"파생 수식 문법 오류: {expression} ({e.msg})")
+        self.inputs: List[str] = []
+        self._validate(self._tree)
+
+    def _validate(self, node):
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            self._validate(node.left)
+            self._validate(node.right)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            self._validate(node.operand)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            pass
+        elif isinstance(node, ast.Name):
+            if node.id not in self.inputs:
+                self.inputs.append(node.id)
+        else:
+            raise ValueError(f"파생 수식에 허용되지 않는 표현: {ast.dump(node)} ({self.expression})")
+
+    def evaluate(self, values: Dict[str, np.ndarray]) -> np.ndarray:
+        """입력 배열로 수식 계산 (배열 모양은 입력과 동일)"""
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            return self._eval(self._tree, values)
+
+    def _eval(self, node, values):
+        if isinstance(node, ast.BinOp):
+            return _BINARY_OPS[type(node.op)](self._eval(node.left, values),
+                                              self._eval(node.right, values))
+        if isinstance(node, ast.UnaryOp):
+            operand = self._eval(node.operand, values)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        return values[node.id]
+
+
+def derived_definitions(assets: Optional[Dict] = None) -> Dict[str, Formula]:
+    """활성 자산 중 파생 자산 {code: Formula} (설정 순서)"""
+    assets = assets if assets is not None else get_enabled_assets()
+    return {
+        code: Formula(info['formula'])
+        for members in assets.values()
+        for code, info in members.items()
+        if info.get('formula')
+    }
+
+
+class DerivedSeriesStage:
+    """정렬 패널에 파생 자산 추가"""
+
+    def __init__(self, definitions: Optional[Dict[str, Formula]] = None):
+        self.definitions = definitions if definitions is not None else derived_definitions()
+
+    def apply(self, panel: AlignedPanel) -> AlignedPanel:
+        """파생 자산을 계산해 패널에 열로 추가한 새 패널 반환"""
+        if not self.definitions or not panel.codes:
+            return panel
+
+        needed = {code for formula in self.definitions.values() for code in formula.inputs}
+        prices, observed = self._input_cube(panel, [c for c in panel.codes if c in needed])
+
+        codes, closes, masks, frames = [], [], [], {}
+        for code, formula in self.definitions.items():
+            missing = [c for c in formula.inputs if c not in prices]
+            if missing:
+                print(f"⚠️  파생 자산 {code} 건너뜀: 입력 자산 없음 ({', '.join(missing)})")
+                continue
+            values = formula.evaluate(prices)  # (필드 4, T)
+            mask = np.logical_or.reduce([observed[c] for c in formula.inputs]) \
+                & np.isfinite(values).all(axis=0) & (values[3] > 0)
+            # 다음 파생 수식에서 이 자산을 입력으로 쓸 수 있도록 등록
+            prices[code], observed[code] = values, mask
+
+            codes.append(code)
+            closes.append(values[3])
+            masks.append(mask)
+            frames[code] = self._to_frame(panel.dates, values, mask)
+
+        if codes:
+            print(f"🧮 파생 자산 {len(codes)}개 계산: {', '.join(codes)}")
+        return panel.extend(codes, closes, masks, frames)
+
+    @staticmethod
+    def _input_cube(panel: AlignedPanel,
+                    codes: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """입력 자산의 전진 채움 가격 (자산별 (필드 4, T)) 과 관측 마스크"""
+        if not codes:
+            return {}, {}
+        columns = [panel.index[c] for c in codes]
+        cube = np.empty((len(PRICE_FIELDS), len(panel.dates), len(codes)))
+        for f, field in enumerate(PRICE_FIELDS):
+            if field == 'close':
+                cube[f] = panel.close[:, columns]
+            else:
+                cube[f] = pd.concat([panel.frames[c][field] for c in codes], axis=1, keys=codes) \
+                    .reindex(panel.dates).ffill().to_numpy(dtype=np.float64)
+        prices = {code: cube[:, :, j] for j, code in enumerate(codes)}
+        observed = {code: panel.observed[:, i] for code, i in zip(codes, columns)}
+        return prices, observed
+
+    @staticmethod
+    def _to_frame(dates: pd.DatetimeIndex, values: np.ndarray, mask: np.ndarray) -> pd.DataFrame:
+        """관측된 날짜만 OHLCV 프레임으로 (고가/저가는 필드별 계산값의 범위로 근사)"""
+        values = values[:, mask]
+        frame = pd.DataFrame({
+            'close': values[3],
+            'open': values[0],
+            'high': values.max(axis=0),
+            'low': values.min(axis=0),
+            'volume': np.zeros(values.shape[1]),
+        }, index=dates[mask])
+        return frame[OHLCV_COLUMNS]
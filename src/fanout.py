@@ -0,0 +1,339 @@
+"""
+다중 구독자 알림 분배(fan-out) 모듈
+
+구독자별 필터(자산/카테고리/최소 레벨)를 적용해 메시지 변형을 만들고,
+같은 필터를 가진 구독자 묶음과 같은 메시지 선택은 한 번만 렌더링합니다.
+발송은 우선순위 스케줄러(긴급 > 주의 > 일반 > 파일)가 텔레그램 전역/채팅방별 속도 제한 안에서
+스레드 풀로 동시에 보내며, 같은 채팅방에 같은 내용은 한 번만 보냅니다.
+리포트 파일은 내용 해시로 채팅방별 마지막 발송본과 비교해 바뀌지 않았으면 건너뛰고,
+이미 한 번 올린 내용은 텔레그램이 돌려준 file_id로 보내 파일을 다시 업로드하지 않습니다.
+"""
+import hashlib
+import heapq
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config import FANOUT_CONFIG, TELEGRAM_BOT_TOKEN, get_enabled_assets
+from rate_limiter import KeyedRateLimiter, TokenBucket
+from subscribers import SubscriberRegistry
+from telegram_notifier import TelegramNotifier
+
+# 낮을수록 먼저 발송
+PRIORITY = {'level3': 0, 'level2': 1, 'level1': 2, 'document': 3}
+
+
+class DeliveryJob:
+    """발송 단위 (채팅방 1곳 + 메시지/파일 1개)"""
+
+    __slots__ = ('priority', 'chat_id', 'kind', 'payload', 'silent', 'caption', 'key', 'attempts',
+                 'slot', 'digest', 'file_id')
+
+    def __init__(self, priority: int, chat_id: str, kind: str, payload: str,
+                 silent: bool = False, caption: str = '', slot: str = '', digest: str = '',
+                 content: str = ''):
+        self.priority = priority
+        self.chat_id = chat_id
+        self.kind = kind          # 'message' 또는 'document'
+        self.payload = payload    # 메시지 본문 또는 파일 경로
+        self.silent = silent
+        self.caption = caption
+        # 중복 제거/재개용 키는 렌더링 결과(생성 시각 포함)가 아닌 원본 내용 기준 (content 없으면 payload)
+        digest_key = hashlib.sha1((content or payload).encode('utf-8')).hexdigest()[:16]
+        self.key = f"{chat_id}:{kind}:{digest_key}"
+        self.attempts = 0
+        self.slot = slot          # 파일 자리 (날짜와 무관, 예: 'xlsx/commodities')
+        self.digest = digest      # 파일 내용 해시 (없으면 항상 업로드)
+        self.file_id = None       # 텔레그램 file_id (있으면 업로드 대신 사용)
+
+
+def _document_file_id(response) -> Optional[str]:
+    """sendDocument 응답의 file_id"""
+    try:
+        return response.json()['result']['document']['file_id']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class DocumentIndex:
+    """리포트 내용 해시 → 텔레그램 file_id, 채팅방별 자리마다 마지막으로 받은 내용 해시"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else FANOUT_CONFIG['document_index']
+        self.file_ids: Dict[str, Dict] = {}
+        self.delivered: Dict[str, Dict[str, str]] = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.file_ids = state.get('file_ids', {})
+            self.delivered = state.get('delivered', {})
+
+    def file_id(self, digest: str) -> Optional[str]:
+        entry = self.file_ids.get(digest)
+        return entry['file_id'] if entry else None
+
+    def is_delivered(self, chat_id: str, slot: str, digest: str) -> bool:
+        return self.delivered.get(str(chat_id), {}).get(slot) == digest
+
+    def record(self, job: DeliveryJob):
+        """발송 완료 기록"""
+        if job.file_id:
+            self.file_ids[job.digest] = {'file_id': job.file_id, 'used': int(time.time())}
+        self.delivered.setdefault(str(job.chat_id), {})[job.slot] = job.digest
+
+    def forget(self, digest: str):
+        """사용할 수 없게 된 file_id 제거 (다음 발송은 다시 업로드)"""
+        self.file_ids.pop(digest, None)
+
+    def save(self):
+        if not self.path:
+            return
+        # 최근에 쓴 file_id만 유지
+        limit = FANOUT_CONFIG['document_index_size']
+        if len(self.file_ids) > limit:
+            self.file_ids = dict(sorted(self.file_ids.items(), key=lambda kv: kv[1]['used'])[-limit:])
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'file_ids': self.file_ids, 'delivered': self.delivered}, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class TelegramTransport:
+    """텔레그램 Bot API 전송 (연결 재사용)"""
+
+    def __init__(self, base_url: Optional[str] = None, pool_size: int = 16):
+        self.base_url = base_url or f"{FANOUT_CONFIG['api_base']}/bot{TELEGRAM_BOT_TOKEN}"
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, job: DeliveryJob) -> Tuple[bool, Optional[float]]:
+        """발송 → (성공 여부, 재시도 대기 시간: 429 응답일 때만)"""
+        try:
+            if job.kind == 'message':
+                response = self.session.post(f"{self.base_url}/sendMessage", json={
+                    'chat_id': job.chat_id,
+                    'text': job.payload,
+                    'parse_mode': 'HTML',
+                    'disable_notification': job.silent,
+                }, timeout=10)
+            elif job.file_id:
+                # 이미 올린 같은 내용 → file_id로 발송 (업로드 없음)
+                response = self.session.post(f"{self.base_url}/sendDocument", json={
+                    'chat_id': job.chat_id,
+                    'document': job.file_id,
+                    'caption': job.caption,
+                }, timeout=10)
+            else:
+                with open(job.payload, 'rb') as file:
+                    response = self.session.post(
+                        f"{self.base_url}/sendDocument",
+                        files={'document': file},
+                        data={'chat_id': job.chat_id, 'caption': job.caption},
+                        timeout=30,
+                    )
+        except (requests.RequestException, OSError) as e:
+            print(f"❌ 발송 오류 ({job.chat_id}): {e}")
+            return False, None
+
+        if response.status_code == 200:
+            if job.kind == 'document' and not job.file_id:
+                job.file_id = _document_file_id(response)
+            return True, None
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after', 1)
+            except ValueError:
+                retry_after = 1
+            return False, float(retry_after)
+        print(f"❌ 발송 실패 ({job.chat_id}): {response.status_code} {response.text[:200]}")
+        return False, None
+
+
+class FanoutDispatcher:
+    """구독자별 알림 분배기"""
+
+    def __init__(self, registry: Optional[SubscriberRegistry] = None, transport=None,
+                 renderer: Optional[TelegramNotifier] = None, documents: Optional[DocumentIndex] = None):
+        cfg = FANOUT_CONFIG
+        self.registry = registry if registry is not None else SubscriberRegistry.load()
+        self.workers = cfg['workers']
+        self.max_retries = cfg['max_retries']
+        self.transport = transport or TelegramTransport(pool_size=self.workers)
+        self.renderer = renderer or TelegramNotifier()
+        self.global_limit = TokenBucket(cfg['global_rate'], cfg['global_burst'])
+        self.chat_limit = KeyedRateLimiter(cfg['per_chat_interval'])
+        self.categories = {
+            code: category for category, assets in get_enabled_assets().items() for code in assets
+        }
+        self.documents = documents or DocumentIndex()
+        self.renders = 0
+        self.uploads = self.reuses = self.unchanged = 0
+
+    # ==================== 계획 ====================
+
+    def plan(self, alerts: Dict[str, List], files: Sequence = (),
+             caption: str = '') -> List[DeliveryJob]:
+        """구독자별 발송 작업 목록 (렌더링/중복 제거 포함)
+
+        files는 파일 경로 또는 slot/path/digest 속성을 가진 리포트 파일(ReportFile)입니다.
+        """
+        groups = defaultdict(list)
+        for subscriber in self.registry:
+            groups[subscriber.filter_key].append(subscriber)
+
+        rendered: Dict[Tuple, Tuple[str, bool]] = {}
+        jobs: List[DeliveryJob] = []
+        seen: Set[str] = set()
+        documents = self._documents(files, caption)
+
+        def add(job: DeliveryJob):
+            if job.key not in seen:
+                seen.add(job.key)
+                jobs.append(job)
+
+        for members in groups.values():
+            # 필터가 같은 구독자는 같은 메시지 변형을 받음
+            sample = members[0]
+            variant = []
+            for level in sample.levels:
+                messages = alerts.get(level) or []
+                selection = tuple(
+                    i for i, message in enumerate(messages)
+                    if sample.wants(getattr(message, 'codes', ()), self.categories)
+                )
+                if not selection:
+                    continue
+                if (level, selection) not in rendered:
+                    rendered[(level, selection)] = self.renderer.render_level(
+                        level, [messages[i] for i in selection]
+                    )
+                    self.renders += 1
+                content = '\n'.join([level, *(messages[i] for i in selection)])
+                variant.append((level, *rendered[(level, selection)], content))
+
+            for subscriber in members:
+                for level, text, silent, content in variant:
+                    add(DeliveryJob(PRIORITY[level], subscriber.chat_id, 'message', text, silent,
+                                    content=content))
+                if subscriber.files:
+                    for slot, path, digest, part_caption in documents:
+                        if digest and self.documents.is_delivered(subscriber.chat_id, slot, digest):
+                            self.unchanged += 1  # 이 채팅방은 같은 내용을 이미 받음
+                            continue
+                        add(DeliveryJob(PRIORITY['document'], subscriber.chat_id, 'document',
+                                        path, caption=part_caption, slot=slot, digest=digest))
+        if self.unchanged:
+            print(f"📎 내용이 바뀌지 않은 리포트 {self.unchanged}건 발송 생략")
+        return jobs
+
+    @staticmethod
+    def _documents(files: Sequence, caption: str) -> List[Tuple[str, str, str, str]]:
+        """발송할 파일 (자리, 경로, 내용 해시, 캡션) - 여러 개면 순번 표시, 업로드 한도 초과 파일은 제외"""
+        limit = FANOUT_CONFIG['max_document_bytes']
+        sendable = []
+        for item in files:
+            path = getattr(item, 'path', item)
+            if os.path.getsize(path) > limit:
+                print(f"⚠️  {os.path.basename(path)} 파일이 업로드 한도({limit // 1024 // 1024}MB)를 넘어 "
+                      f"발송하지 않습니다 (REPORT_SPLIT/REPORT_BUNDLE 사용)")
+            else:
+                sendable.append((getattr(item, 'slot', path), path, getattr(item, 'digest', '')))
+        if len(sendable) == 1:
+            return [(*sendable[0], caption)]
+        return [(*item, f"{caption} ({i}/{len(sendable)})") for i, item in enumerate(sendable, 1)]
+
+    # ==================== 발송 ====================
+
+    def run(self, jobs: Iterable[DeliveryJob],
+            skip: Iterable[str] = ()) -> Tuple[Set[str], List[DeliveryJob]]:
+        """우선순위/속도 제한 스케줄링으로 동시 발송 → (완료 키, 실패 작업)"""
+        skip = set(skip)
+        ready = [(job.priority, seq, job) for seq, job in enumerate(jobs) if job.key not in skip]
+        heapq.heapify(ready)
+        deferred: List[Tuple[float, int, int, DeliveryJob]] = []  # 채팅방 대기 중인 작업
+        inflight = {}
+        uploading: Set[str] = set()  # 업로드 중인 내용 해시
+        done: Set[str] = set()
+        failed: List[DeliveryJob] = []
+        total = len(ready)
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while ready or deferred or inflight:
+                now = time.monotonic()
+                while deferred and deferred[0][0] <= now:
+                    _, priority, seq, job = heapq.heappop(deferred)
+                    heapq.heappush(ready, (priority, seq, job))
+
+                if ready and len(inflight) < self.workers * 2:
+                    priority, seq, job = heapq.heappop(ready)
+                    ready_at = self.chat_limit.ready_at(job.chat_id)
+                    if ready_at > now:
+                        heapq.heappush(deferred, (ready_at, priority, seq, job))
+                        continue
+                    if job.digest:
+                        job.file_id = self.documents.file_id(job.digest)
+                        if job.file_id is None and job.digest in uploading:
+                            # 같은 내용을 다른 채팅방에 올리는 중 → 끝나면 file_id로 발송
+                            heapq.heappush(deferred, (now + 0.2, priority, seq, job))
+                            continue
+                        if job.file_id is None:
+                            uploading.add(job.digest)
+                    self.chat_limit.reserve(job.chat_id)
+                    self.global_limit.acquire()
+                    inflight[pool.submit(self.transport.send, job)] = (priority, seq, job, job.file_id)
+                    continue
+
+                # 진행 중 발송 완료 또는 다음 대기 작업 시각까지 대기
+                timeout = max(0.0, deferred[0][0] - now) if deferred else None
+                if inflight:
+                    finished, _ = wait(list(inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(timeout or 0.0)
+                    finished = ()
+
+                for future in finished:
+                    priority, seq, job, reused = inflight.pop(future)
+                    ok, retry_after = future.result()
+                    if job.digest:
+                        uploading.discard(job.digest)
+                        if ok:
+                            self.documents.record(job)
+                            self.reuses += reused is not None
+                            self.uploads += reused is None
+                        elif reused is not None and retry_after is None:
+                            # file_id를 쓸 수 없음 → 기록을 지우고 업로드로 재시도
+                            self.documents.forget(job.digest)
+                            job.file_id = None
+                            if job.attempts < self.max_retries:
+                                job.attempts += 1
+                                heapq.heappush(ready, (priority, seq, job))
+                                continue
+                    if ok:
+                        done.add(job.key)
+                    elif retry_after is not None and job.attempts < self.max_retries:
+                        job.attempts += 1
+                        self.chat_limit.defer(job.chat_id, retry_after)
+                        heapq.heappush(deferred, (time.monotonic() + retry_after, priority, seq, job))
+                    else:
+                        failed.append(job)
+
+        elapsed = time.monotonic() - started
+        if total:
+            print(f"📨 발송 {len(done)}/{total}건 완료 ({elapsed:.1f}초, 실패 {len(failed)}건)")
+        if self.uploads or self.reuses:
+            print(f"📎 파일 업로드 {self.uploads}건, file_id 재사용 {self.reuses}건")
+        self.documents.save()
+        return done, failed
+
+    def dispatch(self, alerts: Dict[str, List], files: Sequence = (), caption: str = '',
+                 skip: Iterable[str] = ()) -> Tuple[Set[str], List[DeliveryJob]]:
+        """계획 + 발송"""
+        return self.run(self.plan(alerts, files, caption), skip=skip)
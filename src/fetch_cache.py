@@ -0,0 +1,145 @@
+"""
+시세 조회 응답 캐시 모듈
+
+데이터 제공자 앞단의 로컬 디스크 캐시입니다.
+- 응답 캐시: (티커, 간격, 기간) 키별로 저장하고 거래 캘린더에 따라 TTL을 정합니다.
+- 부정 캐시: 빈 응답/오류가 연속으로 반복되는 티커는 지수적으로 늘어나는 간격으로만 재확인합니다.
+  (일시적인 실패 한두 번으로는 건너뛰지 않도록 연속 실패 횟수가 기준 이상일 때부터)
+- 용량 제한: 전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 제거합니다.
+항목마다 별도 파일을 사용하므로 샤드 병렬 실행에서도 공유 인덱스 충돌이 없습니다.
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+import pandas as pd
+import pytz
+from config import FETCH_CACHE, TIMEZONE
+from market_calendar import MarketCalendar
+
+
+class FetchCache:
+    """디스크 응답 캐시 + 부정 캐시"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or FETCH_CACHE['dir']
+        self.max_bytes = max_bytes or FETCH_CACHE['max_bytes']
+        self.tz = pytz.timezone(TIMEZONE)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ==================== 키/경로 ====================
+
+    @staticmethod
+    def make_key(ticker: str, interval: str, start=None, end=None, period: str = '') -> str:
+        """캐시 키 (일봉은 날짜 단위로 정규화해 같은 날 재실행 시 동일 키)"""
+        def norm(value):
+            if value is None:
+                return ''
+            return pd.Timestamp(value).strftime('%Y-%m-%d') if interval == '1d' else str(value)
+        raw = '|'.join([ticker, interval, norm(start), norm(end), period])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def _negative_path(self, ticker: str, interval: str) -> str:
+        key = hashlib.sha1(f"{ticker}|{interval}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"neg_{key}.json")
+
+    # ==================== TTL ====================
+
+    def expires_at(self, calendar: MarketCalendar, interval: str,
+                   now: Optional[datetime] = None) -> float:
+        """거래 캘린더에 따른 만료 시각 (epoch 초)"""
+        now = now or datetime.now(self.tz)
+        if not calendar.is_open(now):
+            # 휴장 중에는 다음 장 시작까지 새 데이터가 없음
+            return calendar.next_open(now).timestamp()
+        if interval == '1d':
+            # 일봉: 같은 날 재실행은 네트워크 없이 완료
+            end_of_day = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+            return end_of_day.timestamp()
+        return now.timestamp() + FETCH_CACHE['intraday_ttl_seconds']
+
+    # ==================== 응답 캐시 ====================
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """유효한 캐시 응답 (만료/없음이면 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if entry['expires_at'] <= time.time():
+            return None
+        os.utime(path)  # LRU 갱신
+        return entry['data']
+
+    def put(self, key: str, data: pd.DataFrame, expires_at: float):
+        """응답 저장 후 용량 초과 시 LRU 제거"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'expires_at': expires_at, 'data': data}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """전체 크기가 한도를 넘으면 오래 사용하지 않은 항목부터 삭제"""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pkl'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # ==================== 부정 캐시 ====================
+
+    def is_suppressed(self, ticker: str, interval: str) -> bool:
+        """최근 실패한 티커의 재확인 대기 중 여부"""
+        path = self._negative_path(ticker, interval)
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding='utf-8') as f:
+            entry = json.load(f)
+        return entry['next_check'] > time.time()
+
+    def record_failure(self, ticker: str, interval: str, reason: str):
+        """실패 기록 - 연속 실패가 negative_min_failures회 이상이면 재확인 간격을 지수 증가"""
+        path = self._negative_path(ticker, interval)
+        failures = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                failures = json.load(f)['failures']
+        failures += 1
+        repeated = failures - FETCH_CACHE['negative_min_failures']
+        delay = 0 if repeated < 0 else min(FETCH_CACHE['negative_base_seconds'] * 2 ** repeated,
+                                           FETCH_CACHE['negative_max_seconds'])
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'ticker': ticker, 'interval': interval, 'failures': failures,
+                       'reason': reason, 'next_check': time.time() + delay}, f)
+        if delay:
+            print(f"🚫 {ticker} 부정 캐시 등록 ({failures}회 연속 실패, {delay / 3600:.1f}시간 후 재확인)")
+
+    def record_success(self, ticker: str, interval: str):
+        """성공 시 부정 캐시 해제"""
+        path = self._negative_path(ticker, interval)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,216 @@
+"""
+히스토리 저장소 모듈 (git 친화적 추가 전용 레이아웃)
+
+자산별 디렉터리에 변경된 행만 담은 일별 델타 파일을 추가하고,
+index.json에 각 델타가 담은 구간을 기록합니다. 델타가 쌓이면 연도별 세그먼트로 압축합니다.
+
+    data/history/GOLD/
+        index.json
+        segments/2024.csv    # 압축된 연도별 세그먼트
+        deltas/20250102.csv  # 마지막 압축 이후 변경분
+
+매일 커밋되는 diff는 새 행 몇 줄로 제한되고, 읽기는 세그먼트 + 델타를 순서대로 합칩니다.
+매 실행 바뀌는 마지막 조회 시각은 커밋하지 않는 상태 디렉터리(data/state/fetched/)에 따로 둡니다.
+"""
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from config import DATA_DIR, HISTORY_CONFIG
+
+COLUMNS = ['close', 'open', 'high', 'low', 'volume']
+
+
+class HistoryStore:
+    """자산별 세그먼트 + 델타 히스토리 저장소"""
+
+    def __init__(self, base_dir: Optional[str] = None, fetched_dir: Optional[str] = None):
+        self.base_dir = base_dir or HISTORY_CONFIG['dir']
+        self.fetched_dir = fetched_dir or HISTORY_CONFIG['fetched_dir']
+
+    # ==================== 경로/인덱스 ====================
+
+    def _dir(self, code: str) -> str:
+        return os.path.join(self.base_dir, code)
+
+    def _index_path(self, code: str) -> str:
+        return os.path.join(self._dir(code), 'index.json')
+
+    def _load_index(self, code: str) -> Dict:
+        path = self._index_path(code)
+        if not os.path.exists(path):
+            return {'segments': {}, 'deltas': []}
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_index(self, code: str, index: Dict):
+        """인덱스 저장 (정렬/들여쓰기로 diff 최소화)"""
+        path = self._index_path(code)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, path)
+
+    def _fetched_path(self, code: str) -> str:
+        return os.path.join(self.fetched_dir, f"{code}.json")
+
+    def fetched_at(self, code: str) -> Optional[datetime]:
+        """마지막 네트워크 조회 시각 (UTC, 기록 없으면 None)"""
+        path = self._fetched_path(code)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f).get('fetched_at')
+        else:
+            # 이전 버전은 index.json에 기록
+            value = self._load_index(code).get('fetched_at')
+        return datetime.fromisoformat(value) if value else None
+
+    def mark_fetched(self, code: str, when: datetime):
+        """네트워크 조회 시각 기록 (휴장 중 조회 생략 판단용, 자산별 파일이라 샤드 병렬 실행에도 안전)"""
+        os.makedirs(self.fetched_dir, exist_ok=True)
+        path = self._fetched_path(code)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': when.astimezone(timezone.utc).isoformat(timespec='seconds')}, f)
+        os.replace(tmp_path, path)
+
+        index = self._load_index(code)
+        if index.pop('fetched_at', None) is not None:
+            # 이전 버전이 index.json에 남긴 조회 시각 제거 (한 번만)
+            self._save_index(code, index)
+
+    def codes(self) -> List[str]:
+        """저장된 자산 코드 목록"""
+        if not os.path.isdir(self.base_dir):
+            return []
+        return sorted(c for c in os.listdir(self.base_dir)
+                      if os.path.exists(self._index_path(c)))
+
+    # ==================== 읽기 ====================
+
+    @staticmethod
+    def _read_csv(path: str) -> pd.DataFrame:
+        return pd.read_csv(path, index_col=0, parse_dates=True, float_precision='round_trip')
+
+    def read(self, code: str) -> Optional[pd.DataFrame]:
+        """세그먼트 + 델타를 합친 전체 시계열 (없으면 None)"""
+        index = self._load_index(code)
+        if not index['segments'] and not index['deltas']:
+            return self._read_legacy(code)
+
+        base = self._dir(code)
+        paths = [os.path.join(base, 'segments', f"{year}.csv") for year in sorted(index['segments'])]
+        paths += [os.path.join(base, 'deltas', entry['file']) for entry in index['deltas']]
+        frames = [self._read_csv(path) for path in paths]
+        data = pd.concat(frames)
+        # 뒤에 기록된 델타가 우선
+        return data[~data.index.duplicated(keep='last')].sort_index()
+
+    @staticmethod
+    def _read_legacy(code: str) -> Optional[pd.DataFrame]:
+        """이전 레이아웃(data/{code}_history.csv) 호환 읽기"""
+        path = os.path.join(DATA_DIR, f"{code}_history.csv")
+        if not os.path.exists(path):
+            return None
+        return HistoryStore._read_csv(path)
+
+    # ==================== 쓰기 ====================
+
+    @staticmethod
+    def _normalize(data: pd.DataFrame) -> pd.DataFrame:
+        """일봉 형태로 정리 (날짜 인덱스, 고정 컬럼 순서)"""
+        data = data[COLUMNS].copy()
+        index = pd.DatetimeIndex(data.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        data.index = index.normalize()
+        data.index.name = 'date'
+        return data[~data.index.duplicated(keep='last')].sort_index()
+
+    def write(self, code: str, data: pd.DataFrame, overwrite: bool = True) -> int:
+        """새 행/변경된 행만 오늘자 델타로 추가 → 기록한 행 수
+
+        overwrite=False이면 기존에 없는 날짜만 추가합니다.
+        """
+        data = self._normalize(data)
+        current = self.read(code)
+        if current is not None and not current.empty:
+            if overwrite:
+                aligned = current.reindex(data.index)[COLUMNS].to_numpy(dtype=np.float64)
+                same = np.isclose(data.to_numpy(dtype=np.float64), aligned,
+                                  rtol=1e-12, atol=0.0, equal_nan=True).all(axis=1)
+                changes = data[~same]
+            else:
+                changes = data[~data.index.isin(current.index)]
+        else:
+            changes = data
+        if changes.empty:
+            return 0
+
+        index = self._load_index(code)
+        if not index['segments'] and not index['deltas'] and current is not None:
+            # 이전 레이아웃에서 처음 옮길 때는 기존 전체를 세그먼트로 기록
+            self._write_segments(code, index, current)
+
+        delta_dir = os.path.join(self._dir(code), 'deltas')
+        os.makedirs(delta_dir, exist_ok=True)
+        filename = f"{datetime.now().strftime('%Y%m%d')}.csv"
+        filepath = os.path.join(delta_dir, filename)
+        entry = next((e for e in index['deltas'] if e['file'] == filename), None)
+        if entry is None:
+            changes.to_csv(filepath)
+            entry = {'file': filename, 'rows': 0,
+                     'start': None, 'end': None}
+            index['deltas'].append(entry)
+        else:
+            # 같은 날 재실행: 오늘자 델타에 이어 쓰기
+            changes.to_csv(filepath, mode='a', header=False)
+        dates = [d.strftime('%Y-%m-%d') for d in (changes.index[0], changes.index[-1])]
+        entry['rows'] += len(changes)
+        entry['start'] = min(filter(None, [entry['start'], dates[0]]))
+        entry['end'] = max(filter(None, [entry['end'], dates[1]]))
+        self._save_index(code, index)
+
+        if len(index['deltas']) >= HISTORY_CONFIG['compact_after']:
+            self.compact(code)
+        return len(changes)
+
+    # ==================== 압축 ====================
+
+    def _write_segments(self, code: str, index: Dict, data: pd.DataFrame):
+        """연도별 세그먼트 기록 (해당 연도만 다시 씀)"""
+        seg_dir = os.path.join(self._dir(code), 'segments')
+        os.makedirs(seg_dir, exist_ok=True)
+        for year, rows in data.groupby(data.index.year):
+            rows.to_csv(os.path.join(seg_dir, f"{year}.csv"))
+            index['segments'][str(year)] = {
+                'rows': len(rows),
+                'start': rows.index[0].strftime('%Y-%m-%d'),
+                'end': rows.index[-1].strftime('%Y-%m-%d'),
+            }
+
+    def compact(self, code: str):
+        """델타를 연도별 세그먼트에 병합하고 델타 삭제"""
+        index = self._load_index(code)
+        if not index['deltas']:
+            return
+        data = self.read(code)
+        base = self._dir(code)
+        deltas = pd.concat([self._read_csv(os.path.join(base, 'deltas', e['file']))
+                            for e in index['deltas']])
+        touched = set(deltas.index.year)
+        self._write_segments(code, index, data[data.index.year.isin(touched)])
+
+        for entry in index['deltas']:
+            os.remove(os.path.join(base, 'deltas', entry['file']))
+        index['deltas'] = []
+        self._save_index(code, index)
+        print(f"🗜️  {code} 히스토리 압축: {', '.join(map(str, sorted(touched)))}년 세그먼트 갱신")
+
+    def compact_all(self):
+        """전체 자산 압축"""
+        for code in self.codes():
+            self.compact(code)
@@ -0,0 +1,240 @@
+"""
+기술적 지표 플러그인 레지스트리 모듈
+
+지표(RSI, MACD, 볼린저밴드, ATR, EMA, 변동성 등)는 필요한 입력 노드를 선언하고,
+실행 계획기는 의존 그래프(DAG)를 위상 정렬해 공유 중간값(수익률, EMA, 이동 표준편차 등)을
+자산 패널 전체에 대해 한 번씩만 계산합니다.
+"""
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, List, Tuple
+from config import INDICATOR_CONFIG
+from data_quality import AlignedPanel
+
+# 노드 팩토리: kind → (params → (의존 노드 키 목록, 계산 함수))
+_NODES: Dict[str, Callable] = {}
+# 지표 팩토리: name → (config → (의존 노드 키 목록, 출력 함수))
+INDICATORS: Dict[str, Callable] = {}
+
+BASE_INPUTS = ('close', 'high', 'low')
+
+
+def node(kind: str):
+    """중간값 노드 등록 데코레이터
+
+    노드 키는 'kind:source:param' 형태이며 source 자리에 다른 노드 키가 중첩될 수 있습니다.
+    (예: 'wilder:gain:diff:close:14' = diff(close) → gain → Wilder 평활 14)
+    """
+    def decorator(factory):
+        _NODES[kind] = factory
+        return factory
+    return decorator
+
+
+def indicator(name: str):
+    """지표 플러그인 등록 데코레이터"""
+    def decorator(factory):
+        INDICATORS[name] = factory
+        return factory
+    return decorator
+
+
+def _resolve(key: str) -> Tuple[List[str], Callable]:
+    """노드 키를 (의존 목록, 계산 함수)로 변환"""
+    kind, _, rest = key.partition(':')
+    if kind not in _NODES:
+        raise KeyError(f"알 수 없는 지표 노드: {key}")
+    return _NODES[kind](rest) if rest else _NODES[kind]()
+
+
+def _source_param(rest: str) -> Tuple[str, int]:
+    """'source:param' 분리 (source는 중첩 노드 키일 수 있음)"""
+    source, param = rest.rsplit(':', 1)
+    return source, int(param)
+
+
+# ==================== 공유 중간값 노드 ====================
+
+@node('returns')
+def _returns_node():
+    return ['close'], lambda close: close.pct_change(fill_method=None)
+
+
+@node('diff')
+def _diff_node(source):
+    return [source], lambda s: s.diff()
+
+
+@node('gain')
+def _gain_node(source):
+    return [source], lambda d: d.clip(lower=0)
+
+
+@node('loss')
+def _loss_node(source):
+    return [source], lambda d: (-d).clip(lower=0)
+
+
+@node('ema')
+def _ema_node(rest):
+    source, span = _source_param(rest)
+    return [source], lambda s: s.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+@node('wilder')
+def _wilder_node(rest):
+    source, period = _source_param(rest)
+    return [source], lambda s: s.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+
+@node('sma')
+def _sma_node(rest):
+    source, window = _source_param(rest)
+    return [source], lambda s: s.rolling(window).mean()
+
+
+@node('rolling_std')
+def _rolling_std_node(rest):
+    source, window = _source_param(rest)
+    return [source], lambda s: s.rolling(window).std()
+
+
+@node('true_range')
+def _true_range_node():
+    def compute(high, low, close):
+        prev = close.shift(1)
+        return np.maximum(high - low, np.maximum((high - prev).abs(), (low - prev).abs()))
+    return ['high', 'low', 'close'], compute
+
+
+# ==================== 지표 플러그인 ====================
+
+@indicator('rsi')
+def _rsi(cfg):
+    p = cfg['rsi_period']
+    deps = [f'wilder:gain:diff:close:{p}', f'wilder:loss:diff:close:{p}']
+
+    def compute(avg_gain, avg_loss):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = avg_gain / avg_loss
+        return {'RSI': 100 - 100 / (1 + rs)}
+    return deps, compute
+
+
+@indicator('macd')
+def _macd(cfg):
+    fast, slow, signal = cfg['macd']
+    deps = [f'ema:close:{fast}', f'ema:close:{slow}']
+
+    def compute(ema_fast, ema_slow):
+        line = ema_fast - ema_slow
+        sig = line.ewm(span=signal, adjust=False, min_periods=signal).mean()
+        return {'MACD': line, 'MACD_signal': sig, 'MACD_hist': line - sig}
+    return deps, compute
+
+
+@indicator('bollinger')
+def _bollinger(cfg):
+    window, width = cfg['bollinger']
+    deps = [f'sma:close:{window}', f'rolling_std:close:{window}', 'close']
+
+    def compute(mid, std, close):
+        upper, lower = mid + width * std, mid - width * std
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_b = (close - lower) / (upper - lower)
+        return {'BB_mid': mid, 'BB_upper': upper, 'BB_lower': lower, 'BB_pctb': pct_b}
+    return deps, compute
+
+
+@indicator('atr')
+def _atr(cfg):
+    p = cfg['atr_period']
+    return [f'wilder:true_range:{p}'], lambda atr: {'ATR': atr}
+
+
+@indicator('ema')
+def _ema(cfg):
+    periods = cfg['ema_periods']
+    deps = [f'ema:close:{p}' for p in periods]
+    return deps, lambda *emas: {f'EMA{p}': e for p, e in zip(periods, emas)}
+
+
+@indicator('volatility')
+def _volatility(cfg):
+    window = cfg['volatility_window']
+    # 연율화 변동성(%)
+    return [f'rolling_std:returns:{window}'], lambda std: {'VOL': std * np.sqrt(252) * 100}
+
+
+# ==================== 실행 계획기 ====================
+
+class IndicatorPlanner:
+    """지표 의존 그래프 계획 및 실행"""
+
+    def __init__(self, names: List[str] = None, cfg: Dict = None):
+        self.cfg = cfg or INDICATOR_CONFIG
+        self.names = names if names is not None else self.cfg['enabled']
+        unknown = [n for n in self.names if n not in INDICATORS]
+        if unknown:
+            raise KeyError(f"등록되지 않은 지표: {', '.join(unknown)}")
+        self.specs = {name: INDICATORS[name](self.cfg) for name in self.names}
+        self.order = self._plan()
+        # 실제로 필요한 기본 입력만 패널에서 만든다
+        self.inputs = [
+            field for field in BASE_INPUTS
+            if any(field in _resolve(key)[0] for key in self.order)
+            or any(field in deps for deps, _ in self.specs.values())
+        ]
+
+    def _plan(self) -> List[str]:
+        """필요한 노드를 위상 정렬 (같은 키는 한 번만)"""
+        order: List[str] = []
+        visiting = set()
+
+        def visit(key: str):
+            if key in order or key in BASE_INPUTS:
+                return
+            if key in visiting:
+                raise ValueError(f"지표 의존 그래프에 순환이 있습니다: {key}")
+            visiting.add(key)
+            deps, _ = _resolve(key)
+            for dep in deps:
+                visit(dep)
+            visiting.discard(key)
+            order.append(key)
+
+        for deps, _ in self.specs.values():
+            for dep in deps:
+                visit(dep)
+        return order
+
+    def run(self, inputs: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """패널 전체에 대해 실행 → 출력명별 (시간 x 자산) DataFrame"""
+        values: Dict[str, pd.DataFrame] = dict(inputs)
+        for key in self.order:
+            deps, compute = _resolve(key)
+            values[key] = compute(*(values[d] for d in deps))
+
+        outputs = {}
+        for name, (deps, compute) in self.specs.items():
+            outputs.update(compute(*(values[d] for d in deps)))
+        return outputs
+
+    def latest(self, panel: AlignedPanel) -> Dict[str, Dict[str, float]]:
+        """자산별 최신 지표값 {code: {출력명: 값}} (직전 MACD 히스토그램 포함)"""
+        if not panel.codes:
+            return {}
+        inputs = {field: pd.DataFrame(panel.observation_aligned(field), columns=panel.codes)
+                  for field in self.inputs}
+        outputs = self.run(inputs)
+
+        latest = {code: {} for code in panel.codes}
+        for output, frame in outputs.items():
+            tail = frame.to_numpy()[-2:]
+            for j, code in enumerate(panel.codes):
+                value = tail[-1, j]
+                if np.isfinite(value):
+                    latest[code][output] = float(value)
+                if output == 'MACD_hist' and len(tail) == 2 and np.isfinite(tail[0, j]):
+                    latest[code]['MACD_hist_prev'] = float(tail[0, j])
+        return latest
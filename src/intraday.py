@@ -0,0 +1,375 @@
+"""
+장중(인트라데이) 봉 저장 및 모니터링 모듈
+
+자산별 최근 N개 봉을 고정 크기 NumPy 링버퍼에 보관하므로
+프로세스가 오래 실행되어도 메모리 사용량이 일정합니다.
+"""
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import pytz
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import INTRADAY_CONFIG, TIMEZONE, get_enabled_assets
+from data_collector import DataCollector
+from alert_manager import AlertManager
+from fanout import FanoutDispatcher
+from results import ResultStore
+from market_calendar import calendar_for, settle_delay
+from volatility import EwmaVolatilityState
+
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '1h': 3600,
+}
+
+# 링버퍼 값 컬럼 순서
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+CLOSE = FIELDS.index('close')
+
+
+class BarRingBuffer:
+    """고정 크기 봉 링버퍼 (타임스탬프는 UTC epoch 초)"""
+
+    def __init__(self, capacity: int, interval: str = '5m', tz: Optional[str] = None):
+        if interval not in INTERVAL_SECONDS:
+            raise ValueError(f"지원하지 않는 장중 간격: {interval}")
+        self.capacity = capacity
+        self.interval = interval
+        self.tz = tz
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(FIELDS)), dtype=np.float64)
+        self.head = 0       # 다음 기록 위치
+        self.count = 0
+        self.rolled_until = None  # 일봉으로 반영 완료된 마지막 날짜
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def interval_seconds(self) -> int:
+        return INTERVAL_SECONDS[self.interval]
+
+    def since(self, ts: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """주어진 시각 이후(포함) 봉들의 (ts, values) 뷰 목록 - 복사 없음"""
+        views = []
+        for seg_ts, seg_values in self.segments():
+            pos = int(np.searchsorted(seg_ts, ts, side='left'))
+            if pos < len(seg_ts):
+                views.append((seg_ts[pos:], seg_values[pos:]))
+        return views
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if self.count == 0:
+            return None
+        return int(self.ts[(self.head - 1) % self.capacity])
+
+    @property
+    def last_close(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return float(self.values[(self.head - 1) % self.capacity, CLOSE])
+
+    def extend(self, ts: np.ndarray, values: np.ndarray):
+        """봉 추가 (정렬된 입력 가정, 마지막 봉과 같은 시각이면 갱신)"""
+        if len(ts) == 0:
+            return
+
+        last = self.last_ts
+        if last is not None:
+            # 진행 중이던 마지막 봉 갱신
+            same = ts == last
+            if same.any():
+                self.values[(self.head - 1) % self.capacity] = values[same][-1]
+            newer = ts > last
+            ts, values = ts[newer], values[newer]
+            if len(ts) == 0:
+                return
+
+        if len(ts) > self.capacity:
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+
+        positions = (self.head + np.arange(len(ts))) % self.capacity
+        self.ts[positions] = ts
+        self.values[positions] = values
+        self.head = int((self.head + len(ts)) % self.capacity)
+        self.count = min(self.capacity, self.count + len(ts))
+
+    def merge_bars(self, ts: np.ndarray, values: np.ndarray):
+        """틱으로 집계한 봉 반영 - 진행 중인 마지막 봉과 같은 시각이면 시가 유지, 고가/저가 확장, 거래량 누적"""
+        if len(ts) and ts[0] == self.last_ts:
+            current = self.values[(self.head - 1) % self.capacity]
+            values[0, 0] = current[0]
+            values[0, 1] = max(values[0, 1], current[1])
+            values[0, 2] = min(values[0, 2], current[2])
+            values[0, 4] += current[4]
+        self.extend(ts, values)
+
+    def extend_frame(self, df: pd.DataFrame):
+        """yfinance 장중 DataFrame 추가"""
+        if df is None or df.empty:
+            return
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None and self.tz is None:
+            self.tz = str(index.tz)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        ts = index.asi8 // 1_000_000_000
+        order = np.argsort(ts, kind='stable')
+        values = df[list(FIELDS)].to_numpy(dtype=np.float64)
+        self.extend(ts[order], values[order])
+
+    def segments(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """시간순 (ts, values) 뷰 목록 - 복사 없이 최대 2개 구간"""
+        if self.count == 0:
+            return []
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            end = start + self.count
+            return [(self.ts[start:end], self.values[start:end])]
+        return [
+            (self.ts[start:], self.values[start:]),
+            (self.ts[:self.head], self.values[:self.head]),
+        ]
+
+    def close_at_or_before(self, ts: int) -> Optional[float]:
+        """주어진 시각 이전 마지막 봉의 종가 (구간별 searchsorted, 복사 없음)"""
+        result = None
+        for seg_ts, seg_values in self.segments():
+            pos = int(np.searchsorted(seg_ts, ts, side='right'))
+            if pos > 0:
+                result = float(seg_values[pos - 1, CLOSE])
+            if pos < len(seg_ts):
+                break
+        return result
+
+    def window_change(self, seconds: int) -> Optional[float]:
+        """최근 구간 변동률(%) - 구간 시작 시점 종가 대비 현재 종가"""
+        last = self.last_ts
+        if last is None:
+            return None
+        base = self.close_at_or_before(last - seconds)
+        if base is None:
+            # 버퍼가 구간보다 짧으면 가장 오래된 봉 기준
+            base = float(self.segments()[0][1][0, CLOSE])
+        if not base:
+            return None
+        return (self.last_close - base) / base * 100
+
+    def completed_daily_bars(self) -> pd.DataFrame:
+        """마지막 봉 날짜 이전의 완료된 일자를 일봉으로 집계"""
+        if self.count == 0:
+            return pd.DataFrame(columns=FIELDS)
+
+        ts = np.concatenate([s[0] for s in self.segments()])
+        values = np.concatenate([s[1] for s in self.segments()])
+        index = pd.to_datetime(ts, unit='s', utc=True)
+        if self.tz:
+            index = index.tz_convert(self.tz)
+        days = index.tz_localize(None).normalize()
+
+        if self.rolled_until is None:
+            # 버퍼의 첫 날짜는 중간부터 시작했을 수 있으므로 반영하지 않음
+            self.rolled_until = days[0]
+
+        frame = pd.DataFrame(values, index=days, columns=FIELDS)
+        completed = (days < days[-1]) & (days > self.rolled_until)
+        frame = frame[completed]
+        if frame.empty:
+            return frame
+
+        daily = frame.groupby(level=0).agg({
+            'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'
+        })
+        daily.index.name = 'Date'
+        self.rolled_until = daily.index[-1]
+        return daily[['close', 'open', 'high', 'low', 'volume']]
+
+
+class IntradayStore:
+    """자산별 장중 링버퍼 모음"""
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or INTRADAY_CONFIG['buffer_size']
+        self.buffers: Dict[str, BarRingBuffer] = {}
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.buffers
+
+    def __getitem__(self, code: str) -> BarRingBuffer:
+        return self.buffers[code]
+
+    def items(self):
+        return self.buffers.items()
+
+    def buffer(self, code: str, interval: str, tz: Optional[str] = None) -> BarRingBuffer:
+        """자산 링버퍼 (없거나 간격이 바뀌면 새로 생성, tz: 일봉 집계 기준 시간대)"""
+        buffer = self.buffers.get(code)
+        if buffer is None or buffer.interval != interval:
+            buffer = BarRingBuffer(self.capacity, interval, tz)
+            self.buffers[code] = buffer
+        return buffer
+
+    def discard(self, code: str):
+        """자산 링버퍼 삭제 (설정에서 제외/변경된 자산)"""
+        self.buffers.pop(code, None)
+
+    def update(self, code: str, df: pd.DataFrame, interval: str):
+        """자산 장중 데이터 반영"""
+        self.buffer(code, interval).extend_frame(df)
+
+    def ingest_bars(self, code: str, interval: str, ts: np.ndarray, values: np.ndarray,
+                    tz: Optional[str] = None):
+        """수신한 봉 반영 (같은 시각의 봉은 마지막 값으로 갱신)"""
+        order = np.argsort(ts, kind='stable')
+        self.buffer(code, interval, tz).extend(ts[order], values[order])
+
+    def roll_up(self) -> Dict[str, pd.DataFrame]:
+        """완료된 장중 봉을 자산별 일봉으로 집계"""
+        rolled = {}
+        for code, buffer in self.buffers.items():
+            daily = buffer.completed_daily_bars()
+            if not daily.empty:
+                rolled[code] = daily
+        return rolled
+
+
+def aggregate_ticks(group: np.ndarray, buckets: np.ndarray, prices: np.ndarray,
+                    sizes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(그룹, 봉 구간, 시각) 순으로 정렬된 틱 → 봉 (그룹, 봉 시각, OHLCV) - 여러 자산을 한 번에 집계"""
+    if len(buckets) == 0:
+        return group, buckets, np.empty((0, len(FIELDS)))
+    boundary = (group[1:] != group[:-1]) | (buckets[1:] != buckets[:-1])
+    starts = np.flatnonzero(np.concatenate(([True], boundary)))
+    ends = np.append(starts[1:], len(buckets)) - 1
+    values = np.empty((len(starts), len(FIELDS)))
+    values[:, 0] = prices[starts]
+    values[:, 1] = np.maximum.reduceat(prices, starts)
+    values[:, 2] = np.minimum.reduceat(prices, starts)
+    values[:, 3] = prices[ends]
+    values[:, 4] = np.add.reduceat(sizes, starts)
+    return group[starts], buckets[starts], values
+
+
+def intraday_interval(info: Dict) -> str:
+    """자산별 장중 간격 (설정 없으면 기본값)"""
+    return info.get('intraday_interval', INTRADAY_CONFIG['default_interval'])
+
+
+class IntradayMonitor:
+    """장중 폴링 모니터"""
+
+    def __init__(self, collector=None, dispatcher=None, store: Optional[IntradayStore] = None):
+        self.collector = collector or DataCollector()
+        self.dispatcher = dispatcher or FanoutDispatcher()
+        self.store = store or IntradayStore()
+        self.volatility = EwmaVolatilityState()
+        self.assets = get_enabled_assets()
+        # 자산별 마지막으로 알림을 보낸 봉 시각 (중복 알림 방지)
+        self.alerted: Dict[str, int] = {}
+        # 자산별 마지막 조회 시각 (휴장 중 조회 생략)
+        self.polled: Dict[str, datetime] = {}
+
+    def apply_config(self, change):
+        """설정 변경 반영 - 제외/변경된 자산의 링버퍼와 상태만 정리 (새 자산은 다음 폴링부터 조회)"""
+        self.assets = get_enabled_assets()
+        for code in change.removed:
+            self.store.discard(code)
+            self.polled.pop(code, None)
+            self.alerted.pop(code, None)
+
+    def _polled_assets(self):
+        """조회 대상 자산 (category, code, info) - 티커 없는 파생 자산 제외"""
+        for category, assets in self.assets.items():
+            for code, info in assets.items():
+                if info.get('spot_ticker') or info.get('ticker'):
+                    yield category, code, info
+
+    def poll_once(self) -> Dict[str, List]:
+        """장중 데이터 1회 수집 → 일봉 반영 → 알림"""
+        now = datetime.now(timezone.utc)
+        for category, code, info in self._polled_assets():
+            calendar = calendar_for(category, info)
+            if not calendar.has_traded_between(self.polled.get(code), now, settle_delay()):
+                continue
+            self.polled[code] = now
+            interval = intraday_interval(info)
+            data = self.collector.fetch_intraday(code, info, interval, category)
+            if data is not None:
+                self.store.update(code, data, interval)
+                self.update_volatility(code)
+
+        self.roll_up()
+        return self.evaluate()
+
+    def roll_up(self):
+        """완료된 일자를 히스토리에 반영하고 장중 변동성 상태 저장"""
+        for code, daily in self.store.roll_up().items():
+            self.collector.update_history(code, daily)
+        self.volatility.save()
+
+    def evaluate(self, codes: Optional[Iterable[str]] = None) -> Dict[str, List]:
+        """장중 알림 판단 → 새 봉의 알림만 발송 (codes: 갱신된 자산만 판단)"""
+        # 장중 알림은 일봉 처리 결과를 쓰지 않으므로 빈 결과 저장소로 생성
+        alerts = AlertManager(ResultStore([])).generate_intraday_alerts(self.store, self.volatility, codes)
+        fresh = {level: [] for level in alerts}
+        for level, items in alerts.items():
+            for code, message in items:
+                last_ts = self.store[code].last_ts
+                if self.alerted.get(code) != last_ts:
+                    fresh[level].append(message)
+        for level in fresh:
+            for code, _ in alerts[level]:
+                self.alerted[code] = self.store[code].last_ts
+
+        if fresh['level2'] or fresh['level3']:
+            self.dispatcher.dispatch({'level1': [], **fresh})
+        return fresh
+
+    def update_volatility(self, code: str):
+        """링버퍼의 새 봉만 장중 EWMA 변동성에 반영 (키: '코드@간격')"""
+        buffer = self.store[code]
+        key = f"{code}@{buffer.interval}"
+        state = self.volatility.states.get(key)
+        start = state['last_ts'] if state else 0
+        for seg_ts, seg_values in buffer.since(start):
+            for ts, close in zip(seg_ts, seg_values[:, CLOSE]):
+                self.volatility.update(key, int(ts), float(close))
+
+    def next_poll_delay(self, poll_seconds: float) -> float:
+        """다음 폴링까지 대기 시간 (모든 시장이 휴장이면 가장 빠른 장 시작까지)"""
+        now = datetime.now(timezone.utc)
+        opens = []
+        for category, code, info in self._polled_assets():
+            calendar = calendar_for(category, info)
+            if calendar.is_open(now - settle_delay()) or calendar.is_open(now):
+                return poll_seconds
+            opens.append(calendar.next_open(now))
+        if not opens:
+            return poll_seconds
+        wake = min(opens)
+        print(f"💤 전체 휴장 - 다음 장 시작 {wake.astimezone(pytz.timezone(TIMEZONE)):%m-%d %H:%M}까지 대기")
+        return max(poll_seconds, (wake - now).total_seconds())
+
+    def run(self, iterations: Optional[int] = None, watcher=None):
+        """폴링 루프 (iterations가 None이면 무한 반복, watcher: 대기 중 설정 파일 변경 반영)"""
+        poll_seconds = INTRADAY_CONFIG['poll_seconds']
+        count = 0
+        while iterations is None or count < iterations:
+            started = time.time()
+            try:
+                alerts = self.poll_once()
+                print(f"⏱️  장중 폴링 완료: 주의 {len(alerts['level2'])}개, "
+                      f"긴급 {len(alerts['level3'])}개")
+            except Exception as e:
+                print(f"❌ 장중 폴링 오류: {e}")
+            count += 1
+            if iterations is None or count < iterations:
+                delay = max(0.0, self.next_poll_delay(poll_seconds) - (time.time() - started))
+                if watcher is not None:
+                    watcher.wait(delay, self.apply_config)
+                else:
+                    time.sleep(delay)
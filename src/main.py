@@ -1,64 +1,266 @@
 """
 원자재/통화 모니터링 시스템 - 메인 실행 파일
 """
+import argparse
+import os
 import sys
-from datetime import datetime
+import time
+from datetime import date, datetime
+import config
+from config import REPORT_CONFIG, QUERY_SERVICE_CONFIG, INGEST_CONFIG, BACKFILL_CONFIG, get_enabled_assets
 from data_collector import DataCollector
+from data_quality import DataQualityStage
+from derived_series import DerivedSeriesStage
+from baskets import BasketStage
 from data_processor import DataProcessor
 from alert_manager import AlertManager
 from telegram_notifier import TelegramNotifier
-from excel_reporter import ExcelReporter
+from fanout import FanoutDispatcher
+from intraday import IntradayMonitor
+from report_view import ReportViewModel
+from report_renderers import render_reports
+from universe import load_universe, parse_shard, filter_shard
+from sharding import save_shard_output, merge_shard_outputs
+from checkpoint import CheckpointStore, STAGES
+from results import ResultStore
+from query_service import QueryService
+from tick_ingest import TickIngestor
+from backfill import Backfiller
+from config_reload import ConfigWatcher
 
-def main():
-    """메인 실행 함수"""
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="원자재/통화 모니터링 시스템")
+    parser.add_argument(
+        '--formats',
+        default=','.join(REPORT_CONFIG['formats']),
+        help="리포트 포맷 (쉼표 구분: xlsx,html,json,csv)"
+    )
+    parser.add_argument(
+        '--intraday',
+        action='store_true',
+        help="장중 폴링 모드로 실행 (링버퍼 기반 장중 알림)"
+    )
+    parser.add_argument(
+        '--iterations',
+        type=int,
+        default=None,
+        help="장중 모드 폴링 횟수 (기본: 무한)"
+    )
+    parser.add_argument(
+        '--universe',
+        default=None,
+        help="유니버스 파일 경로 (CSV/YAML/JSON, 기본: config.ASSETS)"
+    )
+    parser.add_argument(
+        '--shard',
+        default=None,
+        help="샤드 실행 'i/N' (0 <= i < N): 배정된 자산만 수집/처리 후 결과 저장"
+    )
+    parser.add_argument(
+        '--merge',
+        type=int,
+        default=None,
+        metavar='N',
+        help="N개 샤드 결과를 병합해 알림/리포트 생성"
+    )
+    parser.add_argument(
+        '--run-id',
+        default=None,
+        help="실행 ID (샤드 결과/체크포인트 구분용, 기본: 오늘 날짜)"
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="같은 실행 ID의 마지막 완료 단계 다음부터 재개"
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help="실행 결과를 로컬 HTTP/JSON 조회 서비스로 제공 (읽기 전용)"
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=QUERY_SERVICE_CONFIG['port'],
+        help="조회 서비스 포트"
+    )
+    parser.add_argument(
+        '--ingest',
+        action='store_true',
+        help="틱/봉 푸시 수신 모드로 실행 (라인 프로토콜, 갱신된 자산만 장중 알림 판단)"
+    )
+    parser.add_argument(
+        '--ingest-port',
+        type=int,
+        default=INGEST_CONFIG['port'],
+        help="틱 수신 TCP 포트 (INGEST_SOCKET 지정 시 유닉스 소켓 사용)"
+    )
+    parser.add_argument(
+        '--backfill',
+        action='store_true',
+        help="장기 일봉 히스토리 백필 (구간 병렬 조회, 중단 시 재실행하면 남은 구간부터 재개)"
+    )
+    parser.add_argument(
+        '--since',
+        default=BACKFILL_CONFIG['since'],
+        help="백필 시작일 YYYY-MM-DD"
+    )
+    parser.add_argument(
+        '--codes',
+        default=None,
+        help="백필할 자산 코드 (쉼표 구분, 기본: 활성화된 전체 자산)"
+    )
+    return parser.parse_args(argv)
+
+def default_run_id() -> str:
+    """기본 실행 ID (오늘 날짜)"""
+    return datetime.now().strftime('%Y%m%d')
+
+def main(args=None, publish=None, notify=True):
+    """메인 실행 함수 (publish: 처리/알림 결과를 받을 콜백, notify=False면 발송 생략 - 조회 서비스용)"""
+    if args is None:
+        args = parse_args([])
+    if args.run_id is None:
+        args = argparse.Namespace(**{**vars(args), 'run_id': default_run_id()})
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    if args.universe:
+        config.ASSETS = load_universe(args.universe)
+    shard = parse_shard(args.shard) if args.shard else None
+    
     print("=" * 50)
     print("🚀 원자재/통화 모니터링 시스템 시작")
     print(f"⏰ 실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 50)
     
+    # 단계 체크포인트 (실행 ID + 실행 범위별)
+    scope = f"merge{args.merge}" if args.merge else (f"shard_{shard[0]}of{shard[1]}" if shard else 'main')
+    checkpoints = CheckpointStore(args.run_id, scope)
+    resume_from = checkpoints.last_completed() if args.resume else None
+    if args.resume:
+        print(f"♻️  재개 모드: 실행 {args.run_id} ({scope}) - 완료 단계: {resume_from or '없음'}")
+    else:
+        # 같은 실행 ID의 이전 리포트/발송 기록이 재개 시 다시 쓰이지 않도록 새로 시작
+        checkpoints.clear()
+        checkpoints.prune()
+    
+    def completed(stage: str) -> bool:
+        return resume_from is not None and STAGES.index(stage) <= STAGES.index(resume_from)
+    
     try:
-        # 1. 데이터 수집
-        print("\n📥 Step 1: 데이터 수집 중...")
-        collector = DataCollector()
-        raw_data = collector.collect_all_data()
+        if completed('collect'):
+            print("\n📥 Step 1: 체크포인트에서 수집 데이터 복원")
+            raw_data, shard_results = checkpoints.load('collect')
+        elif args.merge:
+            # 1. 샤드 결과 병합 (자산별 결과 재사용, 상관관계만 전체 기준 재계산)
+            print(f"\n🔗 Step 1: 샤드 {args.merge}개 결과 병합 중...")
+            raw_data, shard_results = merge_shard_outputs(args.run_id, args.merge)
+            checkpoints.save('collect', (raw_data, shard_results))
+        else:
+            # 1. 데이터 수집
+            print("\n📥 Step 1: 데이터 수집 중...")
+            assets = get_enabled_assets()
+            if shard:
+                assets = filter_shard(assets, *shard)
+                print(f"🧩 샤드 {shard[0]}/{shard[1]}: "
+                      f"{sum(len(a) for a in assets.values())}개 자산 배정")
+            collector = DataCollector(assets)
+            raw_data, shard_results = collector.collect_all_data(), None
+            
+            if not raw_data:
+                print("❌ 수집된 데이터가 없습니다.")
+                return False
+            
+            print(f"✅ {len(raw_data)}개 자산 데이터 수집 완료")
+            checkpoints.save('collect', (raw_data, None))
         
-        if not raw_data:
-            print("❌ 수집된 데이터가 없습니다.")
-            return False
-        
-        print(f"✅ {len(raw_data)}개 자산 데이터 수집 완료")
+        # 2. 데이터 검증/정렬 및 처리
+        if completed('process'):
+            print("\n📊 Step 2: 체크포인트에서 처리 결과 복원")
+            panel, processed_data = checkpoints.load('process')
+        else:
+            print("\n📊 Step 2: 데이터 처리 및 지표 계산 중...")
+            panel = DataQualityStage(raw_data).run()
+            if not shard:
+                # 파생 자산/바스켓은 모든 입력 자산이 모인 뒤 계산 (샤드 실행은 병합 단계에서)
+                panel = BasketStage().apply(DerivedSeriesStage().apply(panel))
+            processor = DataProcessor(panel.frames, panel=panel)
+            if shard_results is not None:
+                # 샤드에 없던 자산(파생 자산/바스켓)만 처리하고 샤드 결과와 합침
+                missing = [code for code in panel.codes if code not in shard_results.index]
+                if missing:
+                    processor.process_assets(missing)
+                    shard_results = ResultStore.concat([processor.results, shard_results])
+                processor.results = shard_results
+                processor.process_correlations()
+                processed_data = processor.results
+            else:
+                processed_data = processor.process_all()
+            checkpoints.save('process', (panel, processed_data))
+            print("✅ 데이터 처리 완료")
         
-        # 2. 데이터 처리
-        print("\n📊 Step 2: 데이터 처리 및 지표 계산 중...")
-        processor = DataProcessor(raw_data)
-        processed_data = processor.process_all()
-        print("✅ 데이터 처리 완료")
+        if shard:
+            # 샤드 실행은 결과만 저장하고 알림/리포트는 병합 단계에서 수행
+            save_shard_output(args.run_id, shard[0], shard[1],
+                              panel.frames, processed_data)
+            return True
         
         # 3. 알림 생성
-        print("\n🔔 Step 3: 알림 조건 분석 중...")
-        alert_manager = AlertManager(processed_data)
-        alerts = alert_manager.generate_alerts()
+        if completed('alerts'):
+            print("\n🔔 Step 3: 체크포인트에서 알림 복원")
+            alerts, asset_alerts = checkpoints.load('alerts')
+        else:
+            print("\n🔔 Step 3: 알림 조건 분석 중...")
+            alert_manager = AlertManager(processed_data)
+            alerts = alert_manager.generate_alerts()
+            asset_alerts = alert_manager.asset_alerts
+            checkpoints.save('alerts', (alerts, asset_alerts))
+        
+        if publish is not None:
+            publish(processed_data, alerts, asset_alerts)
         
         print(f"   - Level 1 (일반): {len(alerts['level1'])}개")
         print(f"   - Level 2 (주의): {len(alerts['level2'])}개")
         print(f"   - Level 3 (긴급): {len(alerts['level3'])}개")
         
-        # 4. 엑셀 리포트 생성
-        print("\n📄 Step 4: 엑셀 리포트 생성 중...")
-        reporter = ExcelReporter(processed_data)
-        excel_file = reporter.generate_report()
-        print(f"✅ 엑셀 리포트 생성: {excel_file}")
-        
-        # 5. 텔레그램 알림 발송
-        print("\n📱 Step 5: 텔레그램 알림 발송 중...")
-        notifier = TelegramNotifier()
-        notifier.send_daily_report(alerts)
-        
-        # 엑셀 파일도 전송
-        today = datetime.now().strftime('%Y-%m-%d')
-        notifier.send_file(excel_file, f"📊 원자재/통화 상세 리포트 ({today})")
+        # 4. 리포트 생성 (뷰 모델 1회 계산 → 포맷별 렌더링)
+        reports = checkpoints.load('report') if completed('report') else None
+        if reports and all(os.path.exists(report.path) for report in reports.values()):
+            print(f"\n📄 Step 4: 체크포인트에서 리포트 복원: {', '.join(r.path for r in reports.values())}")
+        else:
+            print("\n📄 Step 4: 리포트 생성 중...")
+            view = ReportViewModel(processed_data, panel=panel)
+            reports = render_reports(view, formats, parallel=REPORT_CONFIG['parallel'])
+            checkpoints.save('report', reports)
+            print(f"✅ 리포트 생성: {', '.join(r.path for r in reports.values())}")
         
-        print("✅ 텔레그램 알림 발송 완료")
+        # 5. 텔레그램 알림 발송 (항목별 발송 기록 → 재개 시 미발송 항목만)
+        if completed('notify'):
+            print("\n📱 Step 5: 이미 발송 완료된 실행입니다.")
+        elif not notify:
+            # 조회 서비스 재실행: 같은 실행 ID로 이미 발송했으므로 구독자에게 다시 보내지 않음
+            print("\n📱 Step 5: 이미 발송한 실행 ID - 발송 생략")
+            checkpoints.save('notify', True)
+        else:
+            print("\n📱 Step 5: 텔레그램 알림 발송 중...")
+            dispatcher = FanoutDispatcher()
+            sent = (checkpoints.load('notify_progress') or set()) if args.resume else set()
+            
+            # 구독자별 알림 + 리포트 파일 (재개 시 완료된 발송은 건너뜀)
+            today = datetime.now().strftime('%Y-%m-%d')
+            try:
+                done, failed = dispatcher.dispatch(
+                    alerts, files=list(reports.values()),
+                    caption=f"📊 원자재/통화 상세 리포트 ({today})", skip=sent,
+                )
+                sent |= done
+            finally:
+                checkpoints.save('notify_progress', sent)
+            
+            if failed:
+                raise RuntimeError(f"텔레그램 발송 {len(failed)}건 실패 (--resume 으로 미발송 항목만 재시도)")
+            checkpoints.save('notify', True)
+            print("✅ 텔레그램 알림 발송 완료")
         
         print("\n" + "=" * 50)
         print("✨ 모든 작업 완료!")
@@ -83,6 +285,158 @@ def main():
         
         return False
 
+def run_intraday(args) -> bool:
+    """장중 모니터링 실행"""
+    print("=" * 50)
+    print("⏱️  장중 모니터링 시작")
+    print("=" * 50)
+    watcher = ConfigWatcher()
+    watcher.poll()
+    IntradayMonitor().run(iterations=args.iterations, watcher=watcher)
+    return True
+
+def run_ingest(args) -> bool:
+    """틱 수신 모드 실행 (Ctrl+C로 종료 시 남은 수신분 처리 후 종료)"""
+    print("=" * 50)
+    print("📡 틱 수신 모드 시작")
+    print("=" * 50)
+    watcher = ConfigWatcher()
+    watcher.poll()
+    ingestor = TickIngestor(port=args.ingest_port)
+    ingestor.start()
+    try:
+        watcher.wait(None, ingestor.reload)
+    except KeyboardInterrupt:
+        ingestor.stop()
+    return True
+
+def run_backfill(args) -> bool:
+    """히스토리 백필 실행 → 모든 구간 완료 시 True (공백은 경고로만 보고)"""
+    print("=" * 50)
+    print("📦 히스토리 백필 시작")
+    print("=" * 50)
+    if args.universe:
+        config.ASSETS = load_universe(args.universe)
+    codes = [c.strip() for c in args.codes.split(',') if c.strip()] if args.codes else None
+    try:
+        reports = Backfiller().run(since=date.fromisoformat(args.since), codes=codes)
+    except KeyboardInterrupt:
+        print("\n⏸️  백필 중단 - 다시 실행하면 남은 구간부터 재개합니다")
+        return False
+    return all(not report['incomplete'] for report in reports.values())
+
+def apply_config_change(change, checkpoints: CheckpointStore, live: dict, publish) -> bool:
+    """설정 변경분만 마지막 실행 결과에 반영 → 알림 다시 판단 후 게시 (텔레그램 발송은 다음 실행)
+
+    새로 켰거나 티커 등이 바뀐 자산만 수집/처리하고 (자산 구성이 바뀌면 상관관계 재계산),
+    이동평균은 바뀐 기간만 계산하며, 알림 규칙만 바뀌면 보관된 결과로 알림만 다시 판단합니다.
+    """
+    if not live:
+        if not (checkpoints.has('collect') and checkpoints.has('process')):
+            return False
+        live['raw'], _ = checkpoints.load('collect')
+        live['panel'], live['results'] = checkpoints.load('process')
+    raw_data, panel, processed_data = live['raw'], live['panel'], live['results']
+    started = time.perf_counter()
+    processor = None
+    
+    if change.added or change.removed:
+        raw_data = {code: frame for code, frame in raw_data.items() if code not in change.removed}
+        assets = get_enabled_assets()
+        added = {
+            category: {code: info for code, info in members.items() if code in change.added}
+            for category, members in assets.items()
+        }
+        if any(added.values()):
+            raw_data.update(DataCollector(added).collect_all_data())
+        panel = BasketStage().apply(DerivedSeriesStage().apply(DataQualityStage(raw_data).run()))
+        processor = DataProcessor(panel.frames, panel=panel)
+        # 파생 자산/바스켓은 입력 자산이 바뀌었을 수 있어 다시 계산
+        derived = {code for members in assets.values() for code, info in members.items()
+                   if info.get('formula') or info.get('weights')}
+        kept = [code for code in panel.codes
+                if code in processed_data.index and code not in change.added and code not in derived]
+        processor.process_assets([code for code in panel.codes if code not in set(kept)])
+        processor.results = ResultStore.concat([processor.results, processed_data.select(kept)])
+        processor.process_correlations()
+        print(f"   - 자산 처리: {len(panel.codes) - len(kept)}개 (기존 결과 재사용 {len(kept)}개)")
+    
+    if change.ma_added or change.ma_removed:
+        if processor is None:
+            processor = DataProcessor(panel.frames, panel=panel)
+            processor.results = processed_data
+        processor.refresh_moving_averages(change.ma_added, change.ma_removed)
+    
+    if processor is not None:
+        processed_data = processor.results
+    live.update(raw=raw_data, panel=panel, results=processed_data)
+    
+    alert_manager = AlertManager(processed_data)
+    alerts = alert_manager.generate_alerts()
+    publish(processed_data, alerts, alert_manager.asset_alerts)
+    print(f"✅ 설정 변경 반영 완료 ({time.perf_counter() - started:.2f}초): "
+          f"주의 {len(alerts['level2'])}개, 긴급 {len(alerts['level3'])}개")
+    return True
+
+def run_service(args) -> bool:
+    """조회 서비스 실행: 서버 시작 → 마지막 체크포인트로 즉시 게시 → 파이프라인 실행/주기적 재실행
+
+    실행 ID는 (--run-id 미지정 시) 매 실행마다 오늘 날짜로 정하고, 텔레그램 발송은 실행 ID(날짜)당
+    한 번만 합니다. --resume은 첫 실행에만 적용하고 이후 재실행은 항상 새로 수집합니다.
+    실행 사이에는 설정 파일(CONFIG_FILE)을 감시해 바뀐 부분만 다시 계산해 게시합니다.
+    """
+    service = QueryService(port=args.port)
+    service.start()
+    
+    if args.universe:
+        # 유니버스는 한 번만 읽고 이후 자산 변경은 설정 파일로 (기준값으로 사용)
+        config.ASSETS = load_universe(args.universe)
+        args = argparse.Namespace(**{**vars(args), 'universe': None})
+    watcher = ConfigWatcher()
+    watcher.poll()
+    
+    run_id = args.run_id or default_run_id()
+    checkpoints = CheckpointStore(run_id)
+    if checkpoints.has('process') and checkpoints.has('alerts'):
+        _, processed_data = checkpoints.load('process')
+        service.publish(processed_data, *checkpoints.load('alerts'))
+    
+    # 마지막 실행의 수집/처리 결과 (설정 변경 시 재사용, 새 실행이 게시되면 비움)
+    live = {}
+    
+    def publish(*results):
+        live.clear()
+        service.publish(*results)
+    
+    def on_change(change):
+        try:
+            apply_config_change(change, CheckpointStore(run_id), live, service.publish)
+        except Exception as e:
+            print(f"❌ 설정 변경 반영 오류: {e}")
+    
+    refresh = QUERY_SERVICE_CONFIG['refresh_minutes'] * 60
+    resume = args.resume
+    try:
+        while True:
+            run_id = args.run_id or default_run_id()
+            # 같은 실행 ID로 이미 발송했으면 (이전 재실행/일일 실행) 결과 게시만
+            notify = not CheckpointStore(run_id).has('notify')
+            main(argparse.Namespace(**{**vars(args), 'run_id': run_id, 'resume': resume}),
+                 publish=publish, notify=notify)
+            resume = False
+            watcher.wait(refresh or None, on_change)
+    except KeyboardInterrupt:
+        service.stop()
+    return True
+
 if __name__ == "__main__":
-    success = main()
+    args = parse_args()
+    if args.serve:
+        success = run_service(args)
+    elif args.ingest:
+        success = run_ingest(args)
+    elif args.backfill:
+        success = run_backfill(args)
+    else:
+        success = run_intraday(args) if args.intraday else main(args)
     sys.exit(0 if success else 1)
@@ -0,0 +1,115 @@
+"""
+거래 캘린더 모듈
+
+자산군별 거래 세션(CME 선물, 외환 24/5, 암호화폐 24/7)과 휴일을 정의하고,
+조회가 새 데이터를 돌려줄 수 있는지(마지막 조회 이후 열린 세션이 있는지)와
+다음 장 시작 시각을 계산합니다. 수집기, 조회 캐시 TTL, 장중 데몬이 함께 사용합니다.
+"""
+from datetime import date, datetime, time as dtime, timedelta
+from typing import Dict, Iterator, Optional, Tuple
+import pytz
+from config import MARKET_CALENDARS
+
+# 주말을 넘어 다음 세션을 찾을 때 최대 탐색 일수 (연휴 포함)
+MAX_SCAN_DAYS = 14
+
+
+def _parse_time(value: str) -> dtime:
+    hour, minute = value.split(':')
+    return dtime(int(hour), int(minute))
+
+
+class MarketCalendar:
+    """거래 세션 캘린더
+
+    거래일 D의 세션은 [open, close) 이며 open 시각이 close 시각보다 늦거나 같으면
+    전날 저녁에 개장합니다 (CME 17:00 → 16:00, 외환 17:00 → 17:00).
+    """
+
+    def __init__(self, name: str, timezone: str = 'UTC', open: str = '00:00', close: str = '00:00',
+                 weekdays: Tuple[int, ...] = (0, 1, 2, 3, 4), holidays=(), always_open: bool = False):
+        self.name = name
+        self.tz = pytz.timezone(timezone)
+        self.open_time = _parse_time(open)
+        self.close_time = _parse_time(close)
+        self.weekdays = frozenset(weekdays)
+        self.holidays = frozenset(date.fromisoformat(d) for d in holidays)
+        self.always_open = always_open
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    def session(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """거래일 D의 세션 (UTC 시각) - 거래일이 아니면 None"""
+        if not self.is_trading_day(day):
+            return None
+        open_day = day - timedelta(days=1) if self.open_time >= self.close_time else day
+        opens = self.tz.localize(datetime.combine(open_day, self.open_time))
+        closes = self.tz.localize(datetime.combine(day, self.close_time))
+        return opens.astimezone(pytz.utc), closes.astimezone(pytz.utc)
+
+    def sessions(self, start: date, end: date) -> Iterator[Tuple[datetime, datetime]]:
+        """start ~ end 거래일의 세션 (거래일 순서)"""
+        day = start
+        while day <= end:
+            session = self.session(day)
+            if session is not None:
+                yield session
+            day += timedelta(days=1)
+
+    def _local_date(self, moment: datetime) -> date:
+        return moment.astimezone(self.tz).date()
+
+    def is_open(self, now: datetime) -> bool:
+        """현재 세션 진행 중 여부"""
+        if self.always_open:
+            return True
+        today = self._local_date(now)
+        return any(opens <= now < closes
+                   for opens, closes in self.sessions(today, today + timedelta(days=1)))
+
+    def next_open(self, now: datetime) -> datetime:
+        """다음 장 시작 시각 (진행 중이면 now)"""
+        if self.always_open:
+            return now
+        today = self._local_date(now)
+        for opens, closes in self.sessions(today, today + timedelta(days=MAX_SCAN_DAYS)):
+            if closes > now:
+                return max(opens, now)
+        raise ValueError(f"{self.name}: {MAX_SCAN_DAYS}일 안에 열리는 세션이 없습니다")
+
+    def has_traded_between(self, since: Optional[datetime], now: datetime,
+                           settle: timedelta = timedelta(0)) -> bool:
+        """since 이후 now까지 열린 세션이 있었는지 (세션 종료 후 settle 동안은 진행 중으로 봄)"""
+        if since is None or self.always_open:
+            return since is None or since < now
+        start = self._local_date(since) - timedelta(days=1)
+        end = self._local_date(now) + timedelta(days=1)
+        return any(opens < now and closes + settle > since
+                   for opens, closes in self.sessions(start, end))
+
+
+_CALENDARS: Dict[str, MarketCalendar] = {}
+
+
+def get_calendar(name: str) -> MarketCalendar:
+    """이름으로 캘린더 조회 (설정에서 한 번만 생성)"""
+    if name not in _CALENDARS:
+        spec = MARKET_CALENDARS['calendars'].get(name)
+        if spec is None:
+            raise ValueError(f"알 수 없는 거래 캘린더: {name}")
+        _CALENDARS[name] = MarketCalendar(name, **spec)
+    return _CALENDARS[name]
+
+
+def calendar_for(category: str, info: Optional[Dict] = None) -> MarketCalendar:
+    """자산의 거래 캘린더 (자산 설정 > 카테고리 매핑 > 기본값)"""
+    name = (info or {}).get('calendar') \
+        or MARKET_CALENDARS['categories'].get(category) \
+        or MARKET_CALENDARS['default']
+    return get_calendar(name)
+
+
+def settle_delay() -> timedelta:
+    """장 마감 후 일봉 확정까지 대기 시간"""
+    return timedelta(minutes=MARKET_CALENDARS['settle_minutes'])
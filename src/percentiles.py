@@ -0,0 +1,193 @@
+"""
+과거 가격 분포 백분위 모듈
+
+자산별로 기간(1/3/5/10년) 창마다 정렬된 종가 배열을 파일로 보존합니다.
+- 조회: 정렬 배열에 searchsorted 두 번 (현재가의 중간 순위)
+- 갱신: 새 봉/수정된 봉/창에서 빠지는 봉만 이진 탐색 위치에 삽입·삭제 (전체 재정렬 없음)
+처음 한 번만 히스토리 저장소 전체로 정렬 배열을 만들고, 자산별 파일이라 샤드 병렬 실행에서도 충돌이 없습니다.
+
+    data/state/percentiles/GOLD.npz
+        days, closes      가장 긴 창의 날짜(에포크 일수)/종가 (시간순)
+        first_day         지금까지 본 가장 오래된 날짜 (창 커버리지 판단)
+        sorted_<N>y       N년 창 종가 (오름차순)
+"""
+import os
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from config import PERCENTILE_CONFIG
+from history_store import HistoryStore
+
+
+def span_days(years: int) -> int:
+    """창 길이 (일)"""
+    return int(round(years * 365.25))
+
+
+def to_days(index: pd.Index) -> np.ndarray:
+    """날짜 인덱스 → 에포크 일수 (int64)"""
+    return pd.DatetimeIndex(index).values.astype('datetime64[D]').astype(np.int64)
+
+
+def _remove_sorted(values: np.ndarray, removed: np.ndarray) -> np.ndarray:
+    """정렬 배열에서 값 제거 (같은 값이 여러 개면 그 개수만큼)"""
+    if not len(removed):
+        return values
+    removed = np.sort(removed)
+    # 같은 값을 여러 번 지울 때는 연속된 다음 위치를 사용
+    pos = np.searchsorted(values, removed, side='left') \
+        + (np.arange(len(removed)) - np.searchsorted(removed, removed, side='left'))
+    if pos.size and (pos[-1] >= len(values) or not np.array_equal(values[pos], removed)):
+        raise ValueError("정렬 배열과 시계열이 일치하지 않습니다")
+    return np.delete(values, pos)
+
+
+def _insert_sorted(values: np.ndarray, added: np.ndarray) -> np.ndarray:
+    """정렬 배열에 값 삽입 (정렬 유지)"""
+    if not len(added):
+        return values
+    added = np.sort(added)
+    return np.insert(values, np.searchsorted(values, added, side='right'), added)
+
+
+class PercentileStore:
+    """자산별 기간 창 정렬 배열 저장소"""
+
+    def __init__(self, base_dir: Optional[str] = None, windows: Optional[Iterable[int]] = None,
+                 history: Optional[HistoryStore] = None):
+        self.base_dir = base_dir or PERCENTILE_CONFIG['dir']
+        self.windows = sorted(windows or PERCENTILE_CONFIG['windows'])
+        self.min_coverage = PERCENTILE_CONFIG['min_coverage']
+        self.history = history or HistoryStore()
+
+    # ==================== 파일 ====================
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.base_dir, f"{code}.npz")
+
+    def load(self, code: str) -> Optional[Dict[str, np.ndarray]]:
+        path = self._path(code)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as archive:
+            state = {key: archive[key] for key in archive.files}
+        if any(f'sorted_{w}y' not in state for w in self.windows):
+            return None  # 창 설정이 바뀌면 다시 구성
+        return state
+
+    def save(self, code: str, state: Dict[str, np.ndarray]):
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self._path(code)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **state)
+        os.replace(tmp_path, path)
+
+    # ==================== 구성/갱신 ====================
+
+    def build(self, code: str, data: Optional[pd.DataFrame] = None) -> Dict[str, np.ndarray]:
+        """히스토리 전체(+ 최근 데이터)로 정렬 배열 구성 - 최초 1회 또는 백필 후"""
+        closes = []
+        stored = self.history.read(code)
+        if stored is not None and not stored.empty:
+            closes.append(stored['close'])
+        if data is not None and not data.empty:
+            closes.append(data['close'])
+        if not closes:
+            raise ValueError(f"{code} 백분위 구성용 데이터가 없습니다")
+        series = pd.concat(closes)
+        series = series[~series.index.duplicated(keep='last')].sort_index()
+        series = series[np.isfinite(series.to_numpy(dtype=np.float64)) & (series > 0)]
+
+        days = to_days(series.index)
+        values = series.to_numpy(dtype=np.float64)
+        last_day = days[-1]
+        state = {'first_day': np.array(days[0])}
+        for w in self.windows:
+            state[f'sorted_{w}y'] = np.sort(values[days > last_day - span_days(w)])
+        keep = days > last_day - span_days(self.windows[-1])
+        state['days'], state['closes'] = days[keep], values[keep]
+        return state
+
+    def apply(self, state: Dict[str, np.ndarray], days: np.ndarray, closes: np.ndarray):
+        """새 봉/수정된 봉 반영 - 창마다 변경분만 삽입/삭제"""
+        old_days, old_closes = state['days'], state['closes']
+        if not len(days):
+            return
+        if not len(old_days):
+            raise ValueError("빈 상태에는 변경분을 반영할 수 없습니다")
+
+        # 기존 날짜(수정 여부)와 새 날짜 구분
+        pos = np.searchsorted(old_days, days)
+        clipped = np.minimum(pos, len(old_days) - 1)
+        exists = old_days[clipped] == days
+        changed = exists & (old_closes[clipped] != closes)
+        fresh = ~exists
+
+        merged_days, merged_closes = old_days, old_closes.copy()
+        merged_closes[clipped[changed]] = closes[changed]
+        if fresh.any():
+            at = np.searchsorted(old_days, days[fresh])
+            merged_days = np.insert(merged_days, at, days[fresh])
+            merged_closes = np.insert(merged_closes, at, closes[fresh])
+
+        old_last, new_last = old_days[-1], merged_days[-1]
+        for w in self.windows:
+            span = span_days(w)
+            old_cut, new_cut = old_last - span, new_last - span
+            # 창에서 빠지는 봉 (기존 값 기준)
+            start, stop = np.searchsorted(old_days, [old_cut, new_cut], side='right')
+            removed = [old_closes[start:stop]]
+            added = []
+            # 창 안에서 값이 수정된 봉
+            revised = changed & (days > new_cut)
+            removed.append(old_closes[clipped[revised]])
+            added.append(closes[revised])
+            # 창 안으로 들어온 새 봉
+            added.append(closes[fresh & (days > new_cut)])
+
+            key = f'sorted_{w}y'
+            state[key] = _insert_sorted(_remove_sorted(state[key], np.concatenate(removed)),
+                                        np.concatenate(added))
+
+        keep = merged_days > new_last - span_days(self.windows[-1])
+        state['days'], state['closes'] = merged_days[keep], merged_closes[keep]
+        state['first_day'] = np.array(min(int(state['first_day']), int(days.min())))
+
+    def update(self, code: str, data: pd.DataFrame) -> Dict[str, Optional[float]]:
+        """최근 데이터 반영 후 현재가 백분위 {'1y': ..., '5y': ...}"""
+        series = data['close']
+        values = series.to_numpy(dtype=np.float64)
+        valid = np.isfinite(values) & (values > 0)
+        days, values = to_days(series.index[valid]), values[valid]
+        if not len(values):
+            return {f'{w}y': None for w in self.windows}
+
+        state = self.load(code)
+        try:
+            if state is None:
+                raise ValueError("상태 없음")
+            self.apply(state, days, values)
+        except ValueError:
+            state = self.build(code, data)
+        self.save(code, state)
+        return self.ranks(state, float(values[-1]))
+
+    # ==================== 조회 ====================
+
+    def ranks(self, state: Dict[str, np.ndarray], price: float) -> Dict[str, Optional[float]]:
+        """창별 백분위 (0~100, 같은 값은 중간 순위) - 커버리지가 부족한 창은 None"""
+        last_day = int(state['days'][-1])
+        first_day = int(state['first_day'])
+        ranks = {}
+        for w in self.windows:
+            span = span_days(w)
+            values = state[f'sorted_{w}y']
+            covered = (last_day - max(first_day, last_day - span)) / span
+            if not len(values) or covered < self.min_coverage:
+                ranks[f'{w}y'] = None
+                continue
+            left = np.searchsorted(values, price, side='left')
+            right = np.searchsorted(values, price, side='right')
+            ranks[f'{w}y'] = (left + right) / 2 / len(values) * 100
+        return ranks
@@ -0,0 +1,333 @@
+"""
+시세 제공자 다중화 모듈
+
+자산마다 여러 시세 제공자(Yahoo Finance, Alpha Vantage 등)를 두고 다음 방식으로 일봉을 조회합니다.
+- 라우팅: 제공자별 건강 점수(지연 중앙값 + 실패율 × 실패 비용)가 가장 낮은 제공자를 1순위로 사용
+- 헤지 요청: 1순위 응답이 그 제공자의 최근 지연 백분위(hedge_percentile)를 넘기면 다음 제공자에게도
+  같은 요청을 보내고 먼저 성공한 응답을 사용 (진 요청은 취소)
+- 장애 조치: 실패 응답은 기다리지 않고 바로 다음 제공자로 넘어감
+건강 상태는 data/state/provider_health.json에 저장되어 다음 실행의 라우팅에 반영됩니다.
+
+자산별 제공자는 ASSETS 항목의 'providers': ['alpha_vantage', 'yahoo']로 제한할 수 있고,
+Alpha Vantage 조회 인자는 'alpha_vantage': {'function': 'FX_DAILY', ...}로 직접 지정할 수 있습니다.
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+import requests
+import yfinance as yf
+from yfinance.exceptions import YFPricesMissingError
+import config
+from config import PROVIDER_CONFIG
+
+OHLCV_COLUMNS = ['close', 'open', 'high', 'low', 'volume']
+
+
+def yahoo_daily(ticker: str, start: Union[date, datetime], end: Union[date, datetime],
+                timeout: float = 10) -> pd.DataFrame:
+    """Yahoo Finance 일봉 (start 이상 end 미만, 구간에 거래가 없으면 빈 프레임)
+
+    yf.download는 모듈 전역 결과 저장소를 공유해 동시에 호출하면 결과가 섞이므로
+    스레드에서 호출해도 안전한 Ticker.history를 사용합니다. 네트워크/응답 오류는 예외로 전달합니다.
+    """
+    try:
+        data = yf.Ticker(ticker).history(
+            start=start, end=end, interval='1d', auto_adjust=False, actions=False,
+            timeout=timeout, raise_errors=True,
+        )
+    except YFPricesMissingError:
+        data = pd.DataFrame()
+    if data.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    data = data.rename(columns=str.lower)
+    data.index = pd.DatetimeIndex(data.index).tz_localize(None).normalize()
+    return data[OHLCV_COLUMNS]
+
+
+class PriceProvider:
+    """시세 제공자 기본 클래스"""
+
+    name = ''
+
+    def symbol(self, code: str, category: str, info: Dict) -> Optional[Any]:
+        """자산의 제공자별 조회 식별자 (지원하지 않으면 None)"""
+        raise NotImplementedError
+
+    def fetch(self, symbol: Any, start: datetime, end: datetime,
+              cancel: threading.Event) -> pd.DataFrame:
+        """일봉 조회 (cancel이 설정되면 가능한 빨리 중단), 실패는 예외로 전달"""
+        raise NotImplementedError
+
+
+class YahooProvider(PriceProvider):
+    """Yahoo Finance (yfinance)"""
+
+    name = 'yahoo'
+
+    def symbol(self, code: str, category: str, info: Dict) -> Optional[str]:
+        return info.get('spot_ticker') or info.get('ticker')
+
+    def fetch(self, symbol: str, start: datetime, end: datetime,
+              cancel: threading.Event) -> pd.DataFrame:
+        # yfinance 요청은 중간에 끊을 수 없으므로 요청 제한 시간으로만 묶어 둠
+        return yahoo_daily(symbol, start, end, timeout=PROVIDER_CONFIG['request_timeout'])
+
+
+class AlphaVantageProvider(PriceProvider):
+    """Alpha Vantage (API 키 필요: 환율 FX_DAILY, 암호화폐 DIGITAL_CURRENCY_DAILY, 일부 원자재)"""
+
+    name = 'alpha_vantage'
+    BASE_URL = 'https://www.alphavantage.co/query'
+    # 일별 시계열을 제공하는 원자재 (종가만 제공)
+    COMMODITY_FUNCTIONS = {'CL=F': 'WTI', 'BZ=F': 'BRENT', 'NG=F': 'NATURAL_GAS'}
+    FIELD_PATTERN = re.compile(r'^\d+[a-z]?\. (open|high|low|close|volume)')
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+        self.api_key = api_key if api_key is not None else config.ALPHA_VANTAGE_API_KEY
+        self.base_url = base_url or self.BASE_URL
+        self.session = requests.Session()
+
+    def symbol(self, code: str, category: str, info: Dict) -> Optional[Dict]:
+        if not self.api_key:
+            return None
+        if 'alpha_vantage' in info:
+            return dict(info['alpha_vantage'])
+        ticker = info.get('spot_ticker') or info.get('ticker') or ''
+        if category == 'currencies' and ticker.endswith('=X'):
+            pair = ticker[:-2]
+            base, quote = (pair[:3], pair[3:]) if len(pair) == 6 else ('USD', pair)
+            return {'function': 'FX_DAILY', 'from_symbol': base, 'to_symbol': quote}
+        if category == 'cryptocurrencies' and '-' in ticker:
+            base, market = ticker.split('-', 1)
+            return {'function': 'DIGITAL_CURRENCY_DAILY', 'symbol': base, 'market': market}
+        if ticker in self.COMMODITY_FUNCTIONS:
+            return {'function': self.COMMODITY_FUNCTIONS[ticker], 'interval': 'daily'}
+        return None
+
+    def fetch(self, symbol: Dict, start: datetime, end: datetime,
+              cancel: threading.Event) -> pd.DataFrame:
+        params = dict(symbol, apikey=self.api_key)
+        if symbol['function'] == 'FX_DAILY':
+            # compact는 최근 100개만 반환
+            params.setdefault('outputsize', 'full' if (end - start).days > 140 else 'compact')
+        response = self.session.get(self.base_url, params=params, stream=True,
+                                    timeout=PROVIDER_CONFIG['request_timeout'])
+        try:
+            response.raise_for_status()
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                if cancel.is_set():
+                    raise RuntimeError("취소됨")
+                body.extend(chunk)
+        finally:
+            response.close()
+        data = self.parse(json.loads(body))
+        return data[(data.index >= pd.Timestamp(start).normalize()) & (data.index < pd.Timestamp(end))]
+
+    @classmethod
+    def parse(cls, payload: Dict) -> pd.DataFrame:
+        """응답 JSON → 일봉 프레임 (종가만 있는 시계열은 시가/고가/저가를 종가로 채움)"""
+        for key in ('Error Message', 'Note', 'Information'):
+            if key in payload:
+                raise RuntimeError(payload[key])  # 잘못된 인자, 호출 한도 초과 등
+        if 'data' in payload:
+            rows = pd.DataFrame(payload['data'])
+            if rows.empty:
+                return pd.DataFrame(columns=OHLCV_COLUMNS)
+            close = pd.to_numeric(rows['value'], errors='coerce')  # 누락일은 '.'
+            data = pd.DataFrame({'close': close.to_numpy()}, index=pd.DatetimeIndex(rows['date'].to_numpy()))
+            data = data.dropna()
+            for column in ('open', 'high', 'low'):
+                data[column] = data['close']
+            data['volume'] = 0.0
+            return data.sort_index()[OHLCV_COLUMNS]
+
+        series = next((v for k, v in payload.items() if k.startswith('Time Series')), None)
+        if series is None:
+            raise RuntimeError(f"알 수 없는 응답: {', '.join(payload)}")
+        data = pd.DataFrame.from_dict(series, orient='index')
+        # '1. open' 또는 '1a. open (USD)' → 'open' (같은 이름이 여러 개면 첫 번째 = 조회 통화 기준)
+        columns = {}
+        for column in data.columns:
+            match = cls.FIELD_PATTERN.match(column)
+            if match and match.group(1) not in columns.values():
+                columns[column] = match.group(1)
+        data = data[list(columns)].rename(columns=columns).apply(pd.to_numeric, errors='coerce')
+        if 'volume' not in data:
+            data['volume'] = 0.0  # 환율은 거래량 없음
+        data.index = pd.DatetimeIndex(data.index)
+        return data.sort_index()[OHLCV_COLUMNS]
+
+
+PROVIDERS = {
+    YahooProvider.name: YahooProvider,
+    AlphaVantageProvider.name: AlphaVantageProvider,
+}
+
+
+def build_providers(names: Optional[List[str]] = None) -> List[PriceProvider]:
+    """설정된 이름 순서대로 제공자 생성"""
+    return [PROVIDERS[name]() for name in (names or PROVIDER_CONFIG['providers'])]
+
+
+class ProviderHealth:
+    """제공자별 성공률(EWMA)과 최근 지연 표본"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else PROVIDER_CONFIG['health_file']
+        self.state: Dict[str, Dict] = {}
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def _entry(self, name: str) -> Dict:
+        return self.state.setdefault(name, {'success': 1.0, 'latencies': []})
+
+    def record(self, name: str, latency: float, ok: bool):
+        entry = self._entry(name)
+        alpha = PROVIDER_CONFIG['success_alpha']
+        entry['success'] = (1 - alpha) * entry['success'] + alpha * (1.0 if ok else 0.0)
+        self.record_latency(name, latency)
+
+    def record_latency(self, name: str, latency: float):
+        """지연만 기록 (헤지에 져서 취소된 요청: 최소 이만큼 걸렸다는 하한)"""
+        latencies = self._entry(name)['latencies']
+        latencies.append(round(latency, 4))
+        del latencies[:-PROVIDER_CONFIG['latency_samples']]
+
+    def latency(self, name: str, percentile: float) -> Optional[float]:
+        latencies = self._entry(name)['latencies']
+        if len(latencies) < PROVIDER_CONFIG['min_samples']:
+            return None
+        return float(np.percentile(latencies, percentile))
+
+    def score(self, name: str) -> float:
+        """예상 지연(초) = 지연 중앙값 + 실패율 × 실패 비용 - 낮을수록 우선"""
+        median = self.latency(name, 50)
+        if median is None:
+            median = PROVIDER_CONFIG['default_hedge_seconds'] / 2
+        return median + (1.0 - self._entry(name)['success']) * PROVIDER_CONFIG['failure_penalty_seconds']
+
+    def hedge_delay(self, name: str) -> float:
+        """이 시간 안에 응답이 없으면 헤지 요청 (최근 지연 백분위, 표본 부족 시 기본값)"""
+        delay = self.latency(name, PROVIDER_CONFIG['hedge_percentile'])
+        if delay is None:
+            return PROVIDER_CONFIG['default_hedge_seconds']
+        return min(max(delay, PROVIDER_CONFIG['hedge_min_seconds']), PROVIDER_CONFIG['hedge_max_seconds'])
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class FailoverFetcher:
+    """건강 점수 라우팅 + 헤지 요청 + 장애 조치 일봉 조회"""
+
+    def __init__(self, providers: Optional[List[PriceProvider]] = None,
+                 health: Optional[ProviderHealth] = None):
+        self.providers = providers if providers is not None else build_providers()
+        self.health = health or ProviderHealth()
+        self._executor = None
+        self.hedges = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """조회 스레드 풀 (첫 조회 시 생성, close() 후 다시 조회하면 새로 생성)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=PROVIDER_CONFIG['workers'],
+                                                thread_name_prefix='provider')
+        return self._executor
+
+    def route(self, code: str, category: str, info: Dict) -> List[Tuple[PriceProvider, Any]]:
+        """자산이 지원하는 제공자를 건강 점수 순으로 정렬 (동점이면 설정 순서)"""
+        allowed = info.get('providers')
+        candidates = []
+        for order, provider in enumerate(self.providers):
+            if allowed is not None and provider.name not in allowed:
+                continue
+            symbol = provider.symbol(code, category, info)
+            if symbol is not None:
+                candidates.append((self.health.score(provider.name), order, provider, symbol))
+        candidates.sort(key=lambda c: c[:2])
+        return [(provider, symbol) for _, _, provider, symbol in candidates]
+
+    def fetch(self, code: str, category: str, info: Dict, start: datetime,
+              end: datetime) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """일봉 조회 → (데이터, 응답한 제공자 이름), 모든 제공자 실패 시 (None, None)"""
+        queue = self.route(code, category, info)
+        if not queue:
+            return None, None
+        deadline = time.monotonic() + PROVIDER_CONFIG['deadline_seconds']
+        inflight = {}
+
+        def launch():
+            provider, symbol = queue.pop(0)
+            cancel = threading.Event()
+            future = self.executor.submit(provider.fetch, symbol, start, end, cancel)
+            inflight[future] = (provider, time.monotonic(), cancel)
+            return time.monotonic() + self.health.hedge_delay(provider.name)
+
+        hedge_at = launch()
+        result = None
+        while inflight and result is None:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            until = min(deadline, hedge_at) if queue else deadline
+            done, _ = wait(inflight, timeout=max(until - now, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                if queue and time.monotonic() >= hedge_at:
+                    slow = ', '.join(p.name for p, _, _ in inflight.values())
+                    print(f"🐢 {code} {slow} 응답 지연 → {queue[0][0].name} 헤지 요청")
+                    self.hedges += 1
+                    hedge_at = launch()
+                continue
+
+            for future in done:
+                provider, started, _ = inflight.pop(future)
+                latency = time.monotonic() - started
+                try:
+                    data, error = future.result(), None
+                except Exception as e:
+                    data, error = None, e
+                ok = data is not None and not data.empty
+                self.health.record(provider.name, latency, ok)
+                if ok and result is None:
+                    result = (data, provider.name)
+                elif not ok:
+                    print(f"⚠️  {code} {provider.name} 조회 실패: {error or '데이터 없음'}")
+            if result is None and not inflight and queue:
+                hedge_at = launch()  # 실패 → 다음 제공자로 즉시 전환
+
+        # 진 요청 취소 (이미 실행 중이면 취소 신호만 전달) / 제한 시간 초과는 실패로 기록
+        for future, (provider, started, cancel) in inflight.items():
+            cancel.set()
+            future.cancel()
+            elapsed = time.monotonic() - started
+            if result is None:
+                self.health.record(provider.name, elapsed, False)
+            else:
+                self.health.record_latency(provider.name, elapsed)
+        if result is None:
+            print(f"❌ {code} 모든 제공자 조회 실패")
+            return None, None
+        return result
+
+    def close(self):
+        """건강 상태 저장 (실행 중인 진 요청은 기다리지 않음)"""
+        self.health.save()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,196 @@
+"""
+로컬 조회 서비스 모듈 (읽기 전용 HTTP/JSON)
+
+파이프라인 결과(DataProcessor/AlertManager)를 불변 스냅샷으로 만들어 메모리에 두고,
+실행이 끝날 때마다 참조 하나만 교체(원자적 스왑)합니다. 요청 처리 중에는 잠금이 없으므로
+조회가 파이프라인을 막지 않고, 자산별 응답은 미리 직렬화해 두어 조회가 사전 탐색 수준으로 끝납니다.
+
+    GET /health                      스냅샷 버전/생성 시각
+    GET /assets?fields=a,b.c         전체 자산 (필드 선택)
+    GET /assets/<code>?fields=...    자산 하나
+    GET /categories                  카테고리 목록
+    GET /categories/<cat>?fields=... 카테고리별 자산
+    GET /alerts                      레벨별 알림 메시지
+    GET /correlations                상관관계/이탈 쌍
+"""
+import json
+import math
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import MappingProxyType
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import numpy as np
+import pandas as pd
+from config import QUERY_SERVICE_CONFIG, get_enabled_assets
+from results import ResultStore
+
+
+def to_jsonable(value):
+    """JSON 직렬화 가능한 값으로 변환 (NaN → None, 날짜 키 → 문자열)"""
+    if isinstance(value, dict):
+        return {_key(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _key(key) -> str:
+    if isinstance(key, pd.Timestamp):
+        return key.strftime('%Y-%m-%d')
+    return str(key)
+
+
+def project(record: Dict, fields: List[str]) -> Dict:
+    """필드 선택 (점 표기로 중첩 필드 지정: moving_averages.MA20)"""
+    out = {}
+    for field in fields:
+        value, found = record, True
+        for part in field.split('.'):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                found = False
+                break
+        if found:
+            out[field] = value
+    return out
+
+
+class Snapshot:
+    """불변 조회 스냅샷 (생성 후 수정하지 않음)"""
+
+    def __init__(self, processed_data: ResultStore, alerts: Dict[str, List],
+                 asset_alerts: Optional[Dict[str, Dict]] = None, version: int = 0):
+        asset_alerts = asset_alerts or {}
+        self.version = version
+        self.generated_at = datetime.now().isoformat(timespec='seconds')
+
+        assets, categories = {}, {}
+        for category, members in get_enabled_assets().items():
+            codes = []
+            for code, info in members.items():
+                if code not in processed_data:
+                    continue
+                record = {'code': code, 'category': category, 'name': info['name']}
+                record.update(processed_data.record(code))
+                state = asset_alerts.get(code, {})
+                record['alert_level'] = state.get('level')
+                record['alerts'] = list(state.get('messages', []))
+                assets[code] = record
+                codes.append(code)
+            categories[category] = tuple(codes)
+
+        self.assets = MappingProxyType(assets)
+        self.categories = MappingProxyType(categories)
+        self.alerts = MappingProxyType(to_jsonable(alerts))
+        self.correlations = MappingProxyType({
+            'correlations': to_jsonable(processed_data.correlations),
+            'correlation_deviations': to_jsonable(processed_data.correlation_deviations),
+            'correlation_breaks': to_jsonable(processed_data.correlation_breaks),
+        })
+        # 필드 선택이 없는 자산 조회는 미리 직렬화한 바이트를 그대로 응답
+        self.encoded = MappingProxyType({code: _encode(record) for code, record in assets.items()})
+
+    def meta(self) -> Dict:
+        return {'version': self.version, 'generated_at': self.generated_at,
+                'assets': len(self.assets)}
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET 전용 요청 처리기"""
+
+    def do_GET(self):
+        snapshot = self.server.service.snapshot  # 참조 1회 읽기 → 요청 내내 같은 스냅샷
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+        fields = [f for f in ','.join(query.get('fields', [])).split(',') if f]
+
+        if snapshot is None:
+            return self._send(503, _encode({'error': '스냅샷 준비 중'}))
+        if parts == ['health']:
+            return self._send(200, _encode(snapshot.meta()))
+        if parts == ['alerts']:
+            return self._send(200, _encode(dict(snapshot.alerts)))
+        if parts == ['correlations']:
+            return self._send(200, _encode(dict(snapshot.correlations)))
+        if parts == ['categories']:
+            return self._send(200, _encode({c: list(codes) for c, codes in snapshot.categories.items()}))
+        if parts and parts[0] == 'assets':
+            if len(parts) == 1:
+                return self._send(200, _encode(self._records(snapshot, list(snapshot.assets), fields)))
+            code = parts[1]
+            if code not in snapshot.assets:
+                return self._send(404, _encode({'error': f'알 수 없는 자산: {code}'}))
+            if not fields:
+                return self._send(200, snapshot.encoded[code])
+            return self._send(200, _encode(project(snapshot.assets[code], fields)))
+        if len(parts) == 2 and parts[0] == 'categories':
+            codes = snapshot.categories.get(parts[1])
+            if codes is None:
+                return self._send(404, _encode({'error': f'알 수 없는 카테고리: {parts[1]}'}))
+            return self._send(200, _encode(self._records(snapshot, codes, fields)))
+        return self._send(404, _encode({'error': f'알 수 없는 경로: {url.path}'}))
+
+    @staticmethod
+    def _records(snapshot: Snapshot, codes, fields: List[str]) -> Dict:
+        if not fields:
+            return {code: snapshot.assets[code] for code in codes}
+        return {code: project(snapshot.assets[code], fields) for code in codes}
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 로그를 남기지 않음
+
+
+class QueryService:
+    """스냅샷 보관 + 백그라운드 HTTP 서버"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.host = host or QUERY_SERVICE_CONFIG['host']
+        self.port = port if port is not None else QUERY_SERVICE_CONFIG['port']
+        self.snapshot: Optional[Snapshot] = None
+        self._version = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def publish(self, processed_data: ResultStore, alerts: Dict[str, List],
+                asset_alerts: Optional[Dict[str, Dict]] = None):
+        """새 스냅샷을 만든 뒤 참조만 교체 (읽는 쪽은 이전/새 스냅샷 중 하나를 온전히 봄)"""
+        self._version += 1
+        self.snapshot = Snapshot(processed_data, alerts, asset_alerts, version=self._version)
+        print(f"🔄 조회 스냅샷 v{self._version} 게시 ({len(self.snapshot.assets)}개 자산)")
+
+    def start(self):
+        """백그라운드 스레드에서 서버 시작"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.port = self._server.server_address[1]
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        print(f"🌐 조회 서비스 시작: http://{self.host}:{self.port}")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
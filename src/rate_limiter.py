@@ -0,0 +1,67 @@
+"""
+요청 속도 제한 모듈
+
+외부 API 호출(텔레그램 발송, 시세 조회 등)에서 공통으로 사용하는 스레드 안전 속도 제한기입니다.
+- TokenBucket: 초당 rate개, 최대 burst개까지 몰아서 허용
+- KeyedRateLimiter: 키(채팅방, 호스트 등)별 최소 간격
+"""
+import threading
+import time
+from typing import Dict, Hashable, Optional
+
+
+class TokenBucket:
+    """토큰 버킷 (전역 속도 제한)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """토큰 1개 예약 → 사용 가능할 때까지 기다려야 할 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        """토큰 1개 사용 (필요하면 대기)"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class KeyedRateLimiter:
+    """키별 최소 간격 제한"""
+
+    def __init__(self, interval: float):
+        self.interval = float(interval)
+        self.next_time: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def ready_at(self, key: Hashable) -> float:
+        """키가 다음으로 허용되는 시각 (time.monotonic 기준)"""
+        return self.next_time.get(key, 0.0)
+
+    def reserve(self, key: Hashable) -> float:
+        """키 사용 예약 → 기다려야 할 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_time.get(key, 0.0))
+            self.next_time[key] = start + self.interval
+            return start - now
+
+    def defer(self, key: Hashable, seconds: float):
+        """서버가 요청한 대기 시간(429 retry_after 등) 반영"""
+        with self._lock:
+            self.next_time[key] = max(self.next_time.get(key, 0.0), time.monotonic() + seconds)
+
+    def acquire(self, key: Hashable):
+        delay = self.reserve(key)
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,275 @@
+"""
+리포트 렌더러 모듈
+
+하나의 ReportViewModel을 여러 포맷(xlsx, html, json, csv)으로 출력합니다.
+뷰 모델은 읽기 전용이므로 렌더러들을 병렬로 실행할 수 있습니다.
+자산이 많으면 카테고리/설정한 자산 그룹별 부분 뷰로 나눠 그룹 × 포맷 파일을 프로세스 풀에서 만들고,
+선택적으로 zip 묶음(업로드 한도를 넘으면 여러 개)으로 발송합니다.
+각 파일에는 뷰 모델 내용 해시(digest)를 붙여 내용이 같은 리포트의 재업로드를 건너뛸 수 있게 합니다.
+"""
+import base64
+import csv
+import hashlib
+import html
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+from config import FANOUT_CONFIG, REPORT_CONFIG, REPORT_DIR, SPARKLINE_CONFIG
+from excel_reporter import ExcelReporter
+from report_view import ReportViewModel
+
+
+class ReportFile(NamedTuple):
+    """발송할 리포트 파일"""
+    slot: str     # 날짜와 무관한 파일 자리 ('xlsx', 'xlsx/commodities', 'bundle' 등)
+    path: str
+    digest: str   # 내용 해시 (포맷 + 뷰 모델 테이블, 생성 시각 제외)
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class BaseRenderer:
+    """렌더러 기본 클래스"""
+
+    extension = ''
+
+    def filepath(self, view: ReportViewModel, group: str = '') -> str:
+        """기본 출력 경로 (그룹별 파일은 이름 뒤에 그룹 표시)"""
+        os.makedirs(REPORT_DIR, exist_ok=True)
+        suffix = f"_{group}" if group else ''
+        filename = f"commodity_report_{view.date_tag}{suffix}.{self.extension}"
+        return os.path.join(REPORT_DIR, filename)
+
+    def render(self, view: ReportViewModel, filepath: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+
+class XlsxRenderer(BaseRenderer):
+    """엑셀 렌더러 (ExcelReporter 위임)"""
+
+    extension = 'xlsx'
+
+    def render(self, view: ReportViewModel, filepath: Optional[str] = None) -> str:
+        return ExcelReporter(view=view).generate_report(filepath or self.filepath(view))
+
+
+class HtmlRenderer(BaseRenderer):
+    """HTML 렌더러 (단일 파일, 외부 리소스 없음)"""
+
+    extension = 'html'
+
+    def render(self, view: ReportViewModel, filepath: Optional[str] = None) -> str:
+        filepath = filepath or self.filepath(view)
+        parts = [
+            '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8">',
+            f'<title>원자재/통화 리포트 {view.generated_at:%Y-%m-%d}</title>',
+            '<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:24px}'
+            'th{background:#366092;color:#fff}th,td{border:1px solid #ccc;padding:4px 8px}'
+            'td.num{text-align:right}</style></head><body>',
+            f'<h1>📊 원자재/통화 리포트 ({view.generated_at:%Y-%m-%d %H:%M})</h1>',
+        ]
+
+        for table in view:
+            parts.append(f'<h2>{html.escape(table.title)}</h2><table><tr>')
+            parts.extend(f'<th>{html.escape(c)}</th>' for c in table.columns)
+            parts.append('</tr>')
+            for row in table.rows():
+                parts.append('<tr>')
+                for value in row:
+                    if value is None:
+                        parts.append('<td>-</td>')
+                    elif isinstance(value, float):
+                        parts.append(f'<td class="num">{value:,.2f}</td>')
+                    else:
+                        parts.append(f'<td>{html.escape(str(value))}</td>')
+                parts.append('</tr>')
+            parts.append('</table>')
+            if table.key == 'sparklines' and view.sparklines is not None and len(view.sparklines):
+                image = base64.b64encode(view.sparklines.to_png()).decode('ascii')
+                parts.append(f'<img alt="추이" src="data:image/png;base64,{image}">')
+
+        parts.append('</body></html>')
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
+        print(f"✅ HTML 리포트 생성: {filepath}")
+        return filepath
+
+
+class JsonRenderer(BaseRenderer):
+    """JSON 렌더러 (컬럼 지향, 결측은 null)"""
+
+    extension = 'json'
+
+    def render(self, view: ReportViewModel, filepath: Optional[str] = None) -> str:
+        filepath = filepath or self.filepath(view)
+        payload = {
+            'generated_at': view.generated_at.isoformat(timespec='seconds'),
+            'tables': {
+                table.key: {
+                    'title': table.title,
+                    'columns': table.columns,
+                    'rows': list(table.rows()),
+                    'meta': {k: v.tolist() for k, v in table.meta.items()},
+                }
+                for table in view
+            }
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        print(f"✅ JSON 리포트 생성: {filepath}")
+        return filepath
+
+
+class CsvRenderer(BaseRenderer):
+    """CSV 렌더러 (테이블별 섹션, 엑셀 호환 UTF-8 BOM)"""
+
+    extension = 'csv'
+
+    def render(self, view: ReportViewModel, filepath: Optional[str] = None) -> str:
+        filepath = filepath or self.filepath(view)
+        with open(filepath, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            for table in view:
+                writer.writerow([table.title])
+                writer.writerow(table.columns)
+                writer.writerows(table.rows(missing=''))
+                writer.writerow([])
+        print(f"✅ CSV 리포트 생성: {filepath}")
+        return filepath
+
+
+RENDERERS = {
+    'xlsx': XlsxRenderer,
+    'html': HtmlRenderer,
+    'json': JsonRenderer,
+    'csv': CsvRenderer,
+}
+
+
+def report_groups(view: ReportViewModel, split: Optional[str] = None) -> Dict[str, List[str]]:
+    """리포트 파일 분할 단위 {그룹 이름: 자산 코드} - 분할하지 않으면 {'': 전체}"""
+    split = split or REPORT_CONFIG['split']
+    codes = view.codes
+    if split == 'auto':
+        split = 'category' if len(codes) > REPORT_CONFIG['split_min_assets'] else 'none'
+    if split == 'none':
+        return {'': codes}
+
+    groups: Dict[str, List[str]] = {}
+    if split == 'category':
+        for code, category in view.categories.items():
+            groups.setdefault(category, []).append(code)
+    elif split == 'groups':
+        assigned = set()
+        for name, members in REPORT_CONFIG['groups'].items():
+            members = set(members) - assigned
+            groups[name] = [code for code in codes if code in members]
+            assigned |= members
+        groups['others'] = [code for code in codes if code not in assigned]
+    else:
+        raise ValueError(f"지원하지 않는 리포트 분할 방식: {split}")
+
+    # 큰 그룹은 여러 파일로 나눠 자산 수가 아니라 코어 수에 비례해 병렬 생성
+    size = REPORT_CONFIG['max_assets_per_part']
+    parts = {}
+    for name, members in groups.items():
+        if size and len(members) > size:
+            for i in range(0, len(members), size):
+                parts[f"{name}_{i // size + 1}"] = members[i:i + size]
+        elif members:
+            parts[name] = members
+    return parts
+
+
+def _render_part(fmt: str, view: ReportViewModel, filepath: str) -> str:
+    """프로세스 풀 작업 단위 (그룹 1개 × 포맷 1개)"""
+    return RENDERERS[fmt]().render(view, filepath)
+
+
+def bundle_reports(files: List[ReportFile], date_tag: str) -> Dict[str, ReportFile]:
+    """리포트 파일을 zip으로 묶음 (텔레그램 업로드 한도를 넘지 않도록 나눔) → {자리: zip}"""
+    limit = FANOUT_CONFIG['max_document_bytes']
+    volumes: List[List[ReportFile]] = [[]]
+    size = 0
+    for report in files:
+        file_size = os.path.getsize(report.path)
+        if volumes[-1] and size + file_size > limit:
+            volumes.append([])
+            size = 0
+        volumes[-1].append(report)
+        size += file_size
+
+    bundles = {}
+    for i, members in enumerate(volumes, 1):
+        suffix = f"_{i}" if len(volumes) > 1 else ''
+        zip_path = os.path.join(REPORT_DIR, f"commodity_report_{date_tag}{suffix}.zip")
+        with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for report in members:
+                archive.write(report.path, arcname=os.path.basename(report.path))
+        slot = f"bundle{suffix}"
+        bundles[slot] = ReportFile(slot, zip_path, _digest(*sorted(r.digest for r in members)))
+    print(f"🗜️  리포트 {len(files)}개 파일 → zip {len(bundles)}개")
+    return bundles
+
+
+def render_sparkline_image(view: ReportViewModel) -> ReportFile:
+    """전체 자산 추이 합성 이미지 (PNG 한 장) → 발송용 파일"""
+    png = view.sparklines.to_png()
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, f"commodity_sparklines_{view.date_tag}.png")
+    with open(path, 'wb') as f:
+        f.write(png)
+    print(f"✅ 추이 이미지 생성: {path} ({len(view.sparklines)}개 자산)")
+    return ReportFile('sparklines', path, hashlib.blake2b(png, digest_size=16).hexdigest())
+
+
+def render_reports(view: ReportViewModel, formats: List[str], parallel: bool = True,
+                   split: Optional[str] = None, bundle: Optional[bool] = None) -> Dict[str, ReportFile]:
+    """선택한 포맷들로 리포트 출력 → 발송할 파일 {자리: ReportFile}
+
+    그룹이 여러 개면 자리는 '포맷/그룹', bundle이면 zip 파일만 반환합니다 (추이 이미지는 별도 자리).
+    """
+    unknown = [fmt for fmt in formats if fmt not in RENDERERS]
+    if unknown:
+        raise ValueError(f"지원하지 않는 리포트 포맷: {', '.join(unknown)}")
+    groups = report_groups(view, split)
+    bundle = REPORT_CONFIG['bundle'] if bundle is None else bundle
+
+    if list(groups) == ['']:
+        content = view.content_hash()
+        if not parallel or len(formats) <= 1:
+            paths = {fmt: RENDERERS[fmt]().render(view) for fmt in formats}
+        else:
+            with ThreadPoolExecutor(max_workers=len(formats)) as executor:
+                futures = {fmt: executor.submit(RENDERERS[fmt]().render, view) for fmt in formats}
+                paths = {fmt: future.result() for fmt, future in futures.items()}
+        reports = {fmt: ReportFile(fmt, path, _digest(fmt, content)) for fmt, path in paths.items()}
+    else:
+        jobs, digests = {}, {}
+        for name, codes in groups.items():
+            part = view.subset(codes)
+            content = part.content_hash()
+            for fmt in formats:
+                slot = f"{fmt}/{name}"
+                jobs[slot] = (fmt, part, RENDERERS[fmt]().filepath(view, name))
+                digests[slot] = _digest(fmt, content)
+        if parallel and len(jobs) > 1:
+            workers = min(REPORT_CONFIG['workers'] or os.cpu_count() or 1, len(jobs))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {slot: executor.submit(_render_part, *job) for slot, job in jobs.items()}
+                paths = {slot: future.result() for slot, future in futures.items()}
+        else:
+            paths = {slot: _render_part(*job) for slot, job in jobs.items()}
+        reports = {slot: ReportFile(slot, path, digests[slot]) for slot, path in paths.items()}
+        print(f"🧩 리포트 {len(groups)}개 그룹 × {len(formats)}개 포맷 = {len(reports)}개 파일")
+
+    if bundle:
+        reports = bundle_reports(list(reports.values()), view.date_tag)
+    # 추이 이미지는 분할/묶음과 무관하게 전체 자산 한 장으로 따로 발송
+    if SPARKLINE_CONFIG['send_image'] and view.sparklines is not None and len(view.sparklines):
+        reports['sparklines'] = render_sparkline_image(view)
+    return reports
@@ -0,0 +1,455 @@
+"""
+리포트 뷰 모델 모듈
+
+처리 결과에서 리포트 테이블을 한 번만 계산해 컬럼 배열로 보관합니다.
+엑셀/HTML/JSON/CSV 렌더러는 모두 이 뷰 모델을 읽기만 합니다.
+"""
+import copy
+import hashlib
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+from config import PERCENTILE_CONFIG, SPARKLINE_CONFIG, get_enabled_assets
+from data_quality import AlignedPanel
+from results import ResultStore
+from sparklines import Sparklines
+
+CATEGORY_NAMES = {
+    'commodities': '원자재',
+    'currencies': '통화',
+    'cryptocurrencies': '암호화폐',
+    'derived': '파생',
+    'baskets': '바스켓',
+}
+
+
+class ReportTable:
+    """리포트 테이블 (컬럼별 배열)"""
+
+    def __init__(self, key: str, title: str, columns: List[str],
+                 data: Dict[str, np.ndarray], meta: Optional[Dict[str, np.ndarray]] = None,
+                 asset_columns: bool = False):
+        self.key = key
+        self.title = title
+        self.columns = columns
+        self.data = data
+        # 렌더링하지 않는 보조 컬럼 (자산 코드, 카테고리 등)
+        self.meta = meta or {}
+        # True면 자산이 행이 아니라 열 (첫 열 다음부터 meta['code'] 순서)
+        self.asset_columns = asset_columns
+
+    def __len__(self) -> int:
+        if not self.columns:
+            return 0
+        return len(self.data[self.columns[0]])
+
+    def rows(self, missing=None):
+        """행 단위 반복 (NaN은 missing 값으로 치환)"""
+        columns = [self.data[c] for c in self.columns]
+        for i in range(len(self)):
+            yield [_cell(col[i], missing) for col in columns]
+
+    def subset(self, codes: Set[str]) -> 'ReportTable':
+        """자산 코드 기준 부분 테이블 (자산 쌍 테이블은 한쪽이라도 포함되면 유지)"""
+        if self.asset_columns:
+            keep = np.array([code in codes for code in self.meta['code']], dtype=bool)
+            columns = self.columns[:1] + [c for c, k in zip(self.columns[1:], keep) if k]
+            return ReportTable(self.key, self.title, columns, {c: self.data[c] for c in columns},
+                               {k: v[keep] for k, v in self.meta.items()}, asset_columns=True)
+        if 'code' in self.meta:
+            mask = np.array([code in codes for code in self.meta['code']], dtype=bool)
+        elif 'code1' in self.meta:
+            mask = np.array([c1 in codes or c2 in codes
+                             for c1, c2 in zip(self.meta['code1'], self.meta['code2'])], dtype=bool)
+        else:
+            return self
+        return ReportTable(self.key, self.title, self.columns,
+                           {c: v[mask] for c, v in self.data.items()},
+                           {k: v[mask] for k, v in self.meta.items()})
+
+
+def _cell(value, missing):
+    """배열 원소를 파이썬 기본 타입으로 변환"""
+    if value is None:
+        return missing
+    if isinstance(value, (float, np.floating)):
+        return missing if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    return value
+
+
+def _numeric(values: List) -> np.ndarray:
+    """숫자 컬럼 (결측은 NaN)"""
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _pct_change(current: np.ndarray, base: np.ndarray) -> np.ndarray:
+    """기준 대비 변동률(%) - 결측/0 기준은 NaN"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (current - base) / base * 100
+    change[~np.isfinite(change)] = np.nan
+    return change
+
+
+def _text(values: List) -> np.ndarray:
+    """문자열 컬럼"""
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class ReportViewModel:
+    """리포트 뷰 모델 - 모든 테이블을 한 번만 계산"""
+
+    def __init__(self, processed_data: ResultStore, panel: Optional[AlignedPanel] = None,
+                 generated_at: Optional[datetime] = None):
+        self.data = processed_data
+        self.panel = panel
+        self.assets = get_enabled_assets()
+        self.generated_at = generated_at or datetime.now()
+        self.names = {
+            code: info['name']
+            for assets in self.assets.values()
+            for code, info in assets.items()
+        }
+
+        # 리포트 대상 자산 (설정 순서) 과 공통 파생값
+        self._rows = self._collect_asset_rows()
+        self._codes = [r['code'] for r in self._rows]
+        price = self._col('current_price')
+        self._weekly_change = self._calculate_period_change(price, self._col('weekly.last_period_avg'))
+        self._monthly_change = self._calculate_period_change(price, self._col('monthly.last_period_avg'))
+        self._trend = self._determine_trend(
+            price, self._col('moving_averages.MA5'), self._col('moving_averages.MA20'),
+            self._col('cross_signals.bullish_alignment'), self._col('cross_signals.bearish_alignment'),
+        )
+
+        # 자산 × 창 추이선 (패널이 있을 때 한 번에 계산)
+        self.sparklines: Optional[Sparklines] = None
+        if SPARKLINE_CONFIG['enabled'] and panel is not None and len(panel):
+            self.sparklines = Sparklines.from_panel(panel, self._codes)
+
+        self.tables: Dict[str, ReportTable] = {}
+        for table in (
+            self._build_summary_table(),
+            self._build_daily_detail_table(),
+            self._build_weekly_trend_table(),
+            self._build_monthly_trend_table(),
+            self._build_technical_indicators_table(),
+            self._build_correlation_table(),
+            self._build_correlation_deviation_table(),
+            self._build_sparkline_table(),
+        ):
+            if table is not None:
+                self.tables[table.key] = table
+
+    def __getitem__(self, key: str) -> ReportTable:
+        return self.tables[key]
+
+    def __iter__(self):
+        return iter(self.tables.values())
+
+    @property
+    def codes(self) -> List[str]:
+        """리포트 대상 자산 코드 (설정 순서)"""
+        return list(self._codes)
+
+    @property
+    def categories(self) -> Dict[str, str]:
+        """자산 코드 → 카테고리"""
+        return {r['code']: r['category'] for r in self._rows}
+
+    def subset(self, codes: Iterable[str]) -> 'ReportViewModel':
+        """일부 자산만 담은 뷰 (이미 계산된 테이블을 거르기만 함)
+
+        처리 결과/패널 참조는 빼므로 프로세스 풀로 보내도 테이블 크기만큼만 직렬화됩니다.
+        """
+        keep = set(codes)
+        view = copy.copy(self)
+        view.data = view.panel = None
+        view._rows = [r for r in self._rows if r['code'] in keep]
+        view._codes = [r['code'] for r in view._rows]
+        view.tables = {key: table.subset(keep) for key, table in self.tables.items()}
+        if self.sparklines is not None:
+            view.sparklines = self.sparklines.subset(keep)
+        return view
+
+    def content_hash(self) -> str:
+        """테이블 내용 해시 (생성 시각 제외) - 같으면 어떤 포맷으로 렌더링해도 보이는 내용이 같음"""
+        digest = hashlib.blake2b(digest_size=16)
+        for table in self.tables.values():
+            digest.update(f"{table.key}|{table.title}|{'|'.join(table.columns)}".encode('utf-8'))
+            for column in table.columns:
+                values = table.data[column]
+                if values.dtype == object:
+                    digest.update(repr(values.tolist()).encode('utf-8'))
+                else:
+                    values = np.asarray(values, dtype=np.float64)
+                    # 계산 경로에 따라 다른 NaN 비트 패턴을 하나로
+                    digest.update(np.where(np.isnan(values), np.nan, values).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def date_tag(self) -> str:
+        """파일명용 날짜 태그"""
+        return self.generated_at.strftime('%Y%m%d')
+
+    def _collect_asset_rows(self) -> List[Dict]:
+        """리포트에 포함될 자산 목록"""
+        return [
+            {'code': code, 'category': category, 'name': info['name']}
+            for category, assets in self.assets.items()
+            for code, info in assets.items()
+            if code in self.data
+        ]
+
+    def _col(self, name: str) -> np.ndarray:
+        """리포트 대상 자산 순서의 결과 컬럼"""
+        return self.data.column(name, self._codes)
+
+    def _meta(self) -> Dict[str, np.ndarray]:
+        return {
+            'code': _text([r['code'] for r in self._rows]),
+            'category': _text([r['category'] for r in self._rows]),
+        }
+
+    def _build_summary_table(self) -> ReportTable:
+        """종합 요약"""
+        rows = self._rows
+        percentile_columns = {f"{w}년 백분위": f"percentile.{w}y" for w in PERCENTILE_CONFIG['windows']}
+        columns = ['구분', '자산', '현재가', '전일비', '변동률(%)',
+                   '주간변동(%)', '월간변동(%)', '52주최고', '52주최저', '추세', *percentile_columns]
+        data = {
+            '구분': _text([CATEGORY_NAMES.get(r['category'], r['category']) for r in rows]),
+            '자산': _text([r['name'] for r in rows]),
+            '현재가': self._col('current_price'),
+            '전일비': self._col('daily_change'),
+            '변동률(%)': self._col('daily_change_pct'),
+            '주간변동(%)': self._weekly_change,
+            '월간변동(%)': self._monthly_change,
+            '52주최고': self._col('52w_high'),
+            '52주최저': self._col('52w_low'),
+            '추세': self._trend,
+            **{column: self._col(name) for column, name in percentile_columns.items()},
+        }
+        return ReportTable('summary', '📊 종합요약', columns, data, self._meta())
+
+    def _build_daily_detail_table(self) -> ReportTable:
+        """일자별 상세 (최근 7일)"""
+        rows = self._rows
+        columns = ['날짜'] + [r['name'] for r in rows]
+
+        if self.panel is not None and len(self.panel):
+            # 정렬 패널의 마지막 7행 (결측 마스크 칸은 NaN)
+            panel = self.panel
+            dates = panel.dates[-7:][::-1]
+            close = panel.close[-7:][::-1]
+            observed = panel.observed[-7:][::-1]
+            data = {'날짜': _text(list(dates.strftime('%Y-%m-%d')))}
+            for r in rows:
+                if r['code'] in panel.index:
+                    i = panel.index[r['code']]
+                    data[r['name']] = np.where(observed[:, i], close[:, i], np.nan)
+                else:
+                    data[r['name']] = np.full(len(dates), np.nan)
+        else:
+            series = {r['code']: self.data.series.get(r['code']) for r in rows}
+            all_dates = set()
+            for s in series.values():
+                if s is not None:
+                    all_dates.update(s.index)
+            dates = sorted(all_dates, reverse=True)[:7]
+
+            data = {
+                '날짜': _text([
+                    date.strftime('%Y-%m-%d') if hasattr(date, 'strftime') else str(date)
+                    for date in dates
+                ])
+            }
+            for r in rows:
+                last_7days = series[r['code']]
+                last_7days = {} if last_7days is None else last_7days.to_dict()
+                data[r['name']] = _numeric([last_7days.get(date) for date in dates])
+
+        meta = {'code': _text([r['code'] for r in rows])}
+        return ReportTable('daily_detail', '📅 일자별상세', columns, data, meta, asset_columns=True)
+
+    def _build_weekly_trend_table(self) -> ReportTable:
+        """주간 추이"""
+        rows = self._rows
+        current = self._col('weekly.current_period_avg')
+        last = self._col('weekly.last_period_avg')
+        last_2 = self._col('weekly.last_2_period_avg')
+
+        columns = ['자산', '당주평균', '전주평균', '전전주평균', '최근4주평균',
+                   '전주대비(%)', '전전주대비(%)']
+        data = {
+            '자산': _text([r['name'] for r in rows]),
+            '당주평균': current,
+            '전주평균': last,
+            '전전주평균': last_2,
+            '최근4주평균': self._col('weekly.last_3month_avg'),
+            '전주대비(%)': _pct_change(current, last),
+            '전전주대비(%)': _pct_change(current, last_2),
+        }
+        return ReportTable('weekly_trend', '📈 주간추이', columns, data, self._meta())
+
+    def _build_monthly_trend_table(self) -> ReportTable:
+        """월간 추이"""
+        rows = self._rows
+        current = self._col('monthly.current_period_avg')
+        last = self._col('monthly.last_period_avg')
+
+        columns = ['자산', '당월평균', '전월평균', '전전월평균',
+                   '최근3개월', '최근6개월', '최근12개월', '전월대비(%)']
+        data = {
+            '자산': _text([r['name'] for r in rows]),
+            '당월평균': current,
+            '전월평균': last,
+            '전전월평균': self._col('monthly.last_2_period_avg'),
+            '최근3개월': self._col('monthly.last_3month_avg'),
+            '최근6개월': self._col('monthly.last_6month_avg'),
+            '최근12개월': self._col('monthly.last_12month_avg'),
+            '전월대비(%)': _pct_change(current, last),
+        }
+        return ReportTable('monthly_trend', '📊 월간추이', columns, data, self._meta())
+
+    def _build_technical_indicators_table(self) -> ReportTable:
+        """기술적 지표"""
+        rows = self._rows
+        price = self._col('current_price')
+
+        def ma(period: int) -> np.ndarray:
+            return self._col(f'moving_averages.MA{period}')
+
+        def divergence(period: int) -> np.ndarray:
+            return _pct_change(price, ma(period))
+
+        def flag(name: str) -> np.ndarray:
+            return self._col(f'cross_signals.{name}') == True  # NaN(컬럼 없음) → False
+
+        def ind_field(output: str) -> np.ndarray:
+            return self._col(f'indicators.{output}')
+
+        cross = np.select([flag('golden_cross_5_20'), flag('dead_cross_5_20')],
+                          ['골든크로스', '데드크로스'], '-')
+        alignment = np.select([flag('bullish_alignment'), flag('bearish_alignment')],
+                              ['정배열', '역배열'], '-')
+
+        columns = ['자산', 'MA5', 'MA20', 'MA60', 'MA120',
+                   'MA5괴리(%)', 'MA20괴리(%)', '크로스신호', '배열상태',
+                   'RSI', 'MACD', 'MACD시그널', 'BB상단', 'BB하단', 'ATR', '변동성(%)']
+        data = {
+            '자산': _text([r['name'] for r in rows]),
+            'MA5': ma(5),
+            'MA20': ma(20),
+            'MA60': ma(60),
+            'MA120': ma(120),
+            'MA5괴리(%)': divergence(5),
+            'MA20괴리(%)': divergence(20),
+            '크로스신호': _text(list(cross)),
+            '배열상태': _text(list(alignment)),
+            'RSI': ind_field('RSI'),
+            'MACD': ind_field('MACD'),
+            'MACD시그널': ind_field('MACD_signal'),
+            'BB상단': ind_field('BB_upper'),
+            'BB하단': ind_field('BB_lower'),
+            'ATR': ind_field('ATR'),
+            '변동성(%)': ind_field('VOL'),
+        }
+        return ReportTable('technical_indicators', '🔧 기술지표', columns, data, self._meta())
+
+    def _build_correlation_table(self) -> ReportTable:
+        """상관관계 (절대값 내림차순)"""
+        correlations = self.data.correlations
+        pairs = sorted(correlations.items(), key=lambda x: abs(x[1]), reverse=True)
+        split = [self._split_pair(pair) for pair, _ in pairs]
+        corr = _numeric([c for _, c in pairs])
+
+        strength = np.where(np.abs(corr) > 0.7, '강함',
+                            np.where(np.abs(corr) > 0.4, '중간', '약함')).astype(object)
+        strength = strength + np.where(corr > 0, ' (정상관)', ' (역상관)').astype(object)
+
+        columns = ['자산 쌍', '상관계수', '관계 강도']
+        data = {
+            '자산 쌍': _text([
+                ' vs '.join(self.names.get(code, code) for code in codes)
+                for codes in split
+            ]),
+            '상관계수': corr,
+            '관계 강도': _text(list(strength)),
+        }
+        meta = {
+            'code1': _text([codes[0] for codes in split]),
+            'code2': _text([codes[-1] for codes in split]),
+        }
+        return ReportTable('correlation', '🔗 상관관계', columns, data, meta)
+
+    def _build_correlation_deviation_table(self) -> ReportTable:
+        """장기 기준 대비 상관관계 이탈 (타일 계산 시에만 존재)"""
+        deviations = self.data.correlation_deviations
+        columns = ['자산 쌍', '최근 상관계수', '기준 상관계수', '이탈']
+        data = {
+            '자산 쌍': _text([
+                f"{self.names.get(c1, c1)} vs {self.names.get(c2, c2)}"
+                for c1, c2, *_ in deviations
+            ]),
+            '최근 상관계수': _numeric([d[2] for d in deviations]),
+            '기준 상관계수': _numeric([d[3] for d in deviations]),
+            '이탈': _numeric([d[4] for d in deviations]),
+        }
+        meta = {
+            'code1': _text([d[0] for d in deviations]),
+            'code2': _text([d[1] for d in deviations]),
+        }
+        return ReportTable('correlation_deviation', '🔀 상관이탈', columns, data, meta)
+
+    def _build_sparkline_table(self) -> Optional[ReportTable]:
+        """추이 (창별 텍스트 스파크라인 + 변동률) - 패널이 없으면 생략"""
+        sparklines = self.sparklines
+        if sparklines is None:
+            return None
+        rows = self._rows
+        columns = ['구분', '자산']
+        data = {
+            '구분': _text([CATEGORY_NAMES.get(r['category'], r['category']) for r in rows]),
+            '자산': _text([r['name'] for r in rows]),
+        }
+        for label in sparklines.windows:
+            columns += [f"{label} 추이", f"{label}(%)"]
+            data[f"{label} 추이"] = sparklines.text[label]
+            data[f"{label}(%)"] = sparklines.change[label]
+        return ReportTable('sparklines', '📈 추이', columns, data, self._meta())
+
+    def _split_pair(self, pair: str) -> List[str]:
+        """'{code1}_{code2}' 키를 자산 코드로 분리 (코드 내 '_' 허용)"""
+        parts = pair.split('_')
+        for i in range(1, len(parts)):
+            left, right = '_'.join(parts[:i]), '_'.join(parts[i:])
+            if left in self.data and right in self.data:
+                return [left, right]
+        return parts
+
+    @staticmethod
+    def _calculate_period_change(current: np.ndarray, last: np.ndarray) -> np.ndarray:
+        """기간별 변동률 계산 (기준 없음은 0)"""
+        change = _pct_change(current, last)
+        change[np.isnan(change)] = 0.0
+        return change
+
+    @staticmethod
+    def _determine_trend(price: np.ndarray, ma5: np.ndarray, ma20: np.ndarray,
+                         bullish: np.ndarray, bearish: np.ndarray) -> np.ndarray:
+        """추세 판단"""
+        has_ma = ~np.isnan(ma5) & ~np.isnan(ma20)
+        trend = np.select(
+            [bullish == True, bearish == True,
+             has_ma & (price > ma5) & (price > ma20),
+             has_ma & (price <= ma5) & (price <= ma20)],
+            ['강세 (정배열)', '약세 (역배열)', '상승 추세', '하락 추세'],
+            '보합',
+        )
+        return _text(list(trend))
@@ -0,0 +1,167 @@
+"""
+처리 결과 저장소 모듈
+
+자산별 스칼라 지표는 자산 인덱스 기준 NumPy 컬럼으로, 최근 시계열과 상관관계는 별도 구조로 보관합니다.
+처리 실패 자산은 유효 마스크(valid)와 errors로 구분하므로 소비자는 특수 키/오류 확인 없이
+유효 자산을 순회하거나 컬럼 단위로 벡터 연산할 수 있습니다.
+
+컬럼 이름은 점 표기로 그룹을 나타냅니다.
+    current_price, daily_change_pct, 52w_high, is_52w_high ...
+    weekly.last_period_avg, monthly.last_12month_avg ...
+    moving_averages.MA20, cross_signals.golden_cross_5_20, indicators.RSI ...
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ResultStore:
+    """자산 인덱스 기반 컬럼형 결과 저장소"""
+
+    def __init__(self, codes: Sequence[str]):
+        self.codes: List[str] = list(codes)
+        self.index: Dict[str, int] = {code: i for i, code in enumerate(self.codes)}
+        self.valid = np.zeros(len(self.codes), dtype=bool)
+        self.errors: Dict[str, str] = {}
+        # 스칼라 지표 컬럼 (실수: 결측 NaN, 플래그: bool)
+        self.columns: Dict[str, np.ndarray] = {}
+        # 자산별 최근 종가 시계열
+        self.series: Dict[str, pd.Series] = {}
+        # 자산 쌍 결과
+        self.correlations: Dict[str, float] = {}
+        self.correlation_deviations: List[Tuple] = []
+        self.correlation_breaks: List[Tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, code: str) -> bool:
+        """처리에 성공한 자산 여부"""
+        i = self.index.get(code)
+        return i is not None and bool(self.valid[i])
+
+    def __iter__(self) -> Iterator[str]:
+        """유효 자산 코드 순회"""
+        return (code for code, ok in zip(self.codes, self.valid) if ok)
+
+    # ==================== 쓰기 ====================
+
+    def set(self, code: str, name: str, value):
+        """자산 하나의 값 기록 (컬럼은 처음 쓸 때 생성)"""
+        column = self.columns.get(name)
+        if column is None:
+            if isinstance(value, (bool, np.bool_)):
+                column = np.zeros(len(self.codes), dtype=bool)
+            else:
+                column = np.full(len(self.codes), np.nan)
+            self.columns[name] = column
+        column[self.index[code]] = np.nan if value is None else value
+
+    def set_group(self, code: str, prefix: str, values: Dict):
+        """그룹 값 일괄 기록 (prefix.key)"""
+        for key, value in values.items():
+            self.set(code, f"{prefix}.{key}", value)
+
+    def mark_valid(self, code: str):
+        self.valid[self.index[code]] = True
+        self.errors.pop(code, None)
+
+    def mark_error(self, code: str, message: str):
+        self.valid[self.index[code]] = False
+        self.errors[code] = message
+
+    # ==================== 읽기 ====================
+
+    def column(self, name: str, codes: Optional[Sequence[str]] = None) -> np.ndarray:
+        """컬럼 배열 (codes 지정 시 해당 순서로 선택, 없는 컬럼은 NaN)"""
+        column = self.columns.get(name)
+        if column is None:
+            column = np.full(len(self.codes), np.nan)
+        if codes is None:
+            return column
+        return column[[self.index[code] for code in codes]]
+
+    def get(self, code: str, name: str):
+        """스칼라 값 (결측이면 None)"""
+        column = self.columns.get(name)
+        if column is None:
+            return None
+        value = column[self.index[code]]
+        if column.dtype == bool:
+            return bool(value)
+        return None if np.isnan(value) else float(value)
+
+    def group(self, code: str, prefix: str) -> Dict:
+        """그룹 값 {key: value} (결측 제외)"""
+        start = prefix + '.'
+        values = {}
+        for name in self.columns:
+            if name.startswith(start):
+                value = self.get(code, name)
+                if value is not None:
+                    values[name[len(start):]] = value
+        return values
+
+    def record(self, code: str) -> Dict:
+        """자산 하나의 결과를 중첩 dict로 (JSON 응답 등 경계용)"""
+        if code not in self:
+            return {'error': self.errors.get(code, '결과 없음')}
+        record: Dict = {}
+        for name in self.columns:
+            value = self.get(code, name)
+            if value is None:
+                continue
+            node = record
+            *groups, leaf = name.split('.')
+            for group in groups:
+                node = node.setdefault(group, {})
+            node[leaf] = value
+        if code in self.series:
+            record['last_7days'] = {
+                date.strftime('%Y-%m-%d'): float(value) for date, value in self.series[code].items()
+            }
+        return record
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.valid.nbytes + sum(c.nbytes for c in self.columns.values()))
+
+    # ==================== 분할/병합 ====================
+
+    def without_pairs(self) -> 'ResultStore':
+        """자산별 결과만 남긴 사본 (샤드 저장용)"""
+        store = ResultStore(self.codes)
+        store.valid = self.valid.copy()
+        store.errors = dict(self.errors)
+        store.columns = {name: column.copy() for name, column in self.columns.items()}
+        store.series = dict(self.series)
+        return store
+
+    def select(self, codes: Sequence[str]) -> 'ResultStore':
+        """일부 자산만 담은 사본 (자산 쌍 결과 제외)"""
+        rows = np.array([self.index[code] for code in codes], dtype=np.intp)
+        store = ResultStore(codes)
+        store.valid = self.valid[rows]
+        store.errors = {code: self.errors[code] for code in codes if code in self.errors}
+        store.columns = {name: column[rows] for name, column in self.columns.items()}
+        store.series = {code: self.series[code] for code in codes if code in self.series}
+        return store
+
+    @classmethod
+    def concat(cls, stores: Iterable['ResultStore']) -> 'ResultStore':
+        """여러 저장소의 자산별 결과 병합 (코드 중복 시 뒤쪽 우선)"""
+        stores = list(stores)
+        codes = list(dict.fromkeys(code for s in stores for code in s.codes))
+        merged = cls(codes)
+        for s in stores:
+            rows = np.array([merged.index[code] for code in s.codes], dtype=np.intp)
+            merged.valid[rows] = s.valid
+            for name, column in s.columns.items():
+                if name not in merged.columns:
+                    fill = np.zeros(len(codes), dtype=bool) if column.dtype == bool \
+                        else np.full(len(codes), np.nan)
+                    merged.columns[name] = fill
+                merged.columns[name][rows] = column
+            merged.errors.update(s.errors)
+            merged.series.update(s.series)
+        return merged
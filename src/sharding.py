@@ -0,0 +1,59 @@
+"""
+샤드 실행 결과 저장 및 병합 모듈
+
+각 샤드는 수집/처리 결과를 실행 ID별 디렉터리에 저장하고,
+병합 단계에서 모든 샤드 결과를 하나의 데이터셋으로 합칩니다.
+"""
+import os
+import pickle
+from typing import Dict, Tuple
+import pandas as pd
+from config import DATA_DIR
+from results import ResultStore
+
+SHARD_DIR = os.path.join(DATA_DIR, 'shards')
+
+
+def shard_path(run_id: str, index: int, count: int) -> str:
+    """샤드 결과 파일 경로"""
+    return os.path.join(SHARD_DIR, run_id, f"shard_{index}of{count}.pkl")
+
+
+def save_shard_output(run_id: str, index: int, count: int,
+                      raw_data: Dict[str, pd.DataFrame], processed: ResultStore) -> str:
+    """샤드 결과 저장 (임시 파일에 쓴 뒤 교체)"""
+    filepath = shard_path(run_id, index, count)
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+
+    # 자산별 결과만 저장 (상관관계는 병합 단계에서 전체 기준으로 계산)
+    payload = {
+        'raw': raw_data,
+        'processed': processed.without_pairs(),
+    }
+    tmp_path = filepath + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, filepath)
+
+    print(f"✅ 샤드 {index}/{count} 결과 저장: {filepath}")
+    return filepath
+
+
+def merge_shard_outputs(run_id: str, count: int) -> Tuple[Dict[str, pd.DataFrame], ResultStore]:
+    """모든 샤드 결과 병합 (누락 샤드가 있으면 오류)"""
+    missing = [i for i in range(count) if not os.path.exists(shard_path(run_id, i, count))]
+    if missing:
+        raise FileNotFoundError(
+            f"실행 {run_id}의 샤드 결과 누락: {', '.join(map(str, missing))} (총 {count}개)"
+        )
+
+    raw_data, stores = {}, []
+    for i in range(count):
+        with open(shard_path(run_id, i, count), 'rb') as f:
+            payload = pickle.load(f)
+        raw_data.update(payload['raw'])
+        stores.append(payload['processed'])
+    processed = ResultStore.concat(stores)
+
+    print(f"🔗 샤드 {count}개 병합 완료: {len(raw_data)}개 자산")
+    return raw_data, processed
@@ -0,0 +1,265 @@
+"""
+추이 스파크라인 모듈
+
+정렬 패널(AlignedPanel)에서 자산별 최근 7일/3개월/1년 추이선을 한 번에 계산합니다.
+자산마다 그림을 따로 그리지 않고 창별로 (자산 × 픽셀 열) 세로 구간 배열을 만든 뒤,
+모든 자산의 선과 글자를 하나의 팔레트 캔버스에 벡터 연산으로 래스터화하고
+표준 라이브러리(zlib)로 PNG 인코딩합니다 (Pillow/matplotlib 불필요).
+같은 축약 방식으로 표/메시지용 유니코드 텍스트 스파크라인(▁▂▃▄▅▆▇█)도 만듭니다.
+"""
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from config import SPARKLINE_CONFIG
+from data_quality import AlignedPanel
+
+# 텍스트 스파크라인 문자 (0번은 결측)
+BLOCKS = np.array(list(' ▁▂▃▄▅▆▇█'))
+
+# 팔레트 인덱스와 색상 (상승 빨강/하락 파랑은 엑셀 변동률 색상과 같음)
+BACKGROUND, GRID, TEXT, UP, DOWN, FLAT, HEADER = range(7)
+PALETTE = bytes([
+    255, 255, 255,   # 배경
+    224, 224, 224,   # 구분선
+    64, 64, 64,      # 자산 코드
+    220, 40, 40,     # 상승
+    40, 90, 220,     # 하락
+    140, 140, 140,   # 보합/결측
+    54, 96, 146,     # 머리글 배경
+])
+
+# 3x5 비트맵 글꼴 (자산 코드/변동률용 ASCII, 없는 글자는 '?')
+_FONT = {
+    '0': ('111', '101', '101', '101', '111'), '1': ('010', '110', '010', '010', '111'),
+    '2': ('111', '001', '111', '100', '111'), '3': ('111', '001', '011', '001', '111'),
+    '4': ('101', '101', '111', '001', '001'), '5': ('111', '100', '111', '001', '111'),
+    '6': ('111', '100', '111', '101', '111'), '7': ('111', '001', '010', '010', '010'),
+    '8': ('111', '101', '111', '101', '111'), '9': ('111', '101', '111', '001', '111'),
+    'A': ('010', '101', '111', '101', '101'), 'B': ('110', '101', '110', '101', '110'),
+    'C': ('011', '100', '100', '100', '011'), 'D': ('110', '101', '101', '101', '110'),
+    'E': ('111', '100', '110', '100', '111'), 'F': ('111', '100', '110', '100', '100'),
+    'G': ('011', '100', '101', '101', '011'), 'H': ('101', '101', '111', '101', '101'),
+    'I': ('111', '010', '010', '010', '111'), 'J': ('001', '001', '001', '101', '010'),
+    'K': ('101', '101', '110', '101', '101'), 'L': ('100', '100', '100', '100', '111'),
+    'M': ('101', '111', '111', '101', '101'), 'N': ('110', '101', '101', '101', '101'),
+    'O': ('010', '101', '101', '101', '010'), 'P': ('110', '101', '110', '100', '100'),
+    'Q': ('010', '101', '101', '110', '011'), 'R': ('110', '101', '110', '101', '101'),
+    'S': ('011', '100', '010', '001', '110'), 'T': ('111', '010', '010', '010', '010'),
+    'U': ('101', '101', '101', '101', '111'), 'V': ('101', '101', '101', '101', '010'),
+    'W': ('101', '101', '111', '111', '101'), 'X': ('101', '101', '010', '101', '101'),
+    'Y': ('101', '101', '010', '010', '010'), 'Z': ('111', '001', '010', '100', '111'),
+    '+': ('000', '010', '111', '010', '000'), '-': ('000', '000', '111', '000', '000'),
+    '.': ('000', '000', '000', '000', '010'), '%': ('101', '001', '010', '100', '101'),
+    '_': ('000', '000', '000', '000', '111'), '/': ('001', '001', '010', '100', '100'),
+    '=': ('000', '111', '000', '111', '000'), '^': ('010', '101', '000', '000', '000'),
+    '?': ('111', '001', '010', '000', '010'), ' ': ('000', '000', '000', '000', '000'),
+}
+_GLYPH_INDEX = {char: i for i, char in enumerate(_FONT)}
+# (글자 수, 5, 4) - 오른쪽 1열은 글자 간격
+_GLYPHS = np.array([[[bit == '1' for bit in row + '0'] for row in rows] for rows in _FONT.values()])
+
+
+def _text_masks(texts: Sequence[str], length: int, scale: int) -> np.ndarray:
+    """문자열들을 한 번에 비트맵으로 → (문자열 수, 5*scale, length*4*scale) bool"""
+    codes = np.full((len(texts), length), _GLYPH_INDEX[' '], dtype=np.intp)
+    unknown = _GLYPH_INDEX['?']
+    for i, text in enumerate(texts):
+        chars = [_GLYPH_INDEX.get(char, unknown) for char in text.upper()[:length]]
+        codes[i, :len(chars)] = chars
+    masks = _GLYPHS[codes].transpose(0, 2, 1, 3).reshape(len(texts), 5, length * 4)
+    return masks.repeat(scale, axis=1).repeat(scale, axis=2)
+
+
+def _columns(values: np.ndarray, width: int):
+    """(N, T) 값을 픽셀 열 width개로 축약 → 열별 (최소, 최대, 마지막 값) 각 (N, width)
+
+    T >= width면 열마다 구간 최소/최대(고점/저점 보존), 작으면 선형 보간합니다.
+    """
+    t = values.shape[1]
+    if t >= width:
+        starts = (np.arange(width) * t) // width
+        ends = np.append(starts[1:], t) - 1
+        low = np.fmin.reduceat(values, starts, axis=1)
+        high = np.fmax.reduceat(values, starts, axis=1)
+        return low, high, values[:, ends]
+    position = np.linspace(0, t - 1, width)
+    left = np.floor(position).astype(np.intp)
+    right = np.minimum(left + 1, t - 1)
+    frac = position - left
+    points = values[:, left] * (1 - frac) + values[:, right] * frac
+    return points, points, points
+
+
+def _normalize(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """reference 행별 최소~최대를 0~1로 (변동 없는 행은 0.5, 결측은 NaN)"""
+    low = np.fmin.reduce(reference, axis=1)[:, None]
+    high = np.fmax.reduce(reference, axis=1)[:, None]
+    span = high - low
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scaled = (values - low) / span
+    return np.where(span > 0, scaled, np.where(np.isnan(values), np.nan, 0.5))
+
+
+def _change(values: np.ndarray) -> np.ndarray:
+    """행별 첫 유효값 대비 마지막 유효값 변동률(%)"""
+    valid = ~np.isnan(values)
+    rows = np.arange(len(values))
+    first = values[rows, np.argmax(valid, axis=1)]
+    last = values[rows, values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change = (last / first - 1) * 100
+    change[~np.isfinite(change)] = np.nan
+    return change
+
+
+def text_sparklines(values: np.ndarray, width: int) -> np.ndarray:
+    """(N, T) 값 → 글자 width개짜리 블록 스파크라인 문자열 (N,) (결측 칸은 공백)"""
+    if values.size == 0 or width <= 0:
+        return np.array([''] * len(values), dtype=object)
+    _, _, points = _columns(values, width)
+    level = _normalize(points, values)
+    index = np.where(np.isnan(level), 0, 1 + np.rint(np.nan_to_num(level) * 7)).astype(np.intp)
+    # (N, width) 1글자 배열을 행마다 이어 붙인 문자열로 재해석
+    chars = np.ascontiguousarray(BLOCKS[index])
+    return chars.view(f'<U{width}').ravel().astype(object)
+
+
+def encode_png(pixels: np.ndarray, palette: bytes = PALETTE, level: int = 6) -> bytes:
+    """팔레트 인덱스 캔버스 (H x W uint8) → PNG 바이트 (8비트 인덱스 색상, 필터 없음)"""
+    height, width = pixels.shape
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+        chunk(b'PLTE', palette),
+        chunk(b'IDAT', zlib.compress(raw.tobytes(), level)),
+        chunk(b'IEND', b''),
+    ])
+
+
+class Sparklines:
+    """자산 × 창 추이선 (픽셀 열별 세로 구간 y_top ~ y_bottom, 0이 위쪽)"""
+
+    def __init__(self, codes: List[str], y_top: Dict[str, np.ndarray], y_bottom: Dict[str, np.ndarray],
+                 change: Dict[str, np.ndarray], text: Dict[str, np.ndarray]):
+        self.codes = codes
+        self.windows = list(y_top)
+        self.y_top = y_top          # {창: (N, width) float, 결측 NaN}
+        self.y_bottom = y_bottom
+        self.change = change        # {창: (N,) 변동률(%)}
+        self.text = text            # {창: (N,) 텍스트 스파크라인}
+        self._png: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @classmethod
+    def from_panel(cls, panel: AlignedPanel, codes: Sequence[str],
+                   windows: Optional[Dict[str, int]] = None) -> 'Sparklines':
+        """패널 종가에서 모든 자산의 창별 추이를 한 번에 계산 (패널에 없는 자산은 빈 칸)"""
+        windows = windows or SPARKLINE_CONFIG['windows']
+        width, height = SPARKLINE_CONFIG['width'], SPARKLINE_CONFIG['height']
+        codes = list(codes)
+        columns = np.array([panel.index.get(code, -1) for code in codes], dtype=np.intp)
+        present = columns >= 0
+        close = np.full((len(panel), len(codes)), np.nan)
+        close[:, present] = panel.close[:, columns[present]]
+
+        y_top, y_bottom, change, text = {}, {}, {}, {}
+        for label, days in windows.items():
+            if len(panel):
+                rows = panel.dates > panel.dates[-1] - pd.Timedelta(days=days)
+                values = close[rows].T
+            else:
+                values = np.full((len(codes), 1), np.nan)
+            low, high, last = _columns(values, width)
+            # 이전 열의 마지막 값까지 세로로 이어 선이 끊기지 않게
+            previous = np.concatenate([last[:, :1], last[:, :-1]], axis=1)
+            missing = np.isnan(high)
+            high = np.where(missing, np.nan, np.fmax(high, previous))
+            low = np.where(missing, np.nan, np.fmin(low, previous))
+            y_top[label] = np.rint((1 - _normalize(high, values)) * (height - 1))
+            y_bottom[label] = np.rint((1 - _normalize(low, values)) * (height - 1))
+            change[label] = _change(values)
+            text[label] = text_sparklines(values, SPARKLINE_CONFIG['text_width'])
+        return cls(codes, y_top, y_bottom, change, text)
+
+    def subset(self, codes: Iterable[str]) -> 'Sparklines':
+        """일부 자산만 (자산 순서 유지)"""
+        keep = set(codes)
+        mask = np.array([code in keep for code in self.codes], dtype=bool)
+
+        def pick(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+            return {label: values[mask] for label, values in arrays.items()}
+
+        return Sparklines([code for code in self.codes if code in keep], pick(self.y_top),
+                          pick(self.y_bottom), pick(self.change), pick(self.text))
+
+    def render(self, grid_columns: Optional[int] = None) -> np.ndarray:
+        """모든 자산 × 창 추이를 한 캔버스로 래스터화 → 팔레트 인덱스 (H x W uint8)
+
+        자산 1개 = [코드 | 창별 추이선 + 변동률] 블록, 블록들을 격자로 배치하고 맨 위에 창 머리글.
+        """
+        width, height = SPARKLINE_CONFIG['width'], SPARKLINE_CONFIG['height']
+        scale = SPARKLINE_CONFIG['font_scale']
+        n, pad = len(self.codes), 4
+        char_w, char_h = 4 * scale, 5 * scale
+        code_len = min(max((len(code) for code in self.codes), default=1), 12)
+        pct_len = len('+123.4%')
+        label_w = code_len * char_w + 2 * pad
+        cell_w = width + pad + pct_len * char_w + 2 * pad
+        block_w = label_w + len(self.windows) * cell_w
+        block_h = max(height, char_h) + 2 * pad
+        text_y = (block_h - char_h) // 2
+        line_y = (block_h - height) // 2
+
+        blocks = np.full((n, block_h, block_w), BACKGROUND, dtype=np.uint8)
+        blocks[:, -1, :] = GRID
+        region = blocks[:, text_y:text_y + char_h, pad:pad + code_len * char_w]
+        region[_text_masks(self.codes, code_len, scale)] = TEXT
+
+        rows = np.arange(height)[None, :, None]
+        for j, label in enumerate(self.windows):
+            x = label_w + j * cell_w
+            change = self.change[label]
+            color = np.where(change > 0, UP, np.where(change < 0, DOWN, FLAT)).astype(np.uint8)[:, None, None]
+            line = (rows >= self.y_top[label][:, None, :]) & (rows <= self.y_bottom[label][:, None, :])
+            region = blocks[:, line_y:line_y + height, x:x + width]
+            region[:] = np.where(line, color, region)
+
+            pct = [f"{value:+.1f}%" if np.isfinite(value) else '-' for value in change]
+            x += width + pad
+            region = blocks[:, text_y:text_y + char_h, x:x + pct_len * char_w]
+            region[:] = np.where(_text_masks(pct, pct_len, scale), color, region)
+
+        # 격자 배치: (행, 열, 블록 높이, 블록 너비) → 한 장
+        columns = grid_columns or SPARKLINE_CONFIG['grid_columns'] or \
+            max(1, int(round(np.sqrt(n * block_h / block_w))))
+        columns = max(1, min(columns, n))
+        grid_rows = -(-n // columns)
+        padded = np.full((grid_rows * columns, block_h, block_w), BACKGROUND, dtype=np.uint8)
+        padded[:n] = blocks
+        grid = padded.reshape(grid_rows, columns, block_h, block_w).transpose(0, 2, 1, 3)
+        grid = grid.reshape(grid_rows * block_h, columns * block_w)
+
+        header = np.full((char_h + 2 * pad, columns * block_w), HEADER, dtype=np.uint8)
+        label_len = max(len(label) for label in self.windows)
+        masks = _text_masks(self.windows, label_len, scale)
+        for c in range(columns):
+            for j, mask in enumerate(masks):
+                x = c * block_w + label_w + j * cell_w
+                header[pad:pad + char_h, x:x + mask.shape[1]][mask] = BACKGROUND
+        return np.vstack([header, grid])
+
+    def to_png(self) -> bytes:
+        """합성 이미지 PNG (한 번만 인코딩)"""
+        if self._png is None:
+            self._png = encode_png(self.render(), level=SPARKLINE_CONFIG['png_level'])
+        return self._png
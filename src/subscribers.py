@@ -0,0 +1,90 @@
+"""
+알림 구독자 레지스트리 모듈
+
+데스크(채팅방)별로 받을 자산/카테고리와 최소 알림 레벨을 정의합니다.
+구독자 파일(JSON/YAML)이 없으면 TELEGRAM_CHAT_ID 하나가 전체 알림을 받습니다.
+
+    [
+      {"chat_id": "-100123", "name": "원자재 데스크", "categories": ["commodities"], "min_level": 2},
+      {"chat_id": "-100456", "name": "FX 데스크", "assets": ["USD_KRW", "USD_JPY"], "files": false}
+    ]
+"""
+import json
+import os
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+from config import FANOUT_CONFIG, TELEGRAM_CHAT_ID
+
+LEVELS = ('level1', 'level2', 'level3')
+
+
+class Subscriber:
+    """구독자 (채팅방 + 필터)"""
+
+    def __init__(self, chat_id: str, name: str = '', assets: Optional[List[str]] = None,
+                 categories: Optional[List[str]] = None, min_level: int = 1, files: bool = True):
+        self.chat_id = str(chat_id)
+        self.name = name or self.chat_id
+        self.assets: Optional[FrozenSet[str]] = frozenset(assets) if assets else None
+        self.categories: Optional[FrozenSet[str]] = frozenset(categories) if categories else None
+        if min_level not in (1, 2, 3):
+            raise ValueError(f"구독자 {self.name}: min_level은 1~3이어야 합니다 ({min_level})")
+        self.min_level = min_level
+        self.files = files
+
+    @property
+    def levels(self) -> Tuple[str, ...]:
+        """받을 알림 레벨"""
+        return LEVELS[self.min_level - 1:]
+
+    @property
+    def filter_key(self) -> Tuple:
+        """같은 필터를 가진 구독자 묶음 키"""
+        return (self.assets, self.categories, self.min_level)
+
+    def wants(self, codes: Tuple[str, ...], categories: Dict[str, str]) -> bool:
+        """메시지 관련 자산 중 하나라도 구독 대상이면 True (자산 없는 메시지는 모두에게)"""
+        if not codes or (self.assets is None and self.categories is None):
+            return True
+        for code in codes:
+            if self.assets is not None and code in self.assets:
+                return True
+            if self.categories is not None and categories.get(code) in self.categories:
+                return True
+        return False
+
+
+class SubscriberRegistry:
+    """구독자 목록"""
+
+    def __init__(self, subscribers: List[Subscriber]):
+        self.subscribers = subscribers
+
+    def __iter__(self) -> Iterator[Subscriber]:
+        return iter(self.subscribers)
+
+    def __len__(self) -> int:
+        return len(self.subscribers)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'SubscriberRegistry':
+        """구독자 파일 로딩 (없으면 기본 채팅방 1개)"""
+        path = path or FANOUT_CONFIG['subscribers_file']
+        if not path:
+            return cls([Subscriber(TELEGRAM_CHAT_ID, name='default')] if TELEGRAM_CHAT_ID else [])
+
+        ext = os.path.splitext(path)[1].lower()
+        with open(path, encoding='utf-8') as f:
+            if ext in ('.yaml', '.yml'):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ImportError("YAML 구독자 파일을 읽으려면 PyYAML이 필요합니다: pip install pyyaml")
+                records = yaml.safe_load(f)
+            elif ext == '.json':
+                records = json.load(f)
+            else:
+                raise ValueError(f"지원하지 않는 구독자 파일 형식: {path}")
+
+        subscribers = [Subscriber(**record) for record in records or []]
+        print(f"👥 구독자 {len(subscribers)}명 로딩: {path}")
+        return cls(subscribers)
@@ -1,9 +1,11 @@
 """
-텔레그램 알림 발송 모듈
+텔레그램 알림 메시지 모듈
+
+레벨별 메시지 렌더링(구독자 발송은 FanoutDispatcher)과 시스템 오류 알림 전송을 담당합니다.
 """
 import requests
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Tuple
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
 
 class TelegramNotifier:
@@ -14,22 +16,16 @@ class TelegramNotifier:
         self.chat_id = TELEGRAM_CHAT_ID
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
     
-    def send_daily_report(self, alerts: Dict[str, List]):
-        """일일 리포트 전송"""
+    def render_level(self, level: str, lines: List[str]) -> Tuple[str, bool]:
+        """레벨별 메시지 렌더링 → (본문, 조용히 여부)"""
         # Level 1: 기본 리포트 (조용히)
-        if alerts['level1']:
-            message = self._format_daily_report(alerts['level1'])
-            self._send_message(message, silent=True)
-        
+        if level == 'level1':
+            return self._format_daily_report(lines), True
         # Level 2: 주의 알림
-        if alerts['level2']:
-            message = "⚠️ 주의 알림\n\n" + "\n".join(alerts['level2'])
-            self._send_message(message, silent=False)
-        
+        if level == 'level2':
+            return "⚠️ 주의 알림\n\n" + "\n".join(lines), False
         # Level 3: 긴급 알림 (별도 메시지, 소리+진동)
-        if alerts['level3']:
-            message = "🚨 긴급 알림\n\n" + "\n".join(alerts['level3'])
-            self._send_message(message, silent=False)
+        return "🚨 긴급 알림\n\n" + "\n".join(lines), False
     
     def _format_daily_report(self, report_lines: List[str]) -> str:
         """일일 리포트 포맷팅"""
@@ -44,8 +40,8 @@ class TelegramNotifier:
         
         return message
     
-    def _send_message(self, message: str, silent: bool = False):
-        """메시지 전송"""
+    def _send_message(self, message: str, silent: bool = False) -> bool:
+        """메시지 전송 (성공 시 True)"""
         try:
             url = f"{self.base_url}/sendMessage"
             payload = {
@@ -59,30 +55,9 @@ class TelegramNotifier:
             
             if response.status_code == 200:
                 print(f"✅ 텔레그램 전송 성공 (조용히: {silent})")
-            else:
-                print(f"❌ 텔레그램 전송 실패: {response.text}")
+                return True
+            print(f"❌ 텔레그램 전송 실패: {response.text}")
                 
         except Exception as e:
             print(f"❌ 텔레그램 전송 오류: {e}")
-    
-    def send_file(self, filepath: str, caption: str = ""):
-        """파일 전송"""
-        try:
-            url = f"{self.base_url}/sendDocument"
-            
-            with open(filepath, 'rb') as file:
-                files = {'document': file}
-                data = {
-                    'chat_id': self.chat_id,
-                    'caption': caption
-                }
-                
-                response = requests.post(url, files=files, data=data, timeout=30)
-                
-                if response.status_code == 200:
-                    print(f"✅ 파일 전송 성공: {filepath}")
-                else:
-                    print(f"❌ 파일 전송 실패: {response.text}")
-                    
-        except Exception as e:
-            print(f"❌ 파일 전송 오류: {e}")
+        return False
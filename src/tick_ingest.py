@@ -0,0 +1,344 @@
+"""
+틱 수신(푸시) 모듈
+
+상위 프로세스(브로커 피드, 사내 시세 프로세스 등)가 로컬 TCP/유닉스 소켓으로 틱이나 봉을
+라인 프로토콜로 밀어 넣으면, 대기 중인 수신분을 한 번에 모아 장중 링버퍼 봉으로 집계하고
+갱신된 자산만 장중 알림 규칙(AlertManager)으로 판단합니다. 폴링 주기를 기다리지 않으므로
+알림 지연이 '수신 → 배치 처리' 시간으로 줄어듭니다.
+
+라인 프로토콜 (공백 구분, 한 줄에 하나, '#'으로 시작하는 줄은 무시, 응답 없음):
+    T <코드> <epoch ms> <가격> [<수량>]                          틱(체결)
+    B <코드> <epoch ms> <시가> <고가> <저가> <종가> [<거래량>]     봉 (자산 장중 간격의 봉 시작 시각)
+
+    T GOLD 1718000000123 2345.6 3
+    B USD_KRW 1718000000000 1380.1 1381.0 1379.8 1380.5
+잘못된 줄, 알 수 없는 자산, 진행 중인 봉보다 늦은 틱은 건너뛰고 개수만 집계합니다.
+"""
+import os
+import queue
+import socketserver
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import INGEST_CONFIG, get_enabled_assets
+from fanout import FanoutDispatcher
+from intraday import IntradayMonitor, aggregate_ticks, intraday_interval
+from market_calendar import calendar_for
+
+# 소켓 1회 읽기 크기
+READ_SIZE = 1 << 16
+
+
+def parse_lines(lines: List[bytes]) -> Tuple[Dict[bytes, List], Dict[bytes, List], int]:
+    """라인 목록 → (자산별 틱 [(ms, 가격, 수량)], 자산별 봉 [(ms, 시가, 고가, 저가, 종가, 거래량)], 잘못된 줄 수)"""
+    ticks, bars = defaultdict(list), defaultdict(list)
+    rejected = 0
+    for line in lines:
+        parts = line.split()
+        if not parts or parts[0].startswith(b'#'):
+            continue
+        kind, n = parts[0], len(parts)
+        try:
+            if kind == b'T' and 4 <= n <= 5:
+                ticks[parts[1]].append(
+                    (int(parts[2]), float(parts[3]), float(parts[4]) if n == 5 else 0.0))
+            elif kind == b'B' and 7 <= n <= 8:
+                bars[parts[1]].append(
+                    (int(parts[2]), float(parts[3]), float(parts[4]), float(parts[5]),
+                     float(parts[6]), float(parts[7]) if n == 8 else 0.0))
+            else:
+                rejected += 1
+        except ValueError:
+            rejected += 1
+    return ticks, bars, rejected
+
+
+class _Batch:
+    """수신 스레드 → 처리 스레드 전달 단위 (수신 청크 하나)"""
+
+    __slots__ = ('lines', 'ticks', 'bars', 'rejected')
+
+    def __init__(self, lines: int, ticks: Dict, bars: Dict, rejected: int):
+        self.lines = lines
+        self.ticks = ticks
+        self.bars = bars
+        self.rejected = rejected
+
+
+class _QueuedDispatcher:
+    """알림 발송을 별도 스레드로 넘김 (텔레그램 속도 제한이 수신 처리를 막지 않도록)"""
+
+    def __init__(self, dispatcher):
+        self.dispatcher = dispatcher
+        self.outbox = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def dispatch(self, alerts: Dict[str, List]):
+        self.outbox.put(alerts)
+
+    def close(self):
+        self.outbox.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            alerts = self.outbox.get()
+            if alerts is None:
+                return
+            try:
+                self.dispatcher.dispatch(alerts)
+            except Exception as e:
+                print(f"❌ 장중 알림 발송 오류: {e}")
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """연결별 수신 (줄 단위로 잘라 파싱 후 처리 큐에 전달)"""
+
+    def handle(self):
+        ingestor = self.server.ingestor
+        pending = b''
+        while True:
+            chunk = self.request.recv(READ_SIZE)
+            if not chunk:
+                break
+            lines = (pending + chunk).split(b'\n')
+            pending = lines.pop()
+            ingestor.submit(lines)
+        if pending:
+            ingestor.submit([pending])
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # Windows 등
+    _UnixServer = None
+
+
+class TickIngestor:
+    """틱/봉 수신 서버 + 배치 처리기"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 unix_socket: Optional[str] = None, dispatcher=None,
+                 monitor: Optional[IntradayMonitor] = None):
+        self.host = host or INGEST_CONFIG['host']
+        self.port = port if port is not None else INGEST_CONFIG['port']
+        self.unix_socket = unix_socket if unix_socket is not None else INGEST_CONFIG['unix_socket']
+        self.outbox = _QueuedDispatcher(dispatcher or FanoutDispatcher())
+        self.monitor = monitor or IntradayMonitor(dispatcher=self.outbox)
+        self.monitor.dispatcher = self.outbox
+
+        # 자산별 (장중 간격, 일봉 집계 시간대)
+        self.targets: Dict[str, Tuple[str, str]] = self._targets()
+        self.stats = Counter()
+        self._inbox = queue.Queue()
+        self._server = None
+        self._worker = None
+        self._rolled_at = time.monotonic()
+
+    @staticmethod
+    def _targets() -> Dict[str, Tuple[str, str]]:
+        return {
+            code: (intraday_interval(info), calendar_for(category, info).tz.zone)
+            for category, assets in get_enabled_assets().items()
+            for code, info in assets.items()
+        }
+
+    # ==================== 수신 ====================
+
+    def submit(self, lines: List[bytes]):
+        """수신한 줄 파싱 후 처리 큐에 추가 (수신 스레드에서 호출)"""
+        ticks, bars, rejected = parse_lines(lines)
+        self._inbox.put(_Batch(len(lines), ticks, bars, rejected))
+
+    def reload(self, change):
+        """설정 변경을 처리 큐에 넣음 (배치 처리와 같은 스레드에서 순서대로 반영)"""
+        self._inbox.put(change)
+
+    def start(self):
+        """수신 서버와 처리 스레드 시작"""
+        if self.unix_socket:
+            if _UnixServer is None:
+                raise RuntimeError("이 플랫폼은 유닉스 소켓을 지원하지 않습니다")
+            if os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+            self._server = _UnixServer(self.unix_socket, _Handler)
+            address = f"unix:{self.unix_socket}"
+        else:
+            self._server = _TCPServer((self.host, self.port), _Handler)
+            self.port = self._server.server_address[1]
+            address = f"tcp://{self.host}:{self.port}"
+        self._server.ingestor = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+        print(f"📡 틱 수신 시작: {address} ({len(self.targets)}개 자산)")
+
+    def stop(self):
+        """수신 중지 → 남은 수신분 처리 → 히스토리/상태 반영 → 대기 중인 알림 발송"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self.unix_socket and os.path.exists(self.unix_socket):
+                os.remove(self.unix_socket)
+        if self._worker is not None:
+            self._inbox.put(None)
+            self._worker.join()
+        self.monitor.roll_up()
+        self.outbox.close()
+        self._log()
+
+    # ==================== 처리 ====================
+
+    def _run(self):
+        max_lines = INGEST_CONFIG['max_batch_lines']
+        roll_up_seconds = INGEST_CONFIG['roll_up_seconds']
+        while True:
+            try:
+                batch = self._inbox.get(timeout=1.0)
+            except queue.Empty:
+                batch = None
+            else:
+                if batch is None:
+                    return
+                # 대기 중인 수신분을 모아 한 번에 처리 (부하가 높을수록 배치가 커짐)
+                batches, lines, control = [], 0, batch
+                if isinstance(batch, _Batch):
+                    batches, lines, control = [batch], batch.lines, False
+                while batches and lines < max_lines:
+                    try:
+                        batch = self._inbox.get_nowait()
+                    except queue.Empty:
+                        break
+                    if not isinstance(batch, _Batch):
+                        # 종료/설정 변경은 앞서 받은 수신분을 처리한 뒤 반영
+                        control = batch
+                        break
+                    batches.append(batch)
+                    lines += batch.lines
+                if batches:
+                    try:
+                        self._process(batches)
+                    except Exception as e:
+                        print(f"❌ 틱 처리 오류: {e}")
+                if control is None:
+                    return
+                if control:
+                    try:
+                        self._apply_config(control)
+                    except Exception as e:
+                        print(f"❌ 설정 변경 반영 오류: {e}")
+
+            if time.monotonic() - self._rolled_at >= roll_up_seconds:
+                self._rolled_at = time.monotonic()
+                try:
+                    self.monitor.roll_up()
+                except Exception as e:
+                    print(f"❌ 장중 일봉 반영 오류: {e}")
+                self._log()
+
+    def _apply_config(self, change):
+        """설정 변경 반영 - 수신 대상만 다시 만들고 남은 자산의 링버퍼/상태는 유지"""
+        self.targets = self._targets()
+        self.monitor.apply_config(change)
+        print(f"🔄 틱 수신 대상 갱신: {len(self.targets)}개 자산")
+
+    def _process(self, batches: List[_Batch]) -> Dict[str, List]:
+        """배치 반영 → 갱신된 자산만 알림 판단"""
+        ticks, bars = defaultdict(list), defaultdict(list)
+        for batch in batches:
+            self.stats['lines'] += batch.lines
+            self.stats['rejected'] += batch.rejected
+            for code, rows in batch.ticks.items():
+                ticks[code].extend(rows)
+            for code, rows in batch.bars.items():
+                bars[code].extend(rows)
+
+        store = self.monitor.store
+        touched = self._apply_ticks(ticks)
+        for raw, rows in bars.items():
+            code = self._target(raw, len(rows))
+            if code is None:
+                continue
+            interval, tz = self.targets[code]
+            data = np.array(rows, dtype=np.float64)
+            valid = np.isfinite(data[:, 1:5]).all(axis=1) & (data[:, 1:5] > 0).all(axis=1)
+            self.stats['rejected'] += int(len(rows) - valid.sum())
+            data = data[valid]
+            if not len(data):
+                continue
+            store.ingest_bars(code, interval, data[:, 0].astype(np.int64) // 1000, data[:, 1:], tz)
+            self.stats['bars'] += len(data)
+            touched.add(code)
+
+        for code in touched:
+            self.monitor.update_volatility(code)
+        self.stats['batches'] += 1
+        fresh = self.monitor.evaluate(touched)
+        self.stats['alerts'] += len(fresh['level2']) + len(fresh['level3'])
+        return fresh
+
+    def _apply_ticks(self, ticks: Dict[bytes, List]) -> set:
+        """배치 전체 틱을 한 배열로 모아 봉으로 집계 (자산별로는 완성된 봉 몇 개만 링버퍼에 합침)"""
+        codes, counts, rows = [], [], []
+        for raw, items in ticks.items():
+            code = self._target(raw, len(items))
+            if code is not None:
+                codes.append(code)
+                counts.append(len(items))
+                rows.extend(items)
+        if not rows:
+            return set()
+
+        store = self.monitor.store
+        buffers = [store.buffer(code, *self.targets[code]) for code in codes]
+        data = np.array(rows, dtype=np.float64)
+        group = np.repeat(np.arange(len(codes)), counts)
+        seconds = np.array([buffer.interval_seconds for buffer in buffers])[group]
+        ts = data[:, 0].astype(np.int64) // 1000
+        buckets = ts - ts % seconds
+        prices = data[:, 1]
+
+        # 진행 중인 봉보다 이전 구간의 틱은 늦은 틱으로 버림
+        last = np.array([buffer.last_ts if buffer.last_ts is not None else np.iinfo(np.int64).min
+                         for buffer in buffers])
+        valid = np.isfinite(prices) & (prices > 0)
+        fresh = buckets >= last[group]
+        keep = valid & fresh
+        self.stats['rejected'] += int((~valid).sum())
+        self.stats['late'] += int((valid & ~fresh).sum())
+        self.stats['ticks'] += int(keep.sum())
+
+        order = np.flatnonzero(keep)
+        order = order[np.lexsort((ts[order], group[order]))]
+        bar_group, bar_ts, values = aggregate_ticks(group[order], buckets[order],
+                                                    prices[order], data[order, 2])
+        bounds = np.searchsorted(bar_group, np.arange(len(codes) + 1))
+        touched = set()
+        for k, buffer in enumerate(buffers):
+            lo, hi = bounds[k], bounds[k + 1]
+            if hi > lo:
+                buffer.merge_bars(bar_ts[lo:hi], values[lo:hi])
+                touched.add(codes[k])
+        return touched
+
+    def _target(self, raw: bytes, count: int) -> Optional[str]:
+        """수신 코드 → 설정된 자산 코드 (없으면 거부 집계)"""
+        code = raw.decode('utf-8', 'replace')
+        if code not in self.targets:
+            self.stats['unknown'] += count
+            return None
+        return code
+
+    def _log(self):
+        s = self.stats
+        print(f"📥 틱 수신: 틱 {s['ticks']:,}건, 봉 {s['bars']:,}건, 배치 {s['batches']:,}회, "
+              f"알림 {s['alerts']}건 (거부 {s['rejected']}, 미등록 {s['unknown']}, 지연 {s['late']})")
@@ -0,0 +1,128 @@
+"""
+모니터링 대상(유니버스) 파일 로딩 및 샤드 배정 모듈
+
+CSV/YAML/JSON 파일에서 자산 목록을 읽어 ASSETS와 같은 구조로 변환하고,
+안정적인 해시로 자산을 N개 샤드에 결정적으로 배정합니다.
+"""
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Tuple
+
+# CSV/레코드 형식에서 인식하는 컬럼
+RECORD_FIELDS = ('code', 'category', 'name', 'ticker', 'spot_ticker', 'unit', 'icon', 'enabled')
+DEFAULT_ICONS = {
+    'commodities': '📊',
+    'currencies': '💱',
+    'cryptocurrencies': '₿',
+    'derived': '🧮',
+    'baskets': '🧺',
+}
+
+
+def load_universe(path: str) -> Dict[str, Dict[str, Dict]]:
+    """유니버스 파일 로딩 (확장자로 형식 판단)"""
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == '.csv':
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            records = list(csv.DictReader(f))
+    elif ext in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML 유니버스 파일을 읽으려면 PyYAML이 필요합니다: pip install pyyaml")
+        with open(path, encoding='utf-8') as f:
+            records = yaml.safe_load(f)
+    elif ext == '.json':
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+    else:
+        raise ValueError(f"지원하지 않는 유니버스 파일 형식: {path}")
+
+    # ASSETS와 같은 중첩 구조 {category: {code: info}} 도 허용
+    if isinstance(records, dict):
+        if 'assets' in records:
+            records = records['assets']
+        else:
+            return {
+                category: {code: dict(info) for code, info in assets.items()}
+                for category, assets in records.items()
+            }
+
+    universe: Dict[str, Dict[str, Dict]] = {}
+    for row in records:
+        info = _normalize_record(row)
+        code = info.pop('code')
+        category = info.pop('category')
+        if code in universe.get(category, {}):
+            raise ValueError(f"유니버스 파일에 중복된 자산 코드: {code}")
+        universe.setdefault(category, {})[code] = info
+
+    print(f"📂 유니버스 로딩: {path} ({sum(len(a) for a in universe.values())}개 자산)")
+    return universe
+
+
+def _normalize_record(row: Dict) -> Dict:
+    """레코드 한 줄을 자산 정보 dict로 변환"""
+    row = {k.strip().lower(): v for k, v in row.items() if k}
+    code = str(row.get('code') or '').strip()
+    ticker = str(row.get('ticker') or row.get('spot_ticker') or '').strip()
+    if not code or not (ticker or row.get('formula') or row.get('weights')):
+        raise ValueError(f"유니버스 레코드에 code/ticker(또는 formula/weights)가 없습니다: {row}")
+
+    category = str(row.get('category') or 'commodities').strip()
+    info = {
+        'code': code,
+        'category': category,
+        'name': str(row.get('name') or code).strip(),
+        'icon': str(row.get('icon') or DEFAULT_ICONS.get(category, '📊')).strip(),
+        'enabled': _parse_bool(row.get('enabled', True)),
+    }
+    if ticker:
+        info['ticker'] = ticker
+    if row.get('unit'):
+        info['unit'] = str(row['unit']).strip()
+    # 그 밖의 컬럼은 그대로 유지 (예: intraday_interval)
+    for key, value in row.items():
+        if key not in RECORD_FIELDS and value not in (None, ''):
+            info[key] = value
+    return info
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ('0', 'false', 'no', 'n', 'off', '')
+
+
+# ==================== 샤드 배정 ====================
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'i/N' 형식 파싱 (i는 0부터 N-1)"""
+    try:
+        index, count = (int(x) for x in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"샤드 형식은 'i/N' 이어야 합니다: {spec}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"샤드 번호 범위 오류: {spec} (0 <= i < N)")
+    return index, count
+
+
+def shard_of(code: str, count: int) -> int:
+    """자산 코드의 샤드 번호 (프로세스/실행 간 동일한 안정 해시)"""
+    digest = hashlib.blake2b(code.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def filter_shard(assets: Dict[str, Dict[str, Dict]], index: int,
+                 count: int) -> Dict[str, Dict[str, Dict]]:
+    """해당 샤드에 배정된 자산만 남김"""
+    return {
+        category: {
+            code: info for code, info in items.items()
+            if shard_of(code, count) == index
+        }
+        for category, items in assets.items()
+    }
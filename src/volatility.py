@@ -0,0 +1,117 @@
+"""
+EWMA 변동성 상태 모듈
+
+자산(및 장중 간격)별 EWMA 분산을 새 봉마다 O(1)로 갱신하고 실행 간 파일로 보존합니다.
+마지막 봉은 진행 중일 수 있으므로 '확정 분산(직전 봉까지)'과 '마지막 봉'을 분리해
+같은 시각의 봉이 다시 들어오면 분산을 건드리지 않고 z-점수만 다시 계산합니다.
+"""
+import json
+import math
+import os
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+from config import VOLATILITY_ALERTS
+
+try:
+    import fcntl
+except ImportError:  # Windows 등
+    fcntl = None
+
+
+class EwmaVolatilityState:
+    """키별 EWMA 변동성 상태 (키: 자산 코드 또는 '코드@간격')"""
+
+    def __init__(self, path: Optional[str] = None, decay: Optional[float] = None):
+        self.path = path or VOLATILITY_ALERTS['state_file']
+        self.decay = decay or VOLATILITY_ALERTS['lambda']
+        self.states: Dict[str, Dict] = {}
+        self.dirty = set()
+        self.load()
+
+    def load(self):
+        """상태 파일 로딩"""
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.states = json.load(f)
+
+    def save(self):
+        """변경된 키만 기존 파일과 병합 저장 (샤드 병렬 실행 대비 파일 잠금)"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path + '.lock', 'w') as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            current = {}
+            if os.path.exists(self.path):
+                with open(self.path, encoding='utf-8') as f:
+                    current = json.load(f)
+            current.update({key: self.states[key] for key in self.dirty})
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(current, f)
+            os.replace(tmp_path, self.path)
+        self.dirty.clear()
+
+    def update(self, key: str, ts: int, close: float):
+        """봉 하나 반영 - O(1)
+
+        ts가 마지막 봉과 같으면 마지막 봉만 수정(진행 중 봉 갱신),
+        더 크면 마지막 봉을 확정 분산에 반영한 뒤 새 봉을 마지막 봉으로 둡니다.
+        """
+        if not (close > 0):
+            return
+        s = self.states.get(key)
+        if s is None:
+            self.states[key] = {'var': 0.0, 'n': 0, 'prev_close': None,
+                                'last_ts': int(ts), 'last_close': float(close)}
+            self.dirty.add(key)
+            return
+        if ts < s['last_ts']:
+            return
+        if ts > s['last_ts']:
+            if s['prev_close']:
+                r = math.log(s['last_close'] / s['prev_close'])
+                s['var'] = r * r if s['n'] == 0 else self.decay * s['var'] + (1 - self.decay) * r * r
+                s['n'] += 1
+            s['prev_close'] = s['last_close']
+            s['last_ts'] = int(ts)
+        s['last_close'] = float(close)
+        self.dirty.add(key)
+
+    def update_series(self, key: str, closes: pd.Series):
+        """시계열에서 마지막으로 반영한 시각 이후의 봉만 반영"""
+        if closes.empty:
+            return
+        ts = pd.DatetimeIndex(closes.index).asi8 // 1_000_000_000
+        values = closes.to_numpy(dtype=np.float64)
+        s = self.states.get(key)
+        start = 0 if s is None else int(np.searchsorted(ts, s['last_ts'], side='left'))
+        for t, c in zip(ts[start:], values[start:]):
+            self.update(key, int(t), float(c))
+
+    def sigma(self, key: str) -> Optional[float]:
+        """확정 봉 기준 1봉 변동성 (관측 부족 시 None)"""
+        s = self.states.get(key)
+        if s is None or s['n'] < VOLATILITY_ALERTS['min_observations'] or s['var'] <= 0:
+            return None
+        return math.sqrt(s['var'])
+
+    def zscore(self, key: str, log_return: Optional[float] = None, bars: float = 1.0) -> Optional[float]:
+        """수익률의 z-점수 (기본: 마지막 봉 수익률, bars개 봉 구간이면 √bars로 스케일)"""
+        sigma = self.sigma(key)
+        if sigma is None:
+            return None
+        if log_return is None:
+            s = self.states[key]
+            if not s['prev_close']:
+                return None
+            log_return = math.log(s['last_close'] / s['prev_close'])
+        return log_return / (sigma * math.sqrt(max(bars, 1.0)))
+
+
+def threshold_mode(category: str, code: str) -> str:
+    """자산별 알림 임계값 방식: 'fixed' 또는 'zscore' (자산 > 카테고리 > 기본값)"""
+    cfg = VOLATILITY_ALERTS
+    return cfg['assets'].get(code) or cfg['categories'].get(category) or cfg['default_mode']